@@ -2,7 +2,10 @@ from datetime import datetime, timedelta
 from airflow.decorators import dag, task
 import boto3
 from boto3.dynamodb.conditions import Attr
+import io
 import json
+import os
+import numpy as np
 
 AWS_REGION = "us-east-1"
 DYNAMO_TABLE = "t_reportes"
@@ -10,6 +13,82 @@ S3_BUCKET_REPORTS = "alertautec-reports"
 # Cambia TU_ID_CUENTA por tu ID de cuenta AWS
 SNS_TOPIC_ARN = "arn:aws:sns:us-east-1:197345439522:AlertaUTECNotificaciones"
 
+# Snapshot columnar de t_reportes que mantiene la Lambda refreshSnapshot
+# (formato en backend/utils/report_snapshot.py); si no existe se escanea DynamoDB.
+# La ubicación depende del stage: la misma s3://bucket/prefijo que serverless.yml
+# pasa a las Lambdas como SNAPSHOT_URI, en la Variable de Airflow o en el entorno
+SNAPSHOT_URI_VARIABLE = "alertautec_snapshot_uri"
+
+# Códigos de las columnas categóricas del snapshot (backend/utils/report_columns.py)
+ESTADO_NAMES = [None, "PENDIENTE", "ATENDIENDO", "RESUELTO"]
+URGENCIA_NAMES = [None, "BAJA", "MEDIA", "ALTA"]
+SNAPSHOT_FIELDS = [
+    "estado", "urgencia", "urgencia_original", "urgencia_clasificada",
+    "assigned_sector", "classification_score", "clasificacion_auto",
+]
+
+
+def snapshot_location():
+    """
+    (bucket, prefijo) del snapshot según la Variable de Airflow o SNAPSHOT_URI,
+    o None si no está configurado. Se lee dentro de la tarea, no al parsear el DAG.
+    """
+    from airflow.models import Variable
+
+    uri = Variable.get(SNAPSHOT_URI_VARIABLE, default_var=None) or os.environ.get("SNAPSHOT_URI")
+    if not uri or not uri.startswith("s3://"):
+        return None
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    return bucket, prefix.rstrip("/")
+
+
+def read_snapshot_incidents(since):
+    """
+    Incidentes creados después de since leídos del snapshot en S3.
+    Devuelve None si el snapshot no está configurado, no existe o le falta una
+    partición (el DAG usa entonces el scan).
+    """
+    location = snapshot_location()
+    if location is None:
+        return None
+    bucket, prefix = location
+
+    s3 = boto3.client("s3", region_name=AWS_REGION)
+    try:
+        manifest = json.loads(
+            s3.get_object(Bucket=bucket, Key=f"{prefix}/manifest.json")["Body"].read()
+        )
+    except s3.exceptions.NoSuchKey:
+        return None
+
+    incidents = []
+    for day, entry in sorted(manifest["partitions"].items()):
+        if day < since.strftime("%Y-%m-%d"):
+            continue
+        try:
+            data = s3.get_object(Bucket=bucket, Key=f"{prefix}/{entry['file']}")["Body"].read()
+        except s3.exceptions.NoSuchKey:
+            # Partición reemplazada mientras se leía: un snapshot parcial contaría de menos
+            return None
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            columns = {name: npz[name] for name in SNAPSHOT_FIELDS + ["created_at"]}
+
+        for i in np.flatnonzero(columns["created_at"] > np.datetime64(since, "us")):
+            inc = {
+                "estado": ESTADO_NAMES[columns["estado"][i]],
+                "urgencia": URGENCIA_NAMES[columns["urgencia"][i]],
+                "urgencia_original": URGENCIA_NAMES[columns["urgencia_original"][i]],
+                "urgencia_clasificada": URGENCIA_NAMES[columns["urgencia_clasificada"][i]],
+                "assigned_sector": str(columns["assigned_sector"][i]) or None,
+                "classification_score": None if np.isnan(columns["classification_score"][i])
+                else float(columns["classification_score"][i]),
+                "clasificacion_auto": bool(columns["clasificacion_auto"][i]),
+            }
+            # Atributos ausentes en el reporte original: se omiten para que apliquen los defaults
+            incidents.append({key: value for key, value in inc.items() if value is not None})
+    return incidents
+
+
 @dag(
     dag_id="alertautec_daily_stats_report",
     schedule_interval="0 0 * * *",  # todos los días a medianoche
@@ -27,6 +106,10 @@ def daily_stats_report():
         now = datetime.utcnow()
         yesterday = now - timedelta(days=1)
 
+        incidents = read_snapshot_incidents(yesterday)
+        if incidents is not None:
+            return incidents
+
         resp = table.scan(
             FilterExpression=Attr("created_at").gt(yesterday.isoformat())
         )
@@ -4,12 +4,50 @@ from decimal import Decimal
 import boto3
 from boto3.dynamodb.conditions import Attr
 import json
+import os
+import sys
 
 AWS_REGION = "us-east-1"
+# Directorio con backend/utils, si se desplegó junto al DAG
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
 DYNAMO_TABLE = "t_reportes"
+CACHE_TABLE = "t_cache"
 # Cambia TU_ID_CUENTA por tu ID de cuenta AWS
 SNS_TOPIC_ARN = "arn:aws:sns:us-east-1:197345439522:AlertaUTECNotificaciones"
 
+def bump_reports_generation(dynamodb):
+    """Invalida las respuestas cacheadas de las Lambdas que leen t_reportes (backend/utils/response_cache.py)"""
+    try:
+        dynamodb.Table(CACHE_TABLE).update_item(
+            Key={"cache_key": "GEN#t_reportes"},
+            UpdateExpression="ADD generation :one",
+            ExpressionAttributeValues={":one": 1},
+        )
+    except Exception as e:
+        print(f"Error bumping t_reportes generation: {str(e)}")
+
+
+def load_stats_recorder():
+    """
+    record_report_change de backend/utils/stats_counters.py (el mismo código de las
+    Lambdas), o None si utils no se desplegó junto al DAG.
+
+    Se importa dentro de la tarea y no al parsear el DAG: stats_counters crea sus
+    recursos de boto3 al importarse. Sin él los contadores de t_stats quedan
+    atrasados hasta correr scripts/rebuild_stats.py.
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("AWS_DEFAULT_REGION", AWS_REGION)
+    try:
+        from utils.stats_counters import record_report_change
+    except ImportError as e:
+        print(f"utils.stats_counters not available, t_stats not updated: {str(e)}")
+        return None
+    return record_report_change
+
+
 @dag(
     dag_id="alertautec_incident_classification_and_notifications",
     schedule_interval="*/5 * * * *",  # cada 5 minutos
@@ -94,6 +132,8 @@ def incident_classification_and_notifications():
     def update_incidents(incidents):
         dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
         table = dynamodb.Table(DYNAMO_TABLE)
+        record_report_change = load_stats_recorder()
+        updated = []
 
         for inc in incidents:
             update_expr = (
@@ -101,7 +141,9 @@ def incident_classification_and_notifications():
                 "urgencia_clasificada = :urgencia_clasificada, "
                 "clasificacion_auto = :clasificacion_auto, "
                 "classification_score = :score, "
-                "updated_at = :updated_at"
+                "classified_at = :classified_at, "
+                "changed_at = :classified_at, "
+                "changed_day = :changed_day"
             )
 
             # Convertir float → Decimal (requisito de DynamoDB)
@@ -109,24 +151,55 @@ def incident_classification_and_notifications():
             if isinstance(score, float):
                 score = Decimal(str(score))
 
+            # Mismo formato que las Lambdas ('Z'). updated_at queda para las acciones de
+            # las autoridades (orden de AssignedUpdatedIndex); changed_at/changed_day
+            # alimentan el snapshot incremental (ChangedDayIndex)
+            classified_at = datetime.utcnow().isoformat() + "Z"
             expr_values = {
                ":urgencia_original": inc.get("urgencia_original"),
                ":urgencia_clasificada": inc.get("urgencia_clasificada"),
                ":clasificacion_auto": True,
                ":score": score,
-               ":updated_at": datetime.utcnow().isoformat(),
+               ":classified_at": classified_at,
+               ":changed_day": classified_at[:10],
             }
 
             try:
-                table.update_item(
+                # La condición evita clasificar dos veces si dos corridas del DAG se solapan
+                response = table.update_item(
                     Key={"id_reporte": inc["id_reporte"]},
                     UpdateExpression=update_expr,
-                    ExpressionAttributeValues=expr_values,
+                    ConditionExpression="attribute_not_exists(clasificacion_auto) OR clasificacion_auto = :false",
+                    ExpressionAttributeValues={**expr_values, ":false": False},
+                    ReturnValues="ALL_OLD",
                 )
+            except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+                # Otra corrida ya lo clasificó (y notificó): no repetir
+                print(f"Incident {inc['id_reporte']} already classified, skipping")
+                continue
             except Exception as e:
                 print(f"Error updating incident {inc['id_reporte']}: {str(e)}")
+                updated.append(inc)
+                continue
 
-        return incidents
+            updated.append(inc)
+            if record_report_change is None:
+                continue
+            # Solo cambian los campos de clasificación; el resto sale del item real (ALL_OLD).
+            # record_report_change registra sus errores sin lanzar
+            old_inc = response.get("Attributes", {})
+            new_inc = {
+                **old_inc,
+                "urgencia_original": inc.get("urgencia_original"),
+                "urgencia_clasificada": inc.get("urgencia_clasificada"),
+                "clasificacion_auto": True,
+            }
+            record_report_change(old_inc, new_inc)
+
+        # Una sola invalidación por corrida
+        if updated:
+            bump_reports_generation(dynamodb)
+        return updated
 
 
     @task()
@@ -134,6 +207,7 @@ def incident_classification_and_notifications():
         dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
         table = dynamodb.Table(DYNAMO_TABLE)
         sns = boto3.client("sns", region_name=AWS_REGION)
+        notified = 0
 
         for inc in incidents:
             urgencia_clasificada = inc.get("urgencia_clasificada", "BAJA")
@@ -164,18 +238,27 @@ def incident_classification_and_notifications():
                         Message=json.dumps(message),
                     )
                     
-                    # Marcar notificación como enviada
+                    # Marcar notificación como enviada (changed_at: el snapshot debe ver el cambio)
+                    sent_at = datetime.utcnow().isoformat() + "Z"
                     table.update_item(
                         Key={"id_reporte": inc["id_reporte"]},
-                        UpdateExpression="SET notification_sent = :sent, notification_sent_at = :sent_at",
+                        UpdateExpression=(
+                            "SET notification_sent = :sent, notification_sent_at = :sent_at, "
+                            "changed_at = :sent_at, changed_day = :sent_day"
+                        ),
                         ExpressionAttributeValues={
                             ":sent": True,
-                            ":sent_at": datetime.utcnow().isoformat(),
+                            ":sent_at": sent_at,
+                            ":sent_day": sent_at[:10],
                         },
                     )
+                    notified += 1
                 except Exception as e:
                     print(f"Error notifying for incident {inc['id_reporte']}: {str(e)}")
 
+        if notified:
+            bump_reports_generation(dynamodb)
+
     incidents = get_unclassified_incidents()
     classified = classify_incidents(incidents)
     updated = update_incidents(classified)
@@ -7,9 +7,11 @@ Rol permitido: admin
 import json
 import boto3
 from datetime import datetime
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
+from utils.jwt_validator import validate_token, extract_token_from_event, create_response, parse_json_body
+from utils.stats_counters import record_report_change
+from utils.response_cache import bump_generation
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 reports_table = dynamodb.Table('t_reportes')
 users_table = dynamodb.Table('t_usuarios')
 events_client = boto3.client('events')
@@ -48,7 +50,7 @@ def handler(event, context):
             return create_response(400, {'error': 'Request body is required'})
         
         try:
-            body = json.loads(event['body'])
+            body = parse_json_body(event)
         except json.JSONDecodeError:
             return create_response(400, {'error': 'Invalid JSON body'})
         
@@ -99,26 +101,44 @@ def handler(event, context):
         # 9. Actualizar reporte en DynamoDB
         timestamp = datetime.utcnow().isoformat() + 'Z'
         
-        update_expression = 'SET assigned_to = :user_id, estado = :estado, updated_at = :timestamp'
+        update_expression = ('SET assigned_to = :user_id, estado = :estado, updated_at = :timestamp, '
+                             'changed_at = :timestamp, changed_day = :changed_day')
         expression_values = {
             ':user_id': assigned_to,
             ':estado': new_estado,
-            ':timestamp': timestamp
+            ':timestamp': timestamp,
+            ':changed_day': timestamp[:10]
         }
+        changes = {'assigned_to': assigned_to, 'estado': new_estado, 'updated_at': timestamp}
+        
+        # Primera vez que alguien atiende el reporte (tiempo de atención en t_stats)
+        if new_estado != 'PENDIENTE':
+            update_expression += ', taken_at = if_not_exists(taken_at, :timestamp)'
+            changes['taken_at'] = timestamp
         
         # Si el estado es RESUELTO, agregar resolved_at
         if new_estado == 'RESUELTO':
             update_expression += ', resolved_at = :resolved_at'
             expression_values[':resolved_at'] = timestamp
+            changes['resolved_at'] = timestamp
         
+        # ALL_OLD: estado previo real para calcular la diferencia de contadores
         update_response = reports_table.update_item(
             Key={'id_reporte': id_reporte},
             UpdateExpression=update_expression,
             ExpressionAttributeValues=expression_values,
-            ReturnValues='ALL_NEW'
+            ReturnValues='ALL_OLD'
         )
         
-        updated_report = update_response['Attributes']
+        old_report = update_response.get('Attributes') or {}
+        if old_report.get('taken_at') and 'taken_at' in changes:
+            changes['taken_at'] = old_report['taken_at']
+        updated_report = {'id_reporte': id_reporte, **old_report, **changes}
+        
+        # Actualizar contadores de t_stats (estado y asignado anterior/nuevo)
+        if old_report:
+            record_report_change(old_report, updated_report)
+        bump_generation()
         
         # 10. Enviar evento a EventBridge para notificaciones
         try:
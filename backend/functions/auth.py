@@ -4,81 +4,44 @@ import hashlib
 import os
 import jwt
 import uuid
-from datetime import datetime, timedelta
-from decimal import Decimal
+from datetime import datetime
+from utils.jwt_validator import parse_json_body, create_response
+from utils.dynamo import dynamodb
+from utils.user_cache import invalidate_user
+from utils.token_revocation import TOKEN_LIFETIME
+from utils.secrets_cache import get_jwt_secret
 
-dynamodb = boto3.resource('dynamodb')
-ssm = boto3.client('ssm')
 events = boto3.client('events')
 sns = boto3.client('sns')
 
-# Cache para JWT_SECRET
-_jwt_secret_cache = None
-
-# Helper para convertir Decimal a tipos nativos de Python
-def decimal_to_native(obj):
-    """Convierte Decimal a int o float según corresponda"""
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    else:
-        return obj
-
-def get_jwt_secret():
-    """Obtiene el JWT_SECRET desde Parameter Store con caché"""
-    global _jwt_secret_cache
-    
-    if _jwt_secret_cache is None:
-        try:
-            response = ssm.get_parameter(
-                Name=os.environ.get('JWT_SECRET_PARAM', '/utec-alerta/jwt-secret'),
-                WithDecryption=True
-            )
-            _jwt_secret_cache = response['Parameter']['Value']
-        except Exception as e:
-            print(f"Error getting JWT_SECRET: {e}")
-            raise Exception("JWT_SECRET not configured")
-    
-    return _jwt_secret_cache
-
 
 def hash_password(password):
     """Hashea la contraseña usando SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
 
-def generate_jwt(user_id, email, role):
-    """Genera un token JWT"""
+def generate_jwt(user):
+    """
+    Genera un token JWT autocontenido para un item de t_usuarios.
+    Lleva rol, sector, nombres y token_version para que validate_token no tenga
+    que leer el usuario (ver utils/token_revocation.py).
+    """
     secret = get_jwt_secret()
+    now = datetime.utcnow()
     payload = {
-        'user_id': user_id,
-        'email': email,
-        'role': role,
-        'exp': datetime.utcnow() + timedelta(days=7),  # Token válido por 7 días
-        'iat': datetime.utcnow()
+        'user_id': user['id'],
+        'email': user['email'],
+        'role': user['role'],
+        'sector': (user.get('data_authority') or {}).get('sector'),
+        'first_name': user.get('first_name', ''),
+        'last_name': user.get('last_name', ''),
+        'token_version': int(user.get('token_version', 0)),
+        'exp': now + TOKEN_LIFETIME,  # Token válido por 7 días
+        'iat': now
     }
     return jwt.encode(payload, secret, algorithm='HS256')
 
 
-def create_response(status_code, body):
-    """Crea una respuesta HTTP estandarizada"""
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Credentials': True
-        },
-        'body': json.dumps(body)
-    }
-
-
 def handler(event, context):
     """
     Handler para autenticación (login y register)
@@ -88,7 +51,7 @@ def handler(event, context):
     """
     try:
         # Parsear el body
-        body = json.loads(event.get('body', '{}'))
+        body = parse_json_body(event)
         path = event.get('path', '')
         
         # Determinar la acción basada en el path o body
@@ -141,7 +104,8 @@ def handle_register(body):
             'password': password_hash,
             'DNI': body['DNI'],
             'cellphone': body['cellphone'],
-            'registration_date': datetime.utcnow().isoformat()
+            'registration_date': datetime.utcnow().isoformat(),
+            'token_version': 0
         }
         
         # Agregar datos específicos del estudiante si existen
@@ -150,6 +114,7 @@ def handle_register(body):
         
         # Guardar usuario
         table.put_item(Item=user_item)
+        invalidate_user(user_id)
         
         # Auto-suscribir al usuario al Topic SNS para recibir emails de bienvenida
         try:
@@ -186,7 +151,7 @@ def handle_register(body):
             print(f"Warning: Failed to publish UserRegistered event: {str(e)}")
         
         # Generar JWT
-        token = generate_jwt(user_id, body['email'], 'student')
+        token = generate_jwt(user_item)
         
         return create_response(201, {
             'message': 'Student registered successfully',
@@ -226,16 +191,13 @@ def handle_login(body):
         
         user = response['Items'][0]
         
-        # Convertir Decimal a tipos nativos
-        user = decimal_to_native(user)
-        
         # Verificar contraseña
         password_hash = hash_password(body['password'])
         if password_hash != user['password']:
             return create_response(401, {'error': 'Invalid credentials'})
         
         # Generar JWT
-        token = generate_jwt(user['id'], user['email'], user['role'])
+        token = generate_jwt(user)
         
         # Preparar datos del usuario (sin contraseña)
         user_data = {
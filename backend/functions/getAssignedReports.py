@@ -5,22 +5,26 @@ Rol permitido: authority
 """
 
 import json
-import boto3
-from boto3.dynamodb.conditions import Attr
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
-from utils.pagination import paginate_results, extract_pagination_params
-from utils.filters import apply_filters, sort_items, extract_filter_params, extract_sort_params
-from utils.s3_helper import add_image_urls_to_reports
+from utils.jwt_validator import validate_token, extract_token_from_event, create_response, extract_accept_encoding
+from utils.pagination import (
+    extract_pagination_params, extract_cursor_params,
+    decode_cursor, build_cursor_pagination
+)
+from utils.filters import extract_filter_params, extract_sort_params
+from utils.enrichment import enrich_reports
+from utils.report_queries import query_reports_offset, query_reports_page, count_reports
+from utils.report_dto import extract_fields_param, resolve_order_by, stored_fields_for, to_report_summary
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 reports_table = dynamodb.Table('t_reportes')
-places_table = dynamodb.Table('t_lugares')
 
 
 def handler(event, context):
     """
     GET /reports/assigned-to-me
-    Query params: ?page=1&size=20&estado=ATENDIENDO&urgencia=ALTA&orderBy=created_at&order=desc
+    Query params: ?page=1&size=20&estado=ATENDIENDO&urgencia=ALTA&orderBy=updated_at&order=desc
+    Sparse fieldset: ?fields=id_reporte,estado,urgencia,lugar (por defecto el resumen completo)
+    Modo cursor: ?pagination=cursor y luego ?cursor=<next_cursor> (opcional &include_total=true)
     """
     try:
         # 1. Extraer y validar token
@@ -40,67 +44,46 @@ def handler(event, context):
         # 4. Extraer parámetros de query
         query_params = event.get('queryStringParameters') or {}
         page, size = extract_pagination_params(query_params)
-        order_by, order = extract_sort_params(query_params, default_order_by='created_at')
+        default_order_by = 'updated_at'
+        order_by, order = extract_sort_params(query_params, default_order_by=default_order_by)
+        use_cursor, cursor, include_total = extract_cursor_params(query_params)
+        fields = extract_fields_param(query_params)
+        # orderBy fuera del resumen: se ordena por el default (ver resolve_order_by)
+        order_by = resolve_order_by(order_by, default_order_by)
         
-        # 5. Obtener reportes asignados al usuario
-        response = reports_table.scan(
-            FilterExpression=Attr('assigned_to').eq(user_id)
-        )
-        reports = response.get('Items', [])
-        
-        # Manejar paginación de DynamoDB
-        while 'LastEvaluatedKey' in response:
-            response = reports_table.scan(
-                FilterExpression=Attr('assigned_to').eq(user_id),
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            reports.extend(response.get('Items', []))
-        
-        # 6. Aplicar filtros opcionales
+        # 5. Obtener reportes asignados desde AssignedUpdatedIndex
+        # (assigned_to como partición, estado/urgencia como FilterExpression).
+        # El índice ordena por updated_at; otros órdenes se resuelven en memoria
+        # sobre la carga de la autoridad, nunca sobre toda la tabla.
         filters = extract_filter_params(query_params, ['estado', 'urgencia'])
-        if filters:
-            reports = apply_filters(reports, filters)
-        
-        # 7. Ordenar reportes
-        reports = sort_items(reports, order_by, order)
-        
-        # 8. Enriquecer con datos de lugares
-        lugar_ids = list(set([r['lugar']['id'] for r in reports if 'lugar' in r and 'id' in r['lugar']]))
-        
-        lugares_dict = {}
-        if lugar_ids:
-            for i in range(0, len(lugar_ids), 100):
-                batch_ids = lugar_ids[i:i+100]
-                batch_response = dynamodb.batch_get_item(
-                    RequestItems={
-                        't_lugares': {
-                            'Keys': [{'id': lugar_id} for lugar_id in batch_ids]
-                        }
-                    }
-                )
-                for lugar in batch_response.get('Responses', {}).get('t_lugares', []):
-                    lugares_dict[lugar['id']] = lugar
+        query_filters = {'assigned_to': user_id, **filters}
+        cursor_scope = {'endpoint': 'getAssignedReports', 'user_id': user_id, 'filters': filters, 'order_by': order_by, 'order': order}
         
-        # Enriquecer cada reporte
-        enriched_reports = []
-        for report in reports:
-            if 'lugar' in report and 'id' in report['lugar']:
-                lugar_id = report['lugar']['id']
-                if lugar_id in lugares_dict:
-                    report['lugar'] = lugares_dict[lugar_id]
-            enriched_reports.append(report)
+        if use_cursor:
+            position = decode_cursor(cursor, cursor_scope)
+            page_result = query_reports_page(query_filters, order_by, order, size, position, stored_fields_for(fields))
+            reports = page_result['items']
+        else:
+            # Solo se leen los items hasta el final de la página pedida
+            paginated_result = query_reports_offset(query_filters, order_by, order, page, size, stored_fields_for(fields))
+            reports = paginated_result['items']
         
-        # Convertir S3 URIs a URLs HTTP firmadas
-        enriched_reports = add_image_urls_to_reports(enriched_reports)
+        # 6. Paginar antes de enriquecer (cursor o manual)
+        if use_cursor:
+            total_items = count_reports(query_filters)[0] if include_total else None
+            pagination = build_cursor_pagination(size, page_result['next_position'], cursor_scope, total_items)
+        else:
+            pagination = paginated_result['pagination']
         
-        # 9. Aplicar paginación manual
-        paginated_result = paginate_results(enriched_reports, page, size)
+        # 7. Enriquecer solo la página con datos de lugares
+        reports = enrich_reports(reports, include_user_names=False, fields=fields)
+        reports = [to_report_summary(report, fields) for report in reports]
         
-        # 10. Retornar respuesta
+        # 8. Retornar respuesta
         return create_response(200, {
-            'reports': paginated_result['items'],
-            'pagination': paginated_result['pagination']
-        })
+            'reports': reports,
+            'pagination': pagination
+        }, accept_encoding=extract_accept_encoding(event))
         
     except ValueError as e:
         return create_response(400, {'error': f'Invalid parameters: {str(e)}'})
@@ -5,19 +5,28 @@ Roles permitidos: Todos los roles autenticados
 """
 
 import json
-import boto3
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
-from utils.pagination import paginate_results, extract_pagination_params
+from utils.jwt_validator import (
+    validate_token, extract_token_from_event, create_response, extract_if_none_match, extract_accept_encoding
+)
+from utils.pagination import (
+    paginate_results, extract_pagination_params, extract_cursor_params,
+    decode_cursor, paginate_by_cursor, build_cursor_pagination
+)
 from utils.filters import apply_filters, apply_text_search, sort_items, extract_filter_params
+from utils.response_cache import cached_response
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 places_table = dynamodb.Table('t_lugares')
 
+# Mismo TTL que la caché de lugares (utils/reference_data.py)
+PLACES_CACHE_TTL = 15 * 60
+
 
 def handler(event, context):
     """
     GET /places
     Query params: ?page=1&size=50&tower=T1&floor=3&type=baño&term=laboratorio
+    Modo cursor: ?pagination=cursor y luego ?cursor=<next_cursor> (opcional &include_total=true)
     """
     try:
         # 1. Extraer y validar token
@@ -33,47 +42,77 @@ def handler(event, context):
         query_params = event.get('queryStringParameters') or {}
         page, size = extract_pagination_params(query_params)
         term = query_params.get('term', '').strip()
+        use_cursor, cursor, include_total = extract_cursor_params(query_params)
+        
+        filters = extract_filter_params(query_params, ['tower', 'type'])
+        floor_filter = query_params.get('floor')
         
-        # 4. Obtener todos los lugares
-        response = places_table.scan()
-        places = response.get('Items', [])
+        def build_response():
+            # 4. Obtener todos los lugares
+            response = places_table.scan()
+            places = response.get('Items', [])
         
-        # Manejar paginación de DynamoDB
-        while 'LastEvaluatedKey' in response:
-            response = places_table.scan(
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            places.extend(response.get('Items', []))
+            # Manejar paginación de DynamoDB
+            while 'LastEvaluatedKey' in response:
+                response = places_table.scan(
+                    ExclusiveStartKey=response['LastEvaluatedKey']
+                )
+                places.extend(response.get('Items', []))
         
-        # 5. Aplicar filtros opcionales
-        filters = extract_filter_params(query_params, ['tower', 'type'])
-        if filters:
-            places = apply_filters(places, filters)
+            # 5. Aplicar filtros opcionales
+            if filters:
+                places = apply_filters(places, filters)
         
-        # Filtro especial para floor (convertir a int)
-        floor_filter = query_params.get('floor')
-        if floor_filter is not None and floor_filter != '':
-            try:
-                floor_int = int(floor_filter)
-                places = [p for p in places if p.get('floor') == floor_int]
-            except ValueError:
-                pass  # Ignorar si no es un número válido
+            # Filtro especial para floor (convertir a int)
+            if floor_filter is not None and floor_filter != '':
+                try:
+                    floor_int = int(floor_filter)
+                    places = [p for p in places if p.get('floor') == floor_int]
+                except ValueError:
+                    pass  # Ignorar si no es un número válido
         
-        # 6. Búsqueda de texto en el campo 'name'
-        if term:
-            places = apply_text_search(places, 'name', term)
+            # 6. Búsqueda de texto en el campo 'name'
+            if term:
+                places = apply_text_search(places, 'name', term)
         
-        # 7. Ordenar alfabéticamente por nombre
-        places = sort_items(places, order_by='name', order='asc')
+            # 7. Ordenar alfabéticamente por nombre y paginar (cursor o manual)
+            if use_cursor:
+                cursor_scope = {
+                    'endpoint': 'getPlaces',
+                    'filters': filters,
+                    'floor': floor_filter,
+                    'term': term
+                }
+                position = decode_cursor(cursor, cursor_scope)
+                page_result = paginate_by_cursor(places, size, position, order_by='name', order='asc', id_field='id')
+                paginated_result = {
+                    'items': page_result['items'],
+                    'pagination': build_cursor_pagination(
+                        size, page_result['next_position'], cursor_scope,
+                        len(places) if include_total else None
+                    )
+                }
+            else:
+                places = sort_items(places, order_by='name', order='asc')
+                paginated_result = paginate_results(places, page, size, max_size=100)
         
-        # 8. Aplicar paginación manual
-        paginated_result = paginate_results(places, page, size, max_size=100)
+            # 8. Retornar respuesta
+            return create_response(200, {
+                'places': paginated_result['items'],
+                'pagination': paginated_result['pagination']
+            })
         
-        # 9. Retornar respuesta
-        return create_response(200, {
-            'places': paginated_result['items'],
-            'pagination': paginated_result['pagination']
-        })
+        # 9. Los lugares solo cambian con scripts/seed_lugares.py: respuesta cacheada por TTL
+        #    (sin generación) y 304 si el cliente ya tiene la versión vigente
+        params = {
+            'filters': filters, 'floor': floor_filter, 'term': term, 'page': page, 'size': size,
+            'use_cursor': use_cursor, 'cursor': cursor if use_cursor else None, 'include_total': include_total
+        }
+        return cached_response(
+            'getPlaces', {}, params, [], build_response,
+            ttl=PLACES_CACHE_TTL, if_none_match=extract_if_none_match(event),
+            accept_encoding=extract_accept_encoding(event)
+        )
         
     except ValueError as e:
         return create_response(400, {'error': f'Invalid parameters: {str(e)}'})
@@ -5,14 +5,23 @@ Roles permitidos: student (solo sus reportes), authority (solo su sector), admin
 """
 
 import json
-import boto3
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
-from utils.s3_helper import add_image_urls_to_report
+import time
+from utils.jwt_validator import (
+    validate_token, extract_token_from_event, create_response,
+    compute_etag, etag_headers, extract_if_none_match, etag_matches, create_not_modified_response,
+    extract_accept_encoding
+)
+from utils.s3_helper import add_image_urls_to_report, URL_SAFETY_MARGIN, URL_CLIENT_MARGIN
+from utils.reference_data import reference_loader
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 reports_table = dynamodb.Table('t_reportes')
-places_table = dynamodb.Table('t_lugares')
-users_table = dynamodb.Table('t_usuarios')
+
+# El ETag se deriva del item sin enriquecer más una ventana de tiempo: la URL firmada
+# de la imagen y los nombres de la caché de usuarios pueden cambiar sin que cambie el
+# item. Con una ventana menor al margen de seguridad de las URLs (utils/s3_helper.py),
+# una URL reutilizada tras un 304 sigue vigente al menos URL_CLIENT_MARGIN.
+DETAIL_ETAG_WINDOW = URL_SAFETY_MARGIN - URL_CLIENT_MARGIN
 
 
 def handler(event, context):
@@ -66,19 +75,31 @@ def handler(event, context):
         else:
             return create_response(403, {'error': 'Invalid role'})
         
+        # 5.1 Conditional GET: si el cliente ya tiene esta versión, 304 sin enriquecer ni serializar
+        etag = compute_etag({'report': report, 'window': int(time.time() // DETAIL_ETAG_WINDOW)})
+        if etag_matches(etag, extract_if_none_match(event)):
+            return create_not_modified_response(etag)
+        
         # 6. Enriquecimiento completo del reporte
+        # Lugar, autor y asignado se resuelven desde la caché del contenedor
+        # o, si faltan, en una sola llamada batch_get_item
+        loader = reference_loader()
+        if 'lugar' in report and 'id' in report['lugar']:
+            loader.load('t_lugares', report['lugar']['id'])
+        loader.load('t_usuarios', report.get('author_id'))
+        loader.load('t_usuarios', report.get('assigned_to'))
+        loader.dispatch()
         
         # 6.1 Enriquecer con datos completos del lugar
         if 'lugar' in report and 'id' in report['lugar']:
-            lugar_response = places_table.get_item(Key={'id': report['lugar']['id']})
-            if 'Item' in lugar_response:
-                report['lugar'] = lugar_response['Item']
+            lugar = loader.get('t_lugares', report['lugar']['id'])
+            if lugar:
+                report['lugar'] = lugar
         
         # 6.2 Enriquecer con información del autor
         if 'author_id' in report:
-            author_response = users_table.get_item(Key={'id': report['author_id']})
-            if 'Item' in author_response:
-                author = author_response['Item']
+            author = loader.get('t_usuarios', report['author_id'])
+            if author:
                 report['author'] = {
                     'id': author['id'],
                     'first_name': author.get('first_name'),
@@ -93,9 +114,8 @@ def handler(event, context):
         
         # 6.3 Enriquecer con información del asignado (si existe)
         if 'assigned_to' in report and report['assigned_to']:
-            assigned_response = users_table.get_item(Key={'id': report['assigned_to']})
-            if 'Item' in assigned_response:
-                assigned = assigned_response['Item']
+            assigned = loader.get('t_usuarios', report['assigned_to'])
+            if assigned:
                 report['assigned'] = {
                     'id': assigned['id'],
                     'first_name': assigned.get('first_name'),
@@ -118,7 +138,7 @@ def handler(event, context):
         # 8. Retornar reporte completo enriquecido
         return create_response(200, {
             'report': report
-        })
+        }, headers=etag_headers(etag), accept_encoding=extract_accept_encoding(event))
         
     except ValueError as e:
         return create_response(400, {'error': f'Invalid parameters: {str(e)}'})
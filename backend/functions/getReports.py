@@ -5,23 +5,29 @@ Roles permitidos: student, authority, admin
 """
 
 import json
-import boto3
-from boto3.dynamodb.conditions import Attr
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
-from utils.pagination import paginate_results, extract_pagination_params
-from utils.filters import apply_filters, apply_text_search, sort_items, extract_filter_params, extract_sort_params
-from utils.s3_helper import add_image_urls_to_reports
+from utils.jwt_validator import (
+    validate_token, extract_token_from_event, create_response, extract_if_none_match, extract_accept_encoding
+)
+from utils.pagination import (
+    extract_pagination_params, extract_cursor_params,
+    decode_cursor, build_cursor_pagination
+)
+from utils.filters import extract_filter_params, extract_sort_params
+from utils.enrichment import enrich_reports
+from utils.report_queries import query_reports_offset, query_reports_page, count_reports
+from utils.report_dto import extract_fields_param, resolve_order_by, stored_fields_for, to_report_summary
+from utils.response_cache import cached_response, REPORTS_GENERATION
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 reports_table = dynamodb.Table('t_reportes')
-places_table = dynamodb.Table('t_lugares')
-users_table = dynamodb.Table('t_usuarios')
 
 
 def handler(event, context):
     """
     GET /reports
     Query params: ?page=1&size=20&estado=PENDIENTE&urgencia=ALTA&sector=Mantenimiento&orderBy=created_at&order=desc
+    Sparse fieldset: ?fields=id_reporte,estado,urgencia,lugar (por defecto el resumen completo)
+    Modo cursor: ?pagination=cursor&size=20 y luego ?cursor=<next_cursor> (opcional &include_total=true)
     """
     try:
         # 1. Extraer y validar token
@@ -41,116 +47,63 @@ def handler(event, context):
         # 4. Extraer parámetros de query
         query_params = event.get('queryStringParameters') or {}
         page, size = extract_pagination_params(query_params)
-        order_by, order = extract_sort_params(query_params, default_order_by='created_at')
-        
-        # 5. Obtener todos los reportes
-        response = reports_table.scan()
-        reports = response.get('Items', [])
-        
-        # Manejar paginación de DynamoDB
-        while 'LastEvaluatedKey' in response:
-            response = reports_table.scan(
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            reports.extend(response.get('Items', []))
-        
-        # 6. Sin filtrado automático por rol (transparencia total)
-        # Todos los usuarios pueden ver todos los reportes
-        
-        # 7. Aplicar filtros opcionales (estado, urgencia y sector)
+        default_order_by = 'created_at'
+        order_by, order = extract_sort_params(query_params, default_order_by=default_order_by)
+        use_cursor, cursor, include_total = extract_cursor_params(query_params)
+        fields = extract_fields_param(query_params, ['author_name', 'assigned_name'])
+        # orderBy fuera del resumen: se ordena por el default (ver resolve_order_by)
+        order_by = resolve_order_by(order_by, default_order_by)
+        
+        # 5. Obtener reportes filtrados (estado, urgencia y sector) usando el mejor GSI
+        # Sin filtrado automático por rol (transparencia total)
         filters = extract_filter_params(query_params, ['estado', 'urgencia', 'assigned_sector'])
-        if filters:
-            if 'estado' in filters:
-                reports = [r for r in reports if r.get('estado') == filters['estado']]
-            if 'urgencia' in filters:
-                reports = [r for r in reports if r.get('urgencia') == filters['urgencia']]
-            if 'assigned_sector' in filters:
-                reports = [r for r in reports if r.get('assigned_sector') == filters['assigned_sector']]
-        
-        # 9. Ordenar reportes
-        reports = sort_items(reports, order_by, order)
-        
-        # 10. Enriquecimiento TRIPLE: lugares + autores + asignados
-        
-        # 10.1 Enriquecer con lugares
-        lugar_ids = list(set([r['lugar']['id'] for r in reports if 'lugar' in r and 'id' in r['lugar']]))
-        lugares_dict = {}
-        if lugar_ids:
-            for i in range(0, len(lugar_ids), 100):
-                batch_ids = lugar_ids[i:i+100]
-                batch_response = dynamodb.batch_get_item(
-                    RequestItems={
-                        't_lugares': {
-                            'Keys': [{'id': lugar_id} for lugar_id in batch_ids]
-                        }
-                    }
+        cursor_scope = {'endpoint': 'getReports', 'filters': filters, 'order_by': order_by, 'order': order}
+        
+        def build_response():
+            # Solo se leen los atributos del resumen (ProjectionExpression)
+            if use_cursor:
+                # Solo se lee la página pedida, desde la posición del cursor
+                position = decode_cursor(cursor, cursor_scope)
+                page_result = query_reports_page(filters, order_by, order, size, position, stored_fields_for(fields))
+                reports = page_result['items']
+            else:
+                # Solo se leen los items hasta el final de la página pedida
+                paginated_result = query_reports_offset(filters, order_by, order, page, size, stored_fields_for(fields))
+                reports = paginated_result['items']
+        
+            # 6. Paginar antes de enriquecer (cursor o manual)
+            if use_cursor:
+                total_items, total_is_approximate = count_reports(filters) if include_total else (None, False)
+                pagination = build_cursor_pagination(
+                    size, page_result['next_position'], cursor_scope,
+                    total_items, total_is_approximate
                 )
-                for lugar in batch_response.get('Responses', {}).get('t_lugares', []):
-                    lugares_dict[lugar['id']] = lugar
-        
-        # 10.2 Enriquecer con nombres de autores
-        author_ids = list(set([r.get('author_id') for r in reports if r.get('author_id')]))
-        authors_dict = {}
-        if author_ids:
-            for i in range(0, len(author_ids), 100):
-                batch_ids = author_ids[i:i+100]
-                batch_response = dynamodb.batch_get_item(
-                    RequestItems={
-                        't_usuarios': {
-                            'Keys': [{'id': author_id} for author_id in batch_ids]
-                        }
-                    }
-                )
-                for user in batch_response.get('Responses', {}).get('t_usuarios', []):
-                    authors_dict[user['id']] = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-        
-        # 10.3 Enriquecer con nombres de asignados
-        assigned_ids = list(set([r.get('assigned_to') for r in reports if r.get('assigned_to')]))
-        assigned_dict = {}
-        if assigned_ids:
-            for i in range(0, len(assigned_ids), 100):
-                batch_ids = assigned_ids[i:i+100]
-                batch_response = dynamodb.batch_get_item(
-                    RequestItems={
-                        't_usuarios': {
-                            'Keys': [{'id': assigned_id} for assigned_id in batch_ids]
-                        }
-                    }
-                )
-                for user in batch_response.get('Responses', {}).get('t_usuarios', []):
-                    assigned_dict[user['id']] = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-        
-        # Aplicar enriquecimientos
-        enriched_reports = []
-        for report in reports:
-            # Enriquecer lugar
-            if 'lugar' in report and 'id' in report['lugar']:
-                lugar_id = report['lugar']['id']
-                if lugar_id in lugares_dict:
-                    report['lugar'] = lugares_dict[lugar_id]
-            
-            # Agregar nombre del autor
-            if 'author_id' in report:
-                report['author_name'] = authors_dict.get(report['author_id'], 'Desconocido')
-            
-            # Agregar nombre del asignado
-            if 'assigned_to' in report and report['assigned_to']:
-                report['assigned_name'] = assigned_dict.get(report['assigned_to'], 'Desconocido')
-            
-            enriched_reports.append(report)
-        
-        # Convertir S3 URIs a URLs HTTP firmadas
-        enriched_reports = add_image_urls_to_reports(enriched_reports)
-        
-        # 11. Aplicar paginación manual
-        paginated_result = paginate_results(enriched_reports, page, size)
-        
-        # 12. Retornar respuesta
-        return create_response(200, {
-            'reports': paginated_result['items'],
-            'pagination': paginated_result['pagination'],
-            'filters_applied': filters
-        })
+            else:
+                pagination = paginated_result['pagination']
+        
+            # 7. Enriquecimiento TRIPLE (lugares + autores + asignados) solo de la página
+            reports = enrich_reports(reports, include_user_names=True, fields=fields)
+            reports = [to_report_summary(report, fields) for report in reports]
+        
+            # 8. Retornar respuesta
+            return create_response(200, {
+                'reports': reports,
+                'pagination': pagination,
+                'filters_applied': filters
+            })
+        
+        # 9. Respuesta cacheada mientras t_reportes no cambie; es la misma para
+        #    todos los roles, así que la clave no depende del usuario
+        return cached_response(
+            'getReports', {},
+            {
+                'filters': filters, 'order_by': order_by, 'order': order, 'fields': fields,
+                'page': page, 'size': size, 'cursor': cursor if use_cursor else None,
+                'use_cursor': use_cursor, 'include_total': include_total
+            },
+            [REPORTS_GENERATION], build_response, if_none_match=extract_if_none_match(event),
+            accept_encoding=extract_accept_encoding(event)
+        )
         
     except ValueError as e:
         return create_response(400, {'error': f'Invalid parameters: {str(e)}'})
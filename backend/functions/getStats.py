@@ -5,20 +5,30 @@ Roles permitidos: student, authority, admin
 """
 
 import json
-import boto3
 from datetime import datetime, timedelta
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
+from utils.jwt_validator import (
+    validate_token, extract_token_from_event, create_response, extract_if_none_match, extract_accept_encoding
+)
+from utils.stats_aggregator import counts_by, avg_resolution_hours, new_counters, ESTADOS, URGENCIAS, NO_SECTOR
+from utils.stats_counters import load_counters, author_key, sector_key, assignee_key, GLOBAL_KEY
+from utils.stats_rollups import period_counters, parse_timestamp, to_iso
+from utils.quantile_sketch import percentiles_hours
+from utils.response_cache import cached_response, REPORTS_GENERATION
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 reports_table = dynamodb.Table('t_reportes')
 users_table = dynamodb.Table('t_usuarios')
 places_table = dynamodb.Table('t_lugares')
 
+# Los períodos relativos (today/week/month/year) se desplazan con el reloj: TTL corto
+STATS_CACHE_TTL = 60
+
 
 def handler(event, context):
     """
     GET /stats
     Query params: ?period=week (today|week|month|year)
+                  ?from=2025-11-01&to=2025-11-15 (rango arbitrario; to es opcional y exclusivo)
     
     Retorna estadísticas personalizadas según el rol:
     - student: Mis reportes + estadísticas generales
@@ -37,13 +47,23 @@ def handler(event, context):
         role = payload['user_data']['role']
         user_data = payload['user_data']
         
-        # 3. Obtener período de tiempo
+        # 3. Obtener período de tiempo (o rango arbitrario con ?from=&to=)
         query_params = event.get('queryStringParameters') or {}
         period = query_params.get('period', 'week').lower()
         
         # Calcular rango de fechas
         now = datetime.utcnow()
-        if period == 'today':
+        end_date = None
+        if query_params.get('from'):
+            try:
+                start_date = parse_timestamp(query_params['from'])
+                end_date = parse_timestamp(query_params['to']) if query_params.get('to') else None
+            except ValueError:
+                return create_response(400, {'error': 'from/to must be ISO 8601 dates'})
+            if end_date is not None and end_date <= start_date:
+                return create_response(400, {'error': 'to must be after from'})
+            period = 'custom'
+        elif period == 'today':
             start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
         elif period == 'week':
             start_date = now - timedelta(days=7)
@@ -54,36 +74,59 @@ def handler(event, context):
         else:
             start_date = now - timedelta(days=7)  # Default: week
         
-        start_date_str = start_date.isoformat() + 'Z'
+        start_date_str = to_iso(start_date)
+        end_date_str = to_iso(end_date or now)
         
-        # 4. Obtener todos los reportes
-        response = reports_table.scan()
-        all_reports = response.get('Items', [])
+        user_sector = user_data.get('data_authority', {}).get('sector', '') if role == 'authority' else None
         
-        while 'LastEvaluatedKey' in response:
-            response = reports_table.scan(
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            all_reports.extend(response.get('Items', []))
+        # 4. Totales históricos (bucket TOTAL) y del período (rollups por hora/día) desde t_stats
+        def build_response():
+            if role == 'student':
+                my_aggregate = {
+                    'all': load_counters([author_key(user_id)])[author_key(user_id)],
+                    'period': period_counters(author_key(user_id), {'author_id': user_id}, start_date, end_date)
+                }
+                system_aggregate = {'period': period_counters(GLOBAL_KEY, {}, start_date, end_date)}
+                stats = generate_student_stats(my_aggregate, system_aggregate, period, start_date_str, end_date_str)
+            elif role == 'authority':
+                # Mi sector y mis asignados dentro del sector
+                if user_sector:
+                    counters = load_counters([sector_key(user_sector), assignee_key(user_id, user_sector)])
+                    sector_aggregate = {
+                        'all': counters[sector_key(user_sector)],
+                        'period': period_counters(sector_key(user_sector), {'assigned_sector': user_sector}, start_date, end_date)
+                    }
+                    my_assigned = counters[assignee_key(user_id, user_sector)]
+                else:
+                    sector_aggregate = {'all': new_counters(), 'period': new_counters()}
+                    my_assigned = new_counters()
+                stats = generate_authority_stats(user_id, user_sector, sector_aggregate, my_assigned, period, start_date_str, end_date_str)
+            elif role == 'admin':
+                aggregate = {
+                    'all': load_counters([GLOBAL_KEY])[GLOBAL_KEY],
+                    'period': period_counters(GLOBAL_KEY, {}, start_date, end_date)
+                }
+                # Rollups del período por sector (para los percentiles de cada sector)
+                sector_periods = {
+                    sector: period_counters(sector_key(sector), {'assigned_sector': sector}, start_date, end_date)
+                    for sector in aggregate['all']['by_sector'] if sector != NO_SECTOR
+                }
+                stats = generate_admin_stats(aggregate, sector_periods, period, start_date_str, end_date_str)
+            else:
+                return create_response(403, {'error': 'Invalid role'})
         
-        # Filtrar por fecha
-        reports_in_period = [
-            r for r in all_reports 
-            if r.get('created_at', '') >= start_date_str
-        ]
-        
-        # 5. Generar estadísticas según el rol
-        if role == 'student':
-            stats = generate_student_stats(user_id, reports_in_period, all_reports, period, start_date_str, now)
-        elif role == 'authority':
-            user_sector = user_data.get('data_authority', {}).get('sector', '')
-            stats = generate_authority_stats(user_id, user_sector, reports_in_period, all_reports, period, start_date_str, now)
-        elif role == 'admin':
-            stats = generate_admin_stats(reports_in_period, all_reports, period, start_date_str, now)
-        else:
-            return create_response(403, {'error': 'Invalid role'})
+            return create_response(200, stats)
         
-        return create_response(200, stats)
+        # 5. Respuesta cacheada mientras t_reportes no cambie. Las estadísticas de student y
+        #    authority son personales (mis reportes, mis asignados): la clave incluye al usuario
+        scope = {'role': role, 'user_id': user_id if role != 'admin' else None, 'sector': user_sector}
+        params = {'period': period, 'from': start_date_str if period == 'custom' else None,
+                  'to': to_iso(end_date) if end_date else None}
+        return cached_response(
+            'getStats', scope, params, [REPORTS_GENERATION], build_response,
+            ttl=STATS_CACHE_TTL, if_none_match=extract_if_none_match(event),
+            accept_encoding=extract_accept_encoding(event)
+        )
         
     except Exception as e:
         print(f"Error in getStats: {str(e)}")
@@ -92,78 +135,42 @@ def handler(event, context):
         return create_response(500, {'error': 'Internal server error', 'details': str(e)})
 
 
-def generate_student_stats(user_id, reports_in_period, all_reports, period, start_date, now):
+def generate_student_stats(my_aggregate, system_aggregate, period, start_date, end_date):
     """Estadísticas para estudiantes: sus reportes + vista general"""
     
-    # Mis reportes en el período
-    my_reports_period = [r for r in reports_in_period if r.get('author_id') == user_id]
-    my_reports_total = [r for r in all_reports if r.get('author_id') == user_id]
-    
-    # Contadores de mis reportes
-    my_pending = len([r for r in my_reports_total if r.get('estado') == 'PENDIENTE'])
-    my_in_progress = len([r for r in my_reports_total if r.get('estado') == 'ATENDIENDO'])
-    my_resolved = len([r for r in my_reports_total if r.get('estado') == 'RESUELTO'])
+    # Mis reportes (total y en el período)
+    my_by_estado = counts_by(my_aggregate['all'], 'by_estado', ESTADOS)
     
     # Estadísticas generales del sistema (para contexto)
-    total_system = len(reports_in_period)
-    system_by_urgencia = {
-        'BAJA': len([r for r in reports_in_period if r.get('urgencia') == 'BAJA']),
-        'MEDIA': len([r for r in reports_in_period if r.get('urgencia') == 'MEDIA']),
-        'ALTA': len([r for r in reports_in_period if r.get('urgencia') == 'ALTA'])
-    }
+    system_period = system_aggregate['period']
     
     return {
         'role': 'student',
         'period': period,
         'date_range': {
             'from': start_date,
-            'to': now.isoformat() + 'Z'
+            'to': end_date
         },
         'my_reports': {
-            'total': len(my_reports_total),
-            'in_period': len(my_reports_period),
-            'pendiente': my_pending,
-            'atendiendo': my_in_progress,
-            'resuelto': my_resolved,
-            'by_urgencia': {
-                'BAJA': len([r for r in my_reports_total if r.get('urgencia') == 'BAJA']),
-                'MEDIA': len([r for r in my_reports_total if r.get('urgencia') == 'MEDIA']),
-                'ALTA': len([r for r in my_reports_total if r.get('urgencia') == 'ALTA'])
-            }
+            'total': my_aggregate['all']['total'],
+            'in_period': my_aggregate['period']['total'],
+            'pendiente': my_by_estado['PENDIENTE'],
+            'atendiendo': my_by_estado['ATENDIENDO'],
+            'resuelto': my_by_estado['RESUELTO'],
+            'by_urgencia': counts_by(my_aggregate['all'], 'by_urgencia', URGENCIAS)
         },
         'system_overview': {
-            'total_reports_in_period': total_system,
-            'by_urgencia': system_by_urgencia
+            'total_reports_in_period': system_period['total'],
+            'by_urgencia': counts_by(system_period, 'by_urgencia', URGENCIAS)
         }
     }
 
 
-def generate_authority_stats(user_id, user_sector, reports_in_period, all_reports, period, start_date, now):
-    """Estadísticas para autoridades: reportes de su sector"""
+def generate_authority_stats(user_id, user_sector, sector_aggregate, my_assigned, period, start_date, end_date):
+    """Estadísticas para autoridades: reportes de su sector y asignados a mí dentro del sector"""
     
-    # Reportes de mi sector
-    sector_reports_period = [r for r in reports_in_period if r.get('assigned_sector') == user_sector]
-    sector_reports_total = [r for r in all_reports if r.get('assigned_sector') == user_sector]
-    
-    # Reportes asignados a mí
-    my_assigned_reports = [r for r in sector_reports_total if r.get('assigned_to') == user_id]
-    
-    # Contadores por estado (sector)
-    sector_pending = len([r for r in sector_reports_total if r.get('estado') == 'PENDIENTE'])
-    sector_in_progress = len([r for r in sector_reports_total if r.get('estado') == 'ATENDIENDO'])
-    sector_resolved = len([r for r in sector_reports_total if r.get('estado') == 'RESUELTO'])
-    
-    # Contadores por urgencia (sector)
-    sector_by_urgencia = {
-        'BAJA': len([r for r in sector_reports_period if r.get('urgencia') == 'BAJA']),
-        'MEDIA': len([r for r in sector_reports_period if r.get('urgencia') == 'MEDIA']),
-        'ALTA': len([r for r in sector_reports_period if r.get('urgencia') == 'ALTA'])
-    }
-    
-    # Mis reportes asignados por estado
-    my_pending = len([r for r in my_assigned_reports if r.get('estado') == 'PENDIENTE'])
-    my_in_progress = len([r for r in my_assigned_reports if r.get('estado') == 'ATENDIENDO'])
-    my_resolved = len([r for r in my_assigned_reports if r.get('estado') == 'RESUELTO'])
+    sector_by_estado = counts_by(sector_aggregate['all'], 'by_estado', ESTADOS)
+    my_by_estado = counts_by(my_assigned, 'by_estado', ESTADOS)
     
     return {
         'role': 'authority',
@@ -171,98 +178,75 @@ def generate_authority_stats(user_id, user_sector, reports_in_period, all_report
         'period': period,
         'date_range': {
             'from': start_date,
-            'to': now.isoformat() + 'Z'
+            'to': end_date
         },
         'my_sector': {
-            'total_reports': len(sector_reports_total),
-            'in_period': len(sector_reports_period),
-            'pendiente': sector_pending,
-            'atendiendo': sector_in_progress,
-            'resuelto': sector_resolved,
-            'by_urgencia': sector_by_urgencia
+            'total_reports': sector_aggregate['all']['total'],
+            'in_period': sector_aggregate['period']['total'],
+            'pendiente': sector_by_estado['PENDIENTE'],
+            'atendiendo': sector_by_estado['ATENDIENDO'],
+            'resuelto': sector_by_estado['RESUELTO'],
+            'by_urgencia': counts_by(sector_aggregate['period'], 'by_urgencia', URGENCIAS),
+            'percentiles': time_percentiles(sector_aggregate['period'])
         },
         'my_assigned': {
-            'total': len(my_assigned_reports),
-            'pendiente': my_pending,
-            'atendiendo': my_in_progress,
-            'resuelto': my_resolved
+            'total': my_assigned['total'],
+            'pendiente': my_by_estado['PENDIENTE'],
+            'atendiendo': my_by_estado['ATENDIENDO'],
+            'resuelto': my_by_estado['RESUELTO']
         }
     }
 
 
-def generate_admin_stats(reports_in_period, all_reports, period, start_date, now):
+def generate_admin_stats(aggregate, sector_periods, period, start_date, end_date):
     """Estadísticas para administradores: vista completa del sistema"""
     
-    # Totales
-    total_reports = len(all_reports)
-    total_in_period = len(reports_in_period)
-    
-    # Por estado
-    by_estado = {
-        'PENDIENTE': len([r for r in all_reports if r.get('estado') == 'PENDIENTE']),
-        'ATENDIENDO': len([r for r in all_reports if r.get('estado') == 'ATENDIENDO']),
-        'RESUELTO': len([r for r in all_reports if r.get('estado') == 'RESUELTO'])
-    }
-    
-    # Por urgencia (en período)
-    by_urgencia = {
-        'BAJA': len([r for r in reports_in_period if r.get('urgencia') == 'BAJA']),
-        'MEDIA': len([r for r in reports_in_period if r.get('urgencia') == 'MEDIA']),
-        'ALTA': len([r for r in reports_in_period if r.get('urgencia') == 'ALTA'])
-    }
-    
-    # Por sector
-    sectores = {}
-    for report in all_reports:
-        sector = report.get('assigned_sector', 'Sin asignar')
-        sectores[sector] = sectores.get(sector, 0) + 1
-    
-    # Por sector en período
-    sectores_period = {}
-    for report in reports_in_period:
-        sector = report.get('assigned_sector', 'Sin asignar')
-        sectores_period[sector] = sectores_period.get(sector, 0) + 1
-    
-    # Reportes sin asignar
-    unassigned = len([r for r in all_reports if r.get('assigned_to') is None])
+    totals = aggregate['all']
+    in_period = aggregate['period']
+    total_reports = totals['total']
+    by_estado = counts_by(totals, 'by_estado', ESTADOS)
     
     # Promedio de tiempo de resolución (solo resueltos)
-    resolved_reports = [r for r in all_reports if r.get('estado') == 'RESUELTO' and r.get('resolved_at') and r.get('created_at')]
-    avg_resolution_time = None
-    if resolved_reports:
-        total_time = 0
-        for r in resolved_reports:
-            try:
-                created = datetime.fromisoformat(r['created_at'].replace('Z', '+00:00'))
-                resolved = datetime.fromisoformat(r['resolved_at'].replace('Z', '+00:00'))
-                total_time += (resolved - created).total_seconds()
-            except:
-                pass
-        if len(resolved_reports) > 0:
-            avg_resolution_time = total_time / len(resolved_reports) / 3600  # En horas
+    avg_resolution_time = avg_resolution_hours(totals)
     
     return {
         'role': 'admin',
         'period': period,
         'date_range': {
             'from': start_date,
-            'to': now.isoformat() + 'Z'
+            'to': end_date
         },
         'summary': {
             'total_reportes': total_reports,
-            'in_period': total_in_period,
+            'in_period': in_period['total'],
             'pendiente': by_estado['PENDIENTE'],
             'atendiendo': by_estado['ATENDIENDO'],
             'resuelto': by_estado['RESUELTO'],
-            'sin_asignar': unassigned
+            'sin_asignar': totals['unassigned']
         },
-        'by_urgencia': by_urgencia,
+        'by_urgencia': counts_by(in_period, 'by_urgencia', URGENCIAS),
         'by_sector': {
-            'total': sectores,
-            'in_period': sectores_period
+            'total': dict(totals['by_sector']),
+            'in_period': dict(in_period['by_sector'])
         },
         'performance': {
             'avg_resolution_time_hours': round(avg_resolution_time, 2) if avg_resolution_time else None,
-            'resolution_rate': round((by_estado['RESUELTO'] / total_reports * 100), 2) if total_reports > 0 else 0
+            'resolution_rate': round((by_estado['RESUELTO'] / total_reports * 100), 2) if total_reports > 0 else 0,
+            'percentiles': time_percentiles(in_period),
+            'percentiles_by_sector': {
+                sector: time_percentiles(counters) for sector, counters in sector_periods.items()
+            }
         }
     }
+
+
+def time_percentiles(counters):
+    """
+    p50/p90/p99 (en horas) de tiempo de atención y de resolución de los reportes
+    RESUELTO creados en el período, a partir de los sketches de t_stats
+    """
+    sketches = counters.get('sketches', {})
+    return {
+        'time_to_take_hours': percentiles_hours(sketches.get('take', {})),
+        'time_to_resolve_hours': percentiles_hours(sketches.get('resolve', {}))
+    }
@@ -1,26 +1,9 @@
-import json
-import boto3
 import os
-from decimal import Decimal
-from utils.jwt_validator import extract_token_from_event, validate_token
+from utils.jwt_validator import extract_token_from_event, validate_token, create_response, extract_accept_encoding
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 table_usuarios = dynamodb.Table('t_usuarios')
 
-def decimal_to_native(obj):
-    """Convierte Decimal a tipos nativos de Python"""
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    else:
-        return obj
-
 
 def handler(event, context):
     """
@@ -39,16 +22,9 @@ def handler(event, context):
         # Extraer y validar JWT
         token = extract_token_from_event(event)
         if not token:
-            return {
-                'statusCode': 401,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'error': 'Token de autenticación requerido'
-                })
-            }
+            return create_response(401, {
+                'error': 'Token de autenticación requerido'
+            })
         
         claims = validate_token(token)
         user_role = claims.get('role')
@@ -58,16 +34,9 @@ def handler(event, context):
         
         # Solo admin y authority pueden ver listado de usuarios
         if user_role not in ['admin', 'authority']:
-            return {
-                'statusCode': 403,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'error': 'No tienes permisos para ver usuarios'
-                })
-            }
+            return create_response(403, {
+                'error': 'No tienes permisos para ver usuarios'
+            })
         
         # Obtener parámetros de query
         params = event.get('queryStringParameters') or {}
@@ -106,31 +75,16 @@ def handler(event, context):
         
         # Si es authority, solo puede ver usuarios de su sector
         if user_role == 'authority':
-            try:
-                print(f"Filtering by sector for authority: {user_id}")  # Debug
-                # Obtener sector del authority
-                user_response = table_usuarios.get_item(Key={'id': user_id})
-                if 'Item' in user_response:
-                    user_data = user_response['Item']
-                    user_sector = user_data.get('data_authority', {}).get('sector', '')
-                    print(f"Authority sector: {user_sector}")  # Debug
-                    
-                    # Filtrar solo usuarios del mismo sector (otros authority/admin del mismo sector)
-                    items = [
-                        user for user in items
-                        if user.get('data_authority', {}).get('sector', '') == user_sector
-                    ]
-                    print(f"Items after sector filter: {len(items)}")  # Debug
-                else:
-                    print(f"Authority user not found in database: {user_id}")  # Debug
-                    # Si no se encuentra el usuario authority, no mostrar nada
-                    items = []
-            except Exception as e:
-                print(f"Error filtering by sector: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                # En caso de error, no mostrar usuarios
-                items = []
+            # El sector viene en los claims del token (validate_token arma user_data)
+            user_sector = (claims['user_data'].get('data_authority') or {}).get('sector', '')
+            print(f"Authority sector: {user_sector}")  # Debug
+            
+            # Filtrar solo usuarios del mismo sector (otros authority/admin del mismo sector)
+            items = [
+                user for user in items
+                if user.get('data_authority', {}).get('sector', '') == user_sector
+            ]
+            print(f"Items after sector filter: {len(items)}")  # Debug
         
         # Remover passwords de la respuesta
         users = []
@@ -165,41 +119,24 @@ def handler(event, context):
         
         paginated_users = users[start_idx:end_idx]
         
-        # Convertir Decimal a tipos nativos
-        paginated_users = decimal_to_native(paginated_users)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
-                'users': paginated_users,
-                'pagination': {
-                    'current_page': page,
-                    'page_size': size,
-                    'total_items': total_items,
-                    'total_pages': total_pages,
-                    'has_next': page < total_pages,
-                    'has_previous': page > 1
-                }
-            })
-        }
+        return create_response(200, {
+            'users': paginated_users,
+            'pagination': {
+                'current_page': page,
+                'page_size': size,
+                'total_items': total_items,
+                'total_pages': total_pages,
+                'has_next': page < total_pages,
+                'has_previous': page > 1
+            }
+        }, accept_encoding=extract_accept_encoding(event))
         
     except Exception as e:
         print(f"Error getting users: {str(e)}")
         import traceback
         traceback.print_exc()
         
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
-                'error': 'Error al obtener usuarios',
-                'details': str(e)
-            })
-        }
+        return create_response(500, {
+            'error': 'Error al obtener usuarios',
+            'details': str(e)
+        })
@@ -1,47 +1,13 @@
-import json
-import boto3
 import hashlib
-import os
-import jwt
 import uuid
 from datetime import datetime
-from decimal import Decimal
+from utils.jwt_validator import parse_json_body, create_response, validate_token
+from utils.dynamo import dynamodb
+from utils.user_cache import invalidate_user
+from utils.token_revocation import revoke_user_tokens
 
-dynamodb = boto3.resource('dynamodb')
-ssm = boto3.client('ssm')
-
-# Cache para JWT_SECRET
-_jwt_secret_cache = None
-
-
-def get_jwt_secret():
-    """Obtiene el JWT_SECRET desde Parameter Store con caché"""
-    global _jwt_secret_cache
-    
-    if _jwt_secret_cache is None:
-        try:
-            response = ssm.get_parameter(
-                Name=os.environ.get('JWT_SECRET_PARAM', '/utec-alerta/jwt-secret'),
-                WithDecryption=True
-            )
-            _jwt_secret_cache = response['Parameter']['Value']
-        except Exception as e:
-            print(f"Error getting JWT_SECRET: {e}")
-            raise Exception("JWT_SECRET not configured")
-    
-    return _jwt_secret_cache
-
-
-def verify_token(token):
-    """Verifica y decodifica el token JWT"""
-    try:
-        secret = get_jwt_secret()
-        payload = jwt.decode(token, secret, algorithms=['HS256'])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise Exception("Token expired")
-    except jwt.InvalidTokenError:
-        raise Exception("Invalid token")
+# Roles que se gestionan desde este endpoint
+AUTHORITY_ROLES = ['authority', 'admin']
 
 
 def hash_password(password):
@@ -49,24 +15,12 @@ def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 
-def create_response(status_code, body):
-    """Crea una respuesta HTTP estandarizada"""
-    return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Credentials': True
-        },
-        'body': json.dumps(body)
-    }
-
-
 def handler(event, context):
     """
     Handler para gestión de autoridades por parte de administradores
     Endpoints:
     - POST /admin/authorities - Crear nueva autoridad
+    - PUT /admin/authorities/{id} - Cambiar rol o data_authority (sector, cargo...) de una autoridad
     """
     try:
         # Verificar autenticación
@@ -80,7 +34,7 @@ def handler(event, context):
         token = auth_header.replace('Bearer ', '')
         
         try:
-            payload = verify_token(token)
+            payload = validate_token(token)
         except Exception as e:
             return create_response(401, {'error': str(e)})
         
@@ -89,13 +43,18 @@ def handler(event, context):
             return create_response(403, {'error': 'Only administrators can create authorities'})
         
         # Parsear el body
-        body = json.loads(event.get('body', '{}'))
+        body = parse_json_body(event)
         
         # Determinar la acción
         http_method = event.get('httpMethod', 'POST')
         
         if http_method == 'POST':
             return create_authority(body, payload)
+        elif http_method == 'PUT':
+            authority_id = (event.get('pathParameters') or {}).get('id')
+            if not authority_id:
+                return create_response(400, {'error': 'Authority ID is required'})
+            return update_authority(authority_id, body, payload)
         else:
             return create_response(405, {'error': 'Method not allowed'})
     
@@ -150,11 +109,13 @@ def create_authority(body, admin_payload):
             'cellphone': body['cellphone'],
             'data_authority': authority_data,
             'registration_date': datetime.utcnow().isoformat(),
+            'token_version': 0,
             'created_by': admin_payload['user_id']  # Registrar quién creó la autoridad
         }
         
         # Guardar autoridad
         table.put_item(Item=authority_item)
+        invalidate_user(authority_id)
         
         return create_response(201, {
             'message': 'Authority created successfully',
@@ -171,3 +132,63 @@ def create_authority(body, admin_payload):
     except Exception as e:
         print(f"Error creating authority: {e}")
         return create_response(500, {'error': f'Failed to create authority: {str(e)}'})
+
+
+def update_authority(authority_id, body, admin_payload):
+    """
+    Actualiza el rol y/o data_authority de una autoridad.
+    Los tokens llevan rol y sector en sus claims: si cambian, se revocan los
+    tokens del usuario (utils/token_revocation.py) y debe volver a iniciar sesión.
+    """
+    try:
+        table = dynamodb.Table('t_usuarios')
+        
+        current = table.get_item(Key={'id': authority_id}).get('Item')
+        if current is None or current.get('role') not in AUTHORITY_ROLES:
+            return create_response(404, {'error': 'Authority not found'})
+        
+        new_role = body.get('role', current['role'])
+        if new_role not in AUTHORITY_ROLES:
+            return create_response(400, {'error': f'Invalid role. Must be one of: {", ".join(AUTHORITY_ROLES)}'})
+        
+        authority_data = body.get('data_authority') or {}
+        if not isinstance(authority_data, dict):
+            return create_response(400, {'error': 'data_authority must be an object'})
+        previous_data = current.get('data_authority') or {}
+        new_data = {**previous_data, **authority_data}
+        
+        table.update_item(
+            Key={'id': authority_id},
+            UpdateExpression='SET #role = :role, data_authority = :data, updated_at = :now, updated_by = :admin',
+            ExpressionAttributeNames={'#role': 'role'},
+            ExpressionAttributeValues={
+                ':role': new_role,
+                ':data': new_data,
+                ':now': datetime.utcnow().isoformat(),
+                ':admin': admin_payload['user_id']
+            }
+        )
+        
+        # Rol o sector distintos a los de los tokens vigentes: revocarlos
+        tokens_revoked = new_role != current['role'] or new_data.get('sector') != previous_data.get('sector')
+        if tokens_revoked:
+            revoke_user_tokens(authority_id)
+        else:
+            invalidate_user(authority_id)
+        
+        return create_response(200, {
+            'message': 'Authority updated successfully',
+            'tokens_revoked': tokens_revoked,
+            'authority': {
+                'id': authority_id,
+                'email': current.get('email'),
+                'role': new_role,
+                'first_name': current.get('first_name'),
+                'last_name': current.get('last_name'),
+                'data_authority': new_data
+            }
+        })
+    
+    except Exception as e:
+        print(f"Error updating authority: {e}")
+        return create_response(500, {'error': f'Failed to update authority: {str(e)}'})
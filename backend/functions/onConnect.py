@@ -1,5 +1,3 @@
-import json
-import boto3
 import os
 import sys
 from datetime import datetime
@@ -8,8 +6,8 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.jwt_validator import validate_token
-
-dynamodb = boto3.resource('dynamodb')
+from utils.dynamo import dynamodb
+from utils.serialization import dumps
 
 def handler(event, context):
     """
@@ -26,7 +24,7 @@ def handler(event, context):
         if not query_params or 'token' not in query_params:
             return {
                 'statusCode': 401,
-                'body': json.dumps({'error': 'Missing authentication token in query parameters'})
+                'body': dumps({'error': 'Missing authentication token in query parameters'})
             }
         
         token = query_params['token']
@@ -41,7 +39,7 @@ def handler(event, context):
             print(f"Token validation failed: {e}")
             return {
                 'statusCode': 401,
-                'body': json.dumps({'error': f'Invalid token: {str(e)}'})
+                'body': dumps({'error': f'Invalid token: {str(e)}'})
             }
         
         # Guardar conexión en DynamoDB
@@ -61,7 +59,7 @@ def handler(event, context):
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': dumps({
                 'message': 'Connected successfully',
                 'connectionId': connection_id,
                 'userId': user_id
@@ -72,5 +70,5 @@ def handler(event, context):
         print(f"Error in onConnect handler: {e}")
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
+            'body': dumps({'error': f'Internal server error: {str(e)}'})
         }
@@ -1,5 +1,5 @@
-import json
 import boto3
+from utils.serialization import dumps
 
 dynamodb = boto3.resource('dynamodb')
 
@@ -19,12 +19,12 @@ def handler(event, context):
         
         return {
             'statusCode': 200,
-            'body': json.dumps({'message': 'Disconnected successfully'})
+            'body': dumps({'message': 'Disconnected successfully'})
         }
     
     except Exception as e:
         print(f"Error in onDisconnect handler: {e}")
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
+            'body': dumps({'error': f'Internal server error: {str(e)}'})
         }
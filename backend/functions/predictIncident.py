@@ -4,6 +4,9 @@ from typing import Dict, Any
 
 import boto3
 
+from utils.jwt_validator import parse_json_body
+from utils.serialization import dumps, loads
+
 s3 = boto3.client("s3")
 
 _model_cache: Dict[str, Any] | None = None
@@ -35,7 +38,7 @@ def load_model_from_s3() -> Dict[str, Any]:
     print(f"[predictIncident] Cargando modelo de s3://{bucket}/{key}")
     obj = s3.get_object(Bucket=bucket, Key=key)
     data = obj["Body"].read().decode("utf-8")
-    _model_cache = json.loads(data)
+    _model_cache = loads(data)
     return _model_cache
 
 
@@ -103,10 +106,11 @@ def handler(event, context):
 
         print("[predictIncident] EVENT:", json.dumps(event))
 
-        body = event.get("body", {})
-        if isinstance(body, str):
-            body_str = body
-            body = json.loads(body_str or "{}")
+        # Invocación directa: el body ya es un dict; desde API Gateway llega como
+        # string, en base64 por binaryMediaTypes (ver parse_json_body)
+        body = event.get("body")
+        if not isinstance(body, dict):
+            body = parse_json_body(event)
 
         tower = body.get("tower")
         tipo_lugar = body.get("tipo_lugar")
@@ -116,7 +120,7 @@ def handler(event, context):
             return {
                 "statusCode": 400,
                 "headers": CORS_HEADERS,
-                "body": json.dumps({
+                "body": dumps({
                     "error": "tower, tipo_lugar y hora son obligatorios",
                     "ejemplo_body": {
                         "tower": "T1",
@@ -124,7 +128,7 @@ def handler(event, context):
                         "hora": 9,
                         "dia_semana": 2
                     }
-                }, ensure_ascii=False)
+                })
             }
 
         tower = str(tower)
@@ -156,7 +160,7 @@ def handler(event, context):
         return {
             "statusCode": 200,
             "headers": CORS_HEADERS,
-            "body": json.dumps(response_body, ensure_ascii=False)
+            "body": dumps(response_body)
         }
 
     except Exception as e:
@@ -165,8 +169,8 @@ def handler(event, context):
         return {
             "statusCode": 500,
             "headers": CORS_HEADERS,
-            "body": json.dumps({
+            "body": dumps({
                 "error": "Error interno en la predicción",
                 "detalle": str(e)
-            }, ensure_ascii=False)
+            })
         }
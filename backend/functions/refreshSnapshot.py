@@ -0,0 +1,34 @@
+"""
+Lambda: refreshSnapshot
+Propósito: Actualizar el snapshot columnar de t_reportes (utils/report_snapshot.py)
+Disparo: EventBridge schedule (cada 5 minutos)
+"""
+
+import json
+import sys
+import os
+
+# Agregar el directorio padre al path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.report_snapshot import get_snapshot_store, refresh_snapshot
+from utils.response_cache import bump_generation, SNAPSHOT_GENERATION
+
+
+def handler(event, context):
+    """
+    Lee de t_reportes los reportes modificados desde el último watermark y
+    reescribe las particiones afectadas. event={'full': true} fuerza una reconstrucción completa.
+    """
+    store = get_snapshot_store()
+    if store is None:
+        print("SNAPSHOT_URI not configured, nothing to do")
+        return {'status': 'skipped'}
+
+    full = bool((event or {}).get('full'))
+    summary = refresh_snapshot(store, full=full)
+    if summary['partitions_written']:
+        # Las respuestas calculadas sobre el snapshot anterior quedan vencidas
+        bump_generation(SNAPSHOT_GENERATION)
+    print(f"Snapshot {store}: {json.dumps(summary)}")
+    return summary
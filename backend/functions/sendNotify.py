@@ -2,27 +2,12 @@ import json
 import boto3
 import os
 import sys
-from decimal import Decimal
 
 # Agregar el directorio padre al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-dynamodb = boto3.resource('dynamodb')
-
-# Helper para convertir Decimal a tipos nativos de Python
-def decimal_to_native(obj):
-    """Convierte Decimal a int o float según corresponda"""
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    else:
-        return obj
+from utils.dynamo import dynamodb
+from utils.serialization import dumps
 
 def handler(event, context):
     """
@@ -54,13 +39,13 @@ def handler(event, context):
         # Obtener todas las conexiones activas
         connections_table = dynamodb.Table('t_connections')
         connections_response = connections_table.scan()
-        connections = [decimal_to_native(item) for item in connections_response.get('Items', [])]
+        connections = connections_response.get('Items', [])
         
         if not connections:
             print("No active connections to notify")
             return {
                 'statusCode': 200,
-                'body': json.dumps({'message': 'No active connections'})
+                'body': dumps({'message': 'No active connections'})
             }
         
         # Obtener el endpoint de WebSocket desde variables de entorno
@@ -70,7 +55,7 @@ def handler(event, context):
             print("ERROR: WEBSOCKET_API_ENDPOINT environment variable not set")
             return {
                 'statusCode': 500,
-                'body': json.dumps({'error': 'WebSocket endpoint not configured'})
+                'body': dumps({'error': 'WebSocket endpoint not configured'})
             }
         
         # Crear cliente de API Gateway Management
@@ -113,7 +98,7 @@ def handler(event, context):
                         try:
                             user_response = users_table.get_item(Key={'id': user_id})
                             if 'Item' in user_response:
-                                user_data = decimal_to_native(user_response['Item'])
+                                user_data = user_response['Item']
                                 user_sector = user_data.get('data_authority', {}).get('sector', '')
                                 
                                 # Solo notificar si el reporte es de su sector
@@ -143,7 +128,7 @@ def handler(event, context):
                         try:
                             user_response = users_table.get_item(Key={'id': user_id})
                             if 'Item' in user_response:
-                                user_data = decimal_to_native(user_response['Item'])
+                                user_data = user_response['Item']
                                 user_sector = user_data.get('data_authority', {}).get('sector', '')
                                 
                                 if user_sector == sector:
@@ -161,7 +146,7 @@ def handler(event, context):
                     
                     api_client.post_to_connection(
                         ConnectionId=connection_id,
-                        Data=json.dumps(notification).encode('utf-8')
+                        Data=dumps(notification).encode('utf-8')
                     )
                     sent_count += 1
                     print(f"Notification sent to {connection_id} (user: {user_id}, role: {user_role})")
@@ -179,7 +164,7 @@ def handler(event, context):
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': dumps({
                 'message': 'Notifications processed',
                 'sent': sent_count,
                 'failed': failed_count
@@ -192,5 +177,5 @@ def handler(event, context):
         traceback.print_exc()
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
+            'body': dumps({'error': f'Internal server error: {str(e)}'})
         }
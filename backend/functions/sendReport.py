@@ -5,33 +5,20 @@ import sys
 import base64
 import uuid
 from datetime import datetime
-from decimal import Decimal
 
 # Agregar el directorio padre al path para importar utils
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
+from utils.jwt_validator import validate_token, extract_token_from_event, create_response, parse_json_body
 from utils.s3_helper import generate_presigned_url
+from utils.reference_data import get_place
+from utils.stats_counters import record_report_change
+from utils.response_cache import bump_generation
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 s3 = boto3.client('s3')
 events = boto3.client('events')
 
-# Helper para convertir Decimal a tipos nativos de Python
-def decimal_to_native(obj):
-    """Convierte Decimal a int o float según corresponda"""
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    else:
-        return obj
-
 def handler(event, context):
     """
     Handler para crear un nuevo reporte.
@@ -63,7 +50,7 @@ def handler(event, context):
             return create_response(403, {'error': 'Only students can create reports'})
         
         # Parsear el body
-        body = json.loads(event.get('body', '{}'))
+        body = parse_json_body(event)
         
         # Validar campos requeridos
         required_fields = ['lugar_id', 'urgencia', 'descripcion']
@@ -75,16 +62,12 @@ def handler(event, context):
         if body['urgencia'] not in ['BAJA', 'MEDIA', 'ALTA']:
             return create_response(400, {'error': 'urgencia must be BAJA, MEDIA, or ALTA'})
         
-        # Verificar que el lugar existe
-        lugares_table = dynamodb.Table('t_lugares')
-        lugar_response = lugares_table.get_item(Key={'id': body['lugar_id']})
+        # Verificar que el lugar existe (caché de contenedor para t_lugares)
+        lugar = get_place(body['lugar_id'])
         
-        if 'Item' not in lugar_response:
+        if lugar is None:
             return create_response(404, {'error': 'Place not found'})
         
-        # Convertir Decimal a tipos nativos
-        lugar = decimal_to_native(lugar_response['Item'])
-        
         # Generar ID del reporte
         report_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat() + 'Z'
@@ -140,10 +123,13 @@ def handler(event, context):
             'urgencia_clasificada': body['urgencia'],
             'estado': 'PENDIENTE',
             'author_id': user_id,
-            'assigned_to': None,
+            # assigned_to se omite hasta que alguien tome el reporte (AssignedUpdatedIndex no acepta NULL)
             'assigned_sector': assigned_sector,
             'created_at': timestamp,
             'updated_at': timestamp,
+            # ChangedDayIndex (snapshot incremental)
+            'changed_at': timestamp,
+            'changed_day': timestamp[:10],
             'resolved_at': None,
             'clasificacion_auto': False,
             'classification_score': None,
@@ -156,6 +142,10 @@ def handler(event, context):
         
         reports_table.put_item(Item=report_item)
         
+        # Contadores de t_stats (global, sector y autor)
+        record_report_change(None, report_item)
+        bump_generation()
+        
         # Enviar notificación a través de EventBridge
         try:
             event_detail = {
@@ -7,9 +7,11 @@ Rol permitido: authority
 import json
 import boto3
 from datetime import datetime
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
+from utils.jwt_validator import validate_token, extract_token_from_event, create_response, parse_json_body
+from utils.stats_counters import record_report_change
+from utils.response_cache import bump_generation
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 reports_table = dynamodb.Table('t_reportes')
 events_client = boto3.client('events')
 
@@ -47,7 +49,7 @@ def handler(event, context):
         body = {}
         if event.get('body'):
             try:
-                body = json.loads(event['body'])
+                body = parse_json_body(event)
             except json.JSONDecodeError:
                 return create_response(400, {'error': 'Invalid JSON body'})
         
@@ -84,18 +86,32 @@ def handler(event, context):
         
         update_response = reports_table.update_item(
             Key={'id_reporte': id_reporte},
-            UpdateExpression='SET assigned_to = :user_id, estado = :estado, updated_at = :timestamp',
+            UpdateExpression='SET assigned_to = :user_id, estado = :estado, updated_at = :timestamp, '
+                             'changed_at = :timestamp, changed_day = :changed_day, taken_at = if_not_exists(taken_at, :timestamp)',
             ConditionExpression='estado = :old_estado',  # Condición para evitar race conditions
             ExpressionAttributeValues={
                 ':user_id': user_id,
                 ':estado': 'ATENDIENDO',
                 ':timestamp': timestamp,
+                ':changed_day': timestamp[:10],
                 ':old_estado': 'PENDIENTE'
             },
-            ReturnValues='ALL_NEW'
+            ReturnValues='ALL_OLD'
         )
         
-        updated_report = update_response['Attributes']
+        # ALL_OLD da el item previo real (assigned_to pudo cambiar desde el get_item)
+        old_report = update_response['Attributes']
+        updated_report = {
+            **old_report,
+            'assigned_to': user_id,
+            'estado': 'ATENDIENDO',
+            'updated_at': timestamp,
+            'taken_at': old_report.get('taken_at') or timestamp
+        }
+        
+        # Actualizar contadores de t_stats (PENDIENTE -> ATENDIENDO, nuevo asignado)
+        record_report_change(old_report, updated_report)
+        bump_generation()
         
         # 9. Enviar evento a EventBridge para notificaciones
         try:
@@ -3,31 +3,17 @@ import boto3
 import os
 import sys
 from datetime import datetime
-from decimal import Decimal
 
 # Agregar el directorio padre al path para importar utils
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.jwt_validator import validate_token, extract_token_from_event, create_response
+from utils.jwt_validator import validate_token, extract_token_from_event, create_response, parse_json_body
+from utils.stats_counters import record_report_change
+from utils.response_cache import bump_generation
+from utils.dynamo import dynamodb
 
-dynamodb = boto3.resource('dynamodb')
 events = boto3.client('events')
 
-# Helper para convertir Decimal a tipos nativos de Python
-def decimal_to_native(obj):
-    """Convierte Decimal a int o float según corresponda"""
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    else:
-        return obj
-
 def handler(event, context):
     """
     Handler para actualizar el estado de un reporte.
@@ -59,7 +45,7 @@ def handler(event, context):
             return create_response(403, {'error': 'Only authorities can update report status'})
         
         # Parsear el body
-        body = json.loads(event.get('body', '{}'))
+        body = parse_json_body(event)
         
         # Validar campos requeridos
         if 'id_reporte' not in body or 'estado' not in body:
@@ -80,30 +66,48 @@ def handler(event, context):
         if 'Item' not in report_response:
             return create_response(404, {'error': 'Report not found'})
         
-        # Convertir Decimal a tipos nativos
-        report = decimal_to_native(report_response['Item'])
+        report = report_response['Item']
         timestamp = datetime.utcnow().isoformat() + 'Z'
         
         # Preparar actualización
-        update_expression = 'SET estado = :estado, updated_at = :updated_at, assigned_to = :assigned_to'
+        update_expression = ('SET estado = :estado, updated_at = :updated_at, changed_at = :updated_at, '
+                             'changed_day = :changed_day, assigned_to = :assigned_to')
         expression_values = {
             ':estado': new_status,
             ':updated_at': timestamp,
+            ':changed_day': timestamp[:10],
             ':assigned_to': user_id
         }
         
+        changes = {'estado': new_status, 'updated_at': timestamp, 'assigned_to': user_id}
+        
+        # Primera vez que alguien atiende el reporte (tiempo de atención en t_stats)
+        if new_status != 'PENDIENTE':
+            update_expression += ', taken_at = if_not_exists(taken_at, :updated_at)'
+            changes['taken_at'] = timestamp
+        
         # Si el estado es RESUELTO, agregar resolved_at
         if new_status == 'RESUELTO':
             update_expression += ', resolved_at = :resolved_at'
             expression_values[':resolved_at'] = timestamp
+            changes['resolved_at'] = timestamp
         
-        # Actualizar reporte
-        reports_table.update_item(
+        # Actualizar reporte (ALL_OLD: estado previo real, aunque otro request lo haya cambiado)
+        update_response = reports_table.update_item(
             Key={'id_reporte': report_id},
             UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values
+            ExpressionAttributeValues=expression_values,
+            ReturnValues='ALL_OLD'
         )
         
+        # Actualizar contadores de t_stats con la transición
+        old_report = update_response.get('Attributes')
+        if old_report:
+            if old_report.get('taken_at') and 'taken_at' in changes:
+                changes['taken_at'] = old_report['taken_at']
+            record_report_change(old_report, {**old_report, **changes})
+        bump_generation()
+        
         # Preparar mensaje de notificación
         lugar_nombre = report.get('lugar', {}).get('nombre', 'lugar desconocido')
         urgencia = report.get('urgencia', 'MEDIA')
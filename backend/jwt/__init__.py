@@ -1,3 +1,5 @@
+from typing import TYPE_CHECKING, Any
+
 from .api_jwk import PyJWK, PyJWKSet
 from .api_jws import (
     PyJWS,
@@ -25,7 +27,9 @@ from .exceptions import (
     PyJWKSetError,
     PyJWTError,
 )
-from .jwks_client import PyJWKClient
+
+if TYPE_CHECKING:
+    from .jwks_client import PyJWKClient
 
 __version__ = "2.10.1"
 
@@ -42,6 +46,16 @@ __license__ = "MIT"
 __copyright__ = "Copyright 2015-2022 José Padilla"
 
 
+def __getattr__(name: str) -> Any:
+    # PyJWKClient pulls in urllib.request (and with it http.client, ssl and
+    # email): it is imported the first time it is accessed
+    if name == "PyJWKClient":
+        from .jwks_client import PyJWKClient
+
+        return PyJWKClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "PyJWS",
     "PyJWT",
@@ -8,7 +8,8 @@ from typing import TYPE_CHECKING, Any
 
 from .algorithms import (
     Algorithm,
-    get_default_algorithms,
+    get_crypto_algorithms,
+    get_hmac_algorithms,
     has_crypto,
     requires_cryptography,
 )
@@ -34,10 +35,16 @@ class PyJWS:
         algorithms: Sequence[str] | None = None,
         options: dict[str, Any] | None = None,
     ) -> None:
-        self._algorithms = get_default_algorithms()
+        self._algorithms = get_hmac_algorithms()
+        crypto_algs = requires_cryptography if has_crypto else set()
         self._valid_algs = (
-            set(algorithms) if algorithms is not None else set(self._algorithms)
+            set(algorithms)
+            if algorithms is not None
+            else set(self._algorithms) | crypto_algs
         )
+        # Whitelisted cryptography algorithms, registered on first use (see
+        # _load_crypto_algorithms) so that importing cryptography is deferred
+        self._pending_algs = self._valid_algs & crypto_algs
 
         # Remove algorithms that aren't on the whitelist
         for key in list(self._algorithms.keys()):
@@ -56,7 +63,7 @@ class PyJWS:
         """
         Registers a new Algorithm for use when creating and verifying tokens.
         """
-        if alg_id in self._algorithms:
+        if alg_id in self._algorithms or alg_id in self._pending_algs:
             raise ValueError("Algorithm already has a handler.")
 
         if not isinstance(alg_obj, Algorithm):
@@ -70,6 +77,11 @@ class PyJWS:
         Unregisters an Algorithm for use when creating and verifying tokens
         Throws KeyError if algorithm is not registered.
         """
+        if alg_id in self._pending_algs:
+            self._pending_algs.remove(alg_id)
+            self._valid_algs.remove(alg_id)
+            return
+
         if alg_id not in self._algorithms:
             raise KeyError(
                 "The specified algorithm could not be removed"
@@ -79,6 +91,15 @@ class PyJWS:
         del self._algorithms[alg_id]
         self._valid_algs.remove(alg_id)
 
+    def _load_crypto_algorithms(self) -> None:
+        """
+        Registers the whitelisted algorithms that require cryptography.
+        """
+        for alg_id, alg_obj in get_crypto_algorithms().items():
+            if alg_id in self._pending_algs:
+                self._algorithms[alg_id] = alg_obj
+        self._pending_algs.clear()
+
     def get_algorithms(self) -> list[str]:
         """
         Returns a list of supported values for the 'alg' parameter.
@@ -93,6 +114,9 @@ class PyJWS:
 
         >>> jws_obj.get_algorithm_by_name("RS256")
         """
+        if alg_name in self._pending_algs:
+            self._load_crypto_algorithms()
+
         try:
             return self._algorithms[alg_name]
         except KeyError as e:
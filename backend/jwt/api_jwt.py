@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Any
 
 from . import api_jws
+from .decoded_token_cache import DecodedTokenCache
 from .exceptions import (
     DecodeError,
     ExpiredSignatureError,
@@ -27,10 +28,18 @@ if TYPE_CHECKING:
 
 
 class PyJWT:
-    def __init__(self, options: dict[str, Any] | None = None) -> None:
+    def __init__(
+        self,
+        options: dict[str, Any] | None = None,
+        decoded_cache_size: int = 0,
+    ) -> None:
         if options is None:
             options = {}
         self.options: dict[str, Any] = {**self._get_default_options(), **options}
+        # Tokens already verified with a given key (0 disables the cache)
+        self._decoded_cache: DecodedTokenCache | None = (
+            DecodedTokenCache(decoded_cache_size) if decoded_cache_size > 0 else None
+        )
 
     @staticmethod
     def _get_default_options() -> dict[str, bool | list[str]]:
@@ -153,14 +162,30 @@ class PyJWT:
             options.setdefault("verify_sub", False)
             options.setdefault("verify_jti", False)
 
-        decoded = api_jws.decode_complete(
-            jwt,
-            key=key,
-            algorithms=algorithms,
-            options=options,
-            detached_payload=detached_payload,
+        cache_key = self._decoded_cache_key(
+            jwt, key, algorithms, options, detached_payload
         )
-
+        cached = (
+            self._decoded_cache.get(cache_key) if cache_key is not None else None
+        )
+        if cached is not None:
+            # Signature already verified for this token and key: header and
+            # payload are parsed again from JSON, so callers never share objects
+            # with the cache, and the claims are validated again
+            decoded = {
+                "header": json.loads(cached["header"]),
+                "signature": cached["signature"],
+                "payload": cached["payload"],
+            }
+        else:
+            decoded = api_jws.decode_complete(
+                jwt,
+                key=key,
+                algorithms=algorithms,
+                options=options,
+                detached_payload=detached_payload,
+            )
+        raw_payload = decoded["payload"]
         payload = self._decode_payload(decoded)
 
         merged_options = {**self.options, **options}
@@ -174,8 +199,41 @@ class PyJWT:
         )
 
         decoded["payload"] = payload
+        if cache_key is not None and cached is None:
+            self._decoded_cache.put(
+                cache_key,
+                {
+                    "header": json.dumps(decoded["header"]),
+                    "signature": decoded["signature"],
+                    "payload": raw_payload,
+                },
+                exp=payload.get("exp"),
+            )
         return decoded
 
+    def _decoded_cache_key(
+        self,
+        jwt: str | bytes,
+        key: Any,
+        algorithms: Sequence[str] | None,
+        options: dict[str, Any],
+        detached_payload: bytes | None,
+    ) -> tuple[Any, ...] | None:
+        """
+        Key of the decoded-token cache, or None when the decode must not be
+        cached: cache disabled, signature not verified, detached payloads or
+        keys that are not plain secrets (str/bytes).
+        """
+        if (
+            self._decoded_cache is None
+            or not options["verify_signature"]
+            or detached_payload is not None
+            or not isinstance(key, (str, bytes))
+            or not isinstance(jwt, (str, bytes))
+        ):
+            return None
+        return (jwt, key, tuple(algorithms) if algorithms is not None else None)
+
     def _decode_payload(self, decoded: dict[str, Any]) -> Any:
         """
         Decode the payload from a JWS dictionary (payload, signature, header).
@@ -427,7 +485,8 @@ class PyJWT:
                 raise InvalidIssuerError("Invalid issuer")
 
 
-_jwt_global_obj = PyJWT()
+# The module-level functions keep up to 1024 verified tokens (see DecodedTokenCache)
+_jwt_global_obj = PyJWT(decoded_cache_size=1024)
 encode = _jwt_global_obj.encode
 decode_complete = _jwt_global_obj.decode_complete
 decode = _jwt_global_obj.decode
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class DecodedTokenCache:
+    """
+    Bounded LRU cache of tokens whose signature was already verified.
+
+    Maps (token, key, algorithms) to the JSON-encoded header, the signature and
+    the raw payload, so a token presented again skips signature verification.
+    Callers parse header and payload on every hit and never share them with
+    the cache. Claims (exp, nbf, aud, ...) are still validated by
+    the caller on every decode; an entry is also dropped once ``exp`` has passed.
+    """
+
+    def __init__(self, max_size: int = 1024, default_lifespan: float = 300) -> None:
+        self.max_size = max_size
+        # Lifespan of entries for tokens without an "exp" claim (seconds)
+        self.default_lifespan = default_lifespan
+        self._entries: OrderedDict[Hashable, tuple[dict[str, Any], float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cache_key: Hashable) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                decoded, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(cache_key)
+                    self.hits += 1
+                    return decoded
+                del self._entries[cache_key]
+            self.misses += 1
+            return None
+
+    def put(
+        self, cache_key: Hashable, decoded: dict[str, Any], exp: Any = None
+    ) -> None:
+        if self.max_size <= 0:
+            return
+        try:
+            expires_at = float(exp)
+        except (TypeError, ValueError):
+            expires_at = time.time() + self.default_lifespan
+        with self._lock:
+            self._entries[cache_key] = (decoded, expires_at)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,16 +1,11 @@
 import base64
 import binascii
 import re
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 
-try:
+if TYPE_CHECKING:
+    # cryptography is imported by the signature helpers below when first used
     from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurve
-    from cryptography.hazmat.primitives.asymmetric.utils import (
-        decode_dss_signature,
-        encode_dss_signature,
-    )
-except ModuleNotFoundError:
-    pass
 
 
 def force_bytes(value: Union[bytes, str]) -> bytes:
@@ -75,6 +70,8 @@ def der_to_raw_signature(der_sig: bytes, curve: "EllipticCurve") -> bytes:
     num_bits = curve.key_size
     num_bytes = (num_bits + 7) // 8
 
+    from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
     r, s = decode_dss_signature(der_sig)
 
     return number_to_bytes(r, num_bytes) + number_to_bytes(s, num_bytes)
@@ -90,6 +87,8 @@ def raw_to_der_signature(raw_sig: bytes, curve: "EllipticCurve") -> bytes:
     r = bytes_to_number(raw_sig[:num_bytes])
     s = bytes_to_number(raw_sig[num_bytes:])
 
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
     return bytes(encode_dss_signature(r, s))
 
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Elimina el atributo assigned_to de los reportes que lo tienen en NULL (o vacío).
+
+El sendReport original guardaba assigned_to = None en los reportes sin tomar.
+AssignedUpdatedIndex usa assigned_to como clave de partición (String): DynamoDB
+rechaza crear el índice mientras haya items con otro tipo en ese atributo, y
+también cualquier escritura posterior sobre esos items. Ejecutar ANTES del
+deploy que agrega AssignedUpdatedIndex (resources/dynamodb-tables.yml); es
+idempotente, así que puede repetirse si el deploy falla.
+
+Uso:
+    python scripts/backfill_assigned_to.py [--dry-run]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from botocore.exceptions import ClientError
+from utils.dynamo import dynamodb
+
+reports_table = dynamodb.Table('t_reportes')
+
+# assigned_to presente pero no utilizable como clave del índice
+INVALID_ASSIGNEE = "attribute_type(assigned_to, :null) OR assigned_to = :empty"
+INVALID_VALUES = {':null': 'NULL', ':empty': ''}
+
+
+def scan_invalid_ids():
+    """id_reporte de los reportes con assigned_to NULL o vacío"""
+    params = {
+        'ProjectionExpression': 'id_reporte',
+        'FilterExpression': INVALID_ASSIGNEE,
+        'ExpressionAttributeValues': INVALID_VALUES
+    }
+    while True:
+        response = reports_table.scan(**params)
+        yield from (item['id_reporte'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+
+    print("🔍 Buscando reportes con assigned_to NULL...")
+    fixed = skipped = 0
+    for report_id in scan_invalid_ids():
+        if dry_run:
+            print(f"   {report_id}")
+            fixed += 1
+            continue
+        try:
+            # La condición evita borrar un assigned_to que alguien asignó durante el recorrido
+            reports_table.update_item(
+                Key={'id_reporte': report_id},
+                UpdateExpression='REMOVE assigned_to',
+                ConditionExpression=INVALID_ASSIGNEE,
+                ExpressionAttributeValues=INVALID_VALUES
+            )
+            fixed += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            skipped += 1
+
+    action = 'a corregir' if dry_run else 'corregidos'
+    print(f"✅ {fixed} reportes {action}" + (f", {skipped} ya asignados durante el recorrido" if skipped else ""))
+
+
+if __name__ == '__main__':
+    main()
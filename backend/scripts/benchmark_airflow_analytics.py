@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Benchmark de getAirflowAnalytics.calculate_airflow_analytics: implementación
+anterior (list comprehensions sobre dicts, `reduced` cuadrático) vs el motor
+columnar NumPy (utils/report_columns.py). Mide también la conversión a columnas
+por separado y verifica que ambas versiones devuelvan las mismas métricas.
+
+Uso:
+    python scripts/benchmark_airflow_analytics.py [cantidad_reportes ...]   (default: 1000 5000 20000)
+"""
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from functions.getAirflowAnalytics import calculate_airflow_analytics, ANALYTICS_COLUMNS
+from utils.report_columns import to_columns
+
+SECTORES = ['Mantenimiento', 'Seguridad', 'Limpieza', 'Servicios']
+URGENCIAS = ['BAJA', 'MEDIA', 'ALTA']
+PALABRAS = ['robo', 'fuga de agua', 'incendio', 'daño', 'sistema roto', 'luz', 'puerta', 'emergencia', 'electricidad']
+
+
+def build_dataset(n, seed=7):
+    """Genera n reportes con la forma de t_reportes (tal como los devuelve DynamoDB)"""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    authorities = [f'auth-{i}' for i in range(40)]
+
+    reports = []
+    for i in range(n):
+        created = now - timedelta(minutes=rnd.randint(0, 30 * 24 * 60))
+        estado = rnd.choice(['PENDIENTE', 'ATENDIENDO', 'RESUELTO'])
+        report = {
+            'id_reporte': f'r{i}',
+            'estado': estado,
+            'urgencia': rnd.choice(URGENCIAS),
+            'assigned_sector': rnd.choice(SECTORES),
+            'created_at': created.isoformat() + 'Z',
+            'updated_at': (created + timedelta(minutes=rnd.randint(0, 40))).isoformat() + 'Z',
+            'descripcion': ' y '.join(rnd.sample(PALABRAS, rnd.randint(1, 3))).capitalize()
+        }
+        if estado != 'PENDIENTE':
+            report['assigned_to'] = rnd.choice(authorities)
+        if estado == 'RESUELTO':
+            report['resolved_at'] = (created + timedelta(minutes=rnd.randint(5, 96 * 60))).isoformat() + 'Z'
+        if rnd.random() < 0.8:
+            report['clasificacion_auto'] = True
+            report['urgencia_original'] = report['urgencia']
+            report['urgencia_clasificada'] = rnd.choice(URGENCIAS)
+            report['classification_score'] = Decimal(str(round(rnd.random(), 2)))
+            if rnd.random() < 0.4:
+                report['notification_sent'] = True
+                report['notification_sent_at'] = (created + timedelta(minutes=rnd.randint(0, 40))).isoformat() + 'Z'
+        reports.append(report)
+    return reports
+
+
+# --- Implementación anterior, como referencia ---
+
+def legacy_calculate_airflow_analytics(reports, period, start_date, end_date):
+    """Versión anterior: listas de dicts, con `r not in elevated` cuadrático"""
+    # Convertir Decimal a tipos nativos
+    reports = decimal_to_native(reports)
+    
+    total_reports = len(reports)
+    ml_reports = [r for r in reports if r.get('clasificacion_auto')]
+    pending_ml = [r for r in reports if not r.get('clasificacion_auto')]
+    
+    # 1. Procesamiento de Airflow
+    processing_rate = (len(ml_reports) / total_reports * 100) if total_reports > 0 else 0
+    
+    # Calcular tiempo promedio de procesamiento
+    processing_times = []
+    for r in ml_reports:
+        if r.get('created_at') and r.get('updated_at'):
+            try:
+                created = datetime.fromisoformat(r['created_at'].replace('Z', '+00:00'))
+                updated = datetime.fromisoformat(r['updated_at'].replace('Z', '+00:00'))
+                minutes = (updated - created).total_seconds() / 60
+                if 0 < minutes < 30:  # Filtrar outliers
+                    processing_times.append(minutes)
+            except:
+                pass
+    
+    avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else 0
+    
+    # 2. Clasificación ML
+    scores = [r.get('classification_score', 0) for r in ml_reports if r.get('classification_score')]
+    avg_score = sum(scores) / len(scores) if scores else 0
+    
+    high_conf = len([s for s in scores if s >= 0.7])
+    medium_conf = len([s for s in scores if 0.4 <= s < 0.7])
+    low_conf = len([s for s in scores if s < 0.4])
+    
+    # 3. Reclasificaciones
+    reclassified = [
+        r for r in ml_reports 
+        if r.get('urgencia_original') and r.get('urgencia_clasificada')
+        and r.get('urgencia_original') != r.get('urgencia_clasificada')
+    ]
+    
+    elevated = [
+        r for r in reclassified 
+        if urgency_level(r['urgencia_clasificada']) > urgency_level(r['urgencia_original'])
+    ]
+    reduced = [r for r in reclassified if r not in elevated]
+    
+    # Contar cambios específicos
+    changes_count = Counter()
+    for r in reclassified:
+        orig = r.get('urgencia_original')
+        clasif = r.get('urgencia_clasificada')
+        key = f"{orig}_to_{clasif}"
+        changes_count[key] += 1
+    
+    # 4. Comparación de urgencias
+    original_dist = {'BAJA': 0, 'MEDIA': 0, 'ALTA': 0}
+    classified_dist = {'BAJA': 0, 'MEDIA': 0, 'ALTA': 0}
+    
+    for r in ml_reports:
+        if r.get('urgencia_original'):
+            original_dist[r['urgencia_original']] += 1
+        if r.get('urgencia_clasificada'):
+            classified_dist[r['urgencia_clasificada']] += 1
+    
+    # Calcular impacto en ALTA urgencias
+    original_alta = original_dist['ALTA']
+    classified_alta = classified_dist['ALTA']
+    if original_alta > 0:
+        alta_increase = ((classified_alta - original_alta) / original_alta * 100)
+        if alta_increase > 0:
+            impact_message = f"+{int(alta_increase)}% más urgencias ALTA detectadas por ML"
+        else:
+            impact_message = f"{int(alta_increase)}% cambio en urgencias ALTA"
+    else:
+        if classified_alta > 0:
+            impact_message = f"{classified_alta} urgencias ALTA detectadas por ML"
+        else:
+            impact_message = "Sin urgencias ALTA en el período"
+    
+    # 5. Notificaciones automáticas
+    notified = [r for r in ml_reports if r.get('notification_sent')]
+    high_urgency_notif = [r for r in notified if r.get('urgencia_clasificada') == 'ALTA']
+    high_score_notif = [
+        r for r in notified 
+        if r.get('classification_score', 0) >= 0.7 and r.get('urgencia_clasificada') != 'ALTA'
+    ]
+    
+    # Tiempo promedio de notificación
+    notif_times = []
+    for r in notified:
+        if r.get('created_at') and r.get('notification_sent_at'):
+            try:
+                created = datetime.fromisoformat(r['created_at'].replace('Z', '+00:00'))
+                notif = datetime.fromisoformat(r['notification_sent_at'].replace('Z', '+00:00'))
+                minutes = (notif - created).total_seconds() / 60
+                if 0 < minutes < 30:
+                    notif_times.append(minutes)
+            except:
+                pass
+    
+    avg_notif_time = sum(notif_times) / len(notif_times) if notif_times else 0
+    
+    # 6. Keywords detectadas
+    high_risk_kw = ['robo', 'violencia', 'seguridad', 'fuego', 'incendio', 'emergencia']
+    medium_risk_kw = ['fuga', 'agua', 'electricidad', 'daño', 'roto', 'sistema']
+    
+    keyword_counts = Counter()
+    keyword_risk = {}
+    
+    for r in ml_reports:
+        desc = (r.get('descripcion') or '').lower()
+        for kw in high_risk_kw:
+            if kw in desc:
+                keyword_counts[kw] += 1
+                keyword_risk[kw] = 'high'
+        for kw in medium_risk_kw:
+            if kw in desc:
+                keyword_counts[kw] += 1
+                keyword_risk[kw] = 'medium'
+    
+    top_keywords = [
+        {
+            'keyword': kw,
+            'count': count,
+            'risk_level': keyword_risk.get(kw, 'medium')
+        }
+        for kw, count in keyword_counts.most_common(10)
+    ]
+    
+    # 7. Métricas de impacto
+    authorities_notified = len(set([r.get('assigned_to') for r in notified if r.get('assigned_to')]))
+    
+    # Calcular mejora en respuesta (reportes con alta confianza se resuelven más rápido)
+    high_conf_reports = [r for r in ml_reports if r.get('classification_score', 0) >= 0.7]
+    low_conf_reports = [r for r in ml_reports if r.get('classification_score', 0) < 0.7]
+    
+    high_conf_resolved = [r for r in high_conf_reports if r.get('estado') == 'RESUELTO']
+    low_conf_resolved = [r for r in low_conf_reports if r.get('estado') == 'RESUELTO']
+    
+    response_improvement = "N/A"
+    if len(high_conf_resolved) > 0 and len(low_conf_resolved) > 0:
+        # Calcular tiempo promedio de resolución
+        high_times = []
+        for r in high_conf_resolved:
+            if r.get('created_at') and r.get('resolved_at'):
+                try:
+                    created = datetime.fromisoformat(r['created_at'].replace('Z', '+00:00'))
+                    resolved = datetime.fromisoformat(r['resolved_at'].replace('Z', '+00:00'))
+                    hours = (resolved - created).total_seconds() / 3600
+                    if 0 < hours < 72:  # Filtrar outliers (menos de 3 días)
+                        high_times.append(hours)
+                except:
+                    pass
+        
+        low_times = []
+        for r in low_conf_resolved:
+            if r.get('created_at') and r.get('resolved_at'):
+                try:
+                    created = datetime.fromisoformat(r['created_at'].replace('Z', '+00:00'))
+                    resolved = datetime.fromisoformat(r['resolved_at'].replace('Z', '+00:00'))
+                    hours = (resolved - created).total_seconds() / 3600
+                    if 0 < hours < 72:
+                        low_times.append(hours)
+                except:
+                    pass
+        
+        if high_times and low_times:
+            avg_high = sum(high_times) / len(high_times)
+            avg_low = sum(low_times) / len(low_times)
+            improvement = ((avg_low - avg_high) / avg_low * 100)
+            if improvement > 0:
+                response_improvement = f"{int(improvement)}%"
+    
+    return {
+        'period': period,
+        'date_range': {
+            'from': start_date,
+            'to': end_date
+        },
+        'airflow_processing': {
+            'total_reports': total_reports,
+            'processed_by_ml': len(ml_reports),
+            'pending_classification': len(pending_ml),
+            'processing_rate': round(processing_rate, 1),
+            'avg_processing_time_minutes': round(avg_processing_time, 1)
+        },
+        'ml_classification': {
+            'avg_confidence_score': round(avg_score, 2),
+            'confidence_distribution': {
+                'high': high_conf,
+                'medium': medium_conf,
+                'low': low_conf
+            }
+        },
+        'urgency_reclassification': {
+            'total_reclassified': len(reclassified),
+            'reclassification_rate': round(len(reclassified) / len(ml_reports) * 100, 1) if ml_reports else 0,
+            'changes': {
+                'elevated': len(elevated),
+                'reduced': len(reduced),
+                'elevation_rate': round(len(elevated) / len(reclassified) * 100, 1) if reclassified else 0
+            },
+            'by_original_urgency': dict(changes_count)
+        },
+        'urgency_comparison': {
+            'original': original_dist,
+            'classified': classified_dist,
+            'impact': impact_message
+        },
+        'automated_notifications': {
+            'total_sent': len(notified),
+            'notification_rate': round(len(notified) / len(ml_reports) * 100, 1) if ml_reports else 0,
+            'by_reason': {
+                'high_urgency': len(high_urgency_notif),
+                'high_confidence': len(high_score_notif)
+            },
+            'avg_notification_time_minutes': round(avg_notif_time, 1)
+        },
+        'top_detected_keywords': top_keywords,
+        'impact_metrics': {
+            'reports_prioritized': len(elevated),
+            'authorities_notified': authorities_notified,
+            'avg_response_improvement': response_improvement
+        }
+    }
+
+
+def urgency_level(urgency):
+    """Convierte urgencia a nivel numérico para comparación"""
+    levels = {'BAJA': 1, 'MEDIA': 2, 'ALTA': 3}
+    return levels.get(urgency, 0)
+
+
+def decimal_to_native(obj):
+    """Convierte objetos Decimal de DynamoDB a tipos nativos de Python"""
+    if isinstance(obj, list):
+        return [decimal_to_native(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: decimal_to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        else:
+            return float(obj)
+    else:
+        return obj
+
+
+def timed(fn, repeat=3):
+    """Mejor tiempo (segundos) de repeat ejecuciones y el último resultado"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000]
+    start_date = (datetime.utcnow() - timedelta(days=30)).isoformat() + 'Z'
+    end_date = datetime.utcnow().isoformat() + 'Z'
+
+    print(f"{'reportes':>9} {'anterior':>12} {'columnas':>12} {'métricas':>12} {'total':>12} {'speedup':>8}")
+    for n in sizes:
+        reports = build_dataset(n)
+        legacy_time, legacy_result = timed(
+            lambda: legacy_calculate_airflow_analytics(reports, 'month', start_date, end_date), repeat=1
+        )
+        columns_time, columns = timed(lambda: to_columns(reports, ANALYTICS_COLUMNS))
+        metrics_time, result = timed(lambda: calculate_airflow_analytics(columns, 'month', start_date, end_date))
+        if legacy_result != result:
+            print(f"❌ {n}: los resultados no coinciden")
+            print(legacy_result)
+            print(result)
+            sys.exit(1)
+        total = columns_time + metrics_time
+        print(f"{n:>9} {legacy_time * 1000:>9.1f} ms {columns_time * 1000:>9.1f} ms "
+              f"{metrics_time * 1000:>9.1f} ms {total * 1000:>9.1f} ms {legacy_time / total:>7.1f}x")
+
+    print("✅ Métricas idénticas en todos los tamaños")
+
+
+if __name__ == '__main__':
+    main()
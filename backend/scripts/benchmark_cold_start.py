@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark del tiempo de import en frío de utils.jwt_validator (lo importan todas
+las Lambdas que validan tokens).
+
+Cada medición lanza un intérprete nuevo, como un cold start, y compara:
+    - antes: importando además lo que el paquete jwt cargaba siempre
+             (jwt.crypto_algorithms con cryptography y jwt.jwks_client con urllib.request)
+    - ahora: solo el módulo; RSA/EC/EdDSA y PyJWKClient se importan al primer uso
+
+Uso:
+    python scripts/benchmark_cold_start.py [modulo ...]   (default: utils.jwt_validator jwt)
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+EAGER_MODULES = ['jwt.jwks_client'] + (
+    ['jwt.crypto_algorithms'] if importlib.util.find_spec('cryptography') else []
+)
+RUNS = 15
+
+# Se ejecuta en el intérprete nuevo: imprime los ms del import y si se cargaron
+# los módulos pesados
+PROBE = """
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, 'cryptography' in sys.modules, 'urllib.request' in sys.modules)
+"""
+
+
+def cold_import(modules):
+    """(mediana en ms, cargó cryptography, cargó urllib.request) o None si falla el import"""
+    env = {**os.environ, 'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')}
+    samples = []
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(modules=modules)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"   ⚠️ no se pudo importar {', '.join(modules)}: {result.stderr.strip().splitlines()[-1]}")
+            return None
+        elapsed, crypto, urllib_request = result.stdout.split()
+        samples.append(float(elapsed))
+    samples.sort()
+    return samples[len(samples) // 2], crypto == 'True', urllib_request == 'True'
+
+
+def main():
+    modules = sys.argv[1:] or ['utils.jwt_validator', 'jwt']
+
+    for module in modules:
+        print(f"\n🧊 import {module} ({RUNS} intérpretes nuevos)")
+        before = cold_import([module] + EAGER_MODULES)
+        now = cold_import([module])
+        if before is None or now is None:
+            continue
+        for label, (ms, crypto, urllib_request) in (('antes', before), ('ahora', now)):
+            print(f"   {label:<6} {ms:>8.2f}ms   cryptography={'sí' if crypto else 'no'}"
+                  f"   urllib.request={'sí' if urllib_request else 'no'}")
+        print(f"   ahorro: {before[0] - now[0]:.2f}ms por cold start")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la compresión de respuestas (utils.jwt_validator.compress_response)
+sobre una página de 100 reportes como la que devuelve GET /reports: resumen
+enriquecido con lugar, nombres y URL firmada de la imagen.
+
+Mide por encoding y nivel los bytes que recibe el cliente (API Gateway
+decodifica el base64), el payload de la Lambda (base64, cuenta para el límite
+de 6 MB) y el tiempo de compresión, y estima la latencia total (compresión +
+transferencia) para algunos anchos de banda típicos de clientes móviles y de campus.
+
+Uso:
+    python scripts/benchmark_compression.py [tamaño_página ...]   (default: 100)
+"""
+
+import base64
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from utils.jwt_validator import create_response, compress_body, compress_response, COMPRESSION_MIN_SIZE
+
+SECTORES = ['Mantenimiento', 'Seguridad', 'Limpieza', 'Servicios']
+TIPOS = ['baño', 'aula', 'laboratorio', 'estacionamiento', 'cafeteria']
+PALABRAS = ['fuga de agua', 'puerta rota', 'luz quemada', 'olor a gas', 'proyector sin señal',
+            'silla dañada', 'enchufe suelto', 'ventana trabada', 'basura acumulada']
+NOMBRES = ['Ana Torres', 'Luis Paredes', 'María Quispe', 'Jorge Salas', 'Carla Rojas']
+
+# Anchos de banda del cliente (Mbps)
+BANDWIDTHS = {'3G (2 Mbps)': 2, '4G (10 Mbps)': 10, 'WiFi (50 Mbps)': 50}
+
+
+def fake_presigned_url(key, rnd):
+    """URL con la forma de una URL firmada SigV4 (la firma es aleatoria: no comprime)"""
+    signature = ''.join(rnd.choice('0123456789abcdef') for _ in range(64))
+    return (
+        f'https://utec-alerta-dev-bucket-of-hack-utec.s3.amazonaws.com/{key}'
+        f'?X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Credential=ASIAEXAMPLE%2F20251101%2Fus-east-1%2Fs3%2Faws4_request'
+        f'&X-Amz-Date=20251101T130000Z&X-Amz-Expires=3600&X-Amz-SignedHeaders=host&X-Amz-Signature={signature}'
+    )
+
+
+def build_page(size, seed=7):
+    """Body de GET /reports con `size` reportes resumidos y enriquecidos"""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    reports = []
+    for i in range(size):
+        created = now - timedelta(minutes=rnd.randint(0, 7 * 24 * 60))
+        report_id = str(uuid.UUID(int=rnd.getrandbits(128)))
+        estado = rnd.choice(['PENDIENTE', 'ATENDIENDO', 'RESUELTO'])
+        report = {
+            'id_reporte': report_id,
+            'estado': estado,
+            'urgencia': rnd.choice(['BAJA', 'MEDIA', 'ALTA']),
+            'assigned_sector': rnd.choice(SECTORES),
+            'author_id': str(uuid.UUID(int=rnd.getrandbits(128))),
+            'created_at': created.isoformat() + 'Z',
+            'updated_at': (created + timedelta(minutes=rnd.randint(0, 600))).isoformat() + 'Z',
+            'lugar': {
+                'id': f'lugar-{rnd.randint(1, 200)}',
+                'name': f'{rnd.choice(TIPOS).capitalize()} {rnd.randint(100, 999)}',
+                'type': rnd.choice(TIPOS),
+                'tower': f'T{rnd.randint(1, 4)}',
+                'floor': rnd.randint(1, 11)
+            },
+            'descripcion': f'{rnd.choice(PALABRAS).capitalize()} en el piso {rnd.randint(1, 11)}',
+            'author_name': rnd.choice(NOMBRES)
+        }
+        if estado != 'PENDIENTE':
+            report['assigned_to'] = str(uuid.UUID(int=rnd.getrandbits(128)))
+            report['assigned_name'] = rnd.choice(NOMBRES)
+        if rnd.random() < 0.6:
+            report['image_url'] = fake_presigned_url(f'reports/{report_id}.jpg', rnd)
+        reports.append(report)
+
+    return {
+        'reports': reports,
+        'pagination': {'page': 1, 'size': size, 'total_items': 1000, 'total_pages': 10},
+        'filters_applied': {}
+    }
+
+
+def time_call(fn, repeat=200):
+    """Mediana en milisegundos de `repeat` llamadas"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100]
+    for size in sizes:
+        body = build_page(size)
+        response = create_response(200, body)
+        data = response['body'].encode('utf-8')
+        raw_bytes = len(data)
+
+        print(f"\n📦 Página de {size} reportes: {raw_bytes:,} bytes de JSON")
+        print(f"   {'encoding':<12} {'nivel':>5} {'bytes':>9} {'base64':>9} {'ahorro':>7} {'compresión':>11}")
+
+        results = []
+        for encoding in ('gzip', 'deflate'):
+            for level in (1, 6, 9):
+                compressed = compress_body(data, encoding, level)
+                sent = len(base64.b64encode(compressed))
+                ms = time_call(lambda: compress_body(data, encoding, level))
+                results.append((encoding, level, len(compressed), ms))
+                print(f"   {encoding:<12} {level:>5} {len(compressed):>9,} {sent:>9,} "
+                      f"{(1 - len(compressed) / raw_bytes) * 100:>6.1f}% {ms:>9.2f}ms")
+
+        # Camino completo usado por los handlers (negociación + base64 + headers)
+        full_ms = time_call(lambda: compress_response(response, 'gzip, deflate, br'))
+        print(f"   compress_response (gzip nivel por defecto, con base64): {full_ms:.2f}ms")
+
+        print(f"\n   Latencia estimada (compresión + transferencia del body), umbral {COMPRESSION_MIN_SIZE} bytes:")
+        gzip_default = next(r for r in results if r[0] == 'gzip' and r[1] == 6)
+        for name, mbps in BANDWIDTHS.items():
+            bytes_per_ms = mbps * 1_000_000 / 8 / 1000
+            plain = raw_bytes / bytes_per_ms
+            compressed = gzip_default[3] + gzip_default[2] / bytes_per_ms
+            print(f"   {name:<16} sin comprimir {plain:>7.1f}ms | gzip {compressed:>7.1f}ms | "
+                  f"ahorro {plain - compressed:>6.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la deserialización de respuestas de DynamoDB (utils/dynamo.py).
+
+Compara, sobre una respuesta de query con N reportes en formato wire
+({'S': ...}, {'N': ...}, {'M': ...}):
+    - antes: TypeDeserializer de boto3 (Decimal) + decimal_to_native recursivo
+    - ahora: NativeTypeDeserializer (int/float en una sola pasada)
+
+Uso:
+    python scripts/benchmark_deserialization.py [cantidad_items ...]   (default: 100 1000)
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from boto3.dynamodb.types import TypeDeserializer
+from utils.dynamo import NativeTypeDeserializer
+
+
+def decimal_to_native(obj):
+    """Conversión que hacía cada handler antes de serializar (copia de referencia)"""
+    if isinstance(obj, list):
+        return [decimal_to_native(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: decimal_to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        else:
+            return float(obj)
+    else:
+        return obj
+
+
+def wire_item(rnd):
+    """Reporte de t_reportes tal como llega en la respuesta HTTP de DynamoDB"""
+    return {
+        'id_reporte': {'S': str(uuid.UUID(int=rnd.getrandbits(128)))},
+        'estado': {'S': rnd.choice(['PENDIENTE', 'ATENDIENDO', 'RESUELTO'])},
+        'urgencia': {'S': rnd.choice(['BAJA', 'MEDIA', 'ALTA'])},
+        'created_at': {'S': '2025-11-01T13:00:00Z'},
+        'updated_at': {'S': '2025-11-01T14:00:00Z'},
+        'classification_score': {'N': f'{rnd.random():.4f}'},
+        'lugar': {'M': {
+            'id': {'S': f'lugar-{rnd.randint(1, 200)}'},
+            'name': {'S': 'Aula 301'},
+            'type': {'S': 'aula'},
+            'tower': {'S': 'T1'},
+            'floor': {'N': str(rnd.randint(1, 11))}
+        }},
+        'historial': {'L': [
+            {'M': {'estado': {'S': 'PENDIENTE'}, 'at': {'S': '2025-11-01T13:00:00Z'}, 'orden': {'N': str(i)}}}
+            for i in range(3)
+        ]}
+    }
+
+
+def deserialize(items, deserializer):
+    return [{k: deserializer.deserialize(v) for k, v in item.items()} for item in items]
+
+
+def time_call(fn, repeat=30):
+    """Mediana en milisegundos de `repeat` llamadas"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000]
+    boto_deserializer = TypeDeserializer()
+    native_deserializer = NativeTypeDeserializer()
+    rnd = random.Random(7)
+
+    for size in sizes:
+        items = [wire_item(rnd) for _ in range(size)]
+        assert decimal_to_native(deserialize(items, boto_deserializer)) == deserialize(items, native_deserializer)
+
+        before = time_call(lambda: decimal_to_native(deserialize(items, boto_deserializer)))
+        native = time_call(lambda: deserialize(items, native_deserializer))
+        print(f"\n📦 {size} items")
+        print(f"   Decimal + decimal_to_native: {before:>8.2f}ms")
+        print(f"   NativeTypeDeserializer:      {native:>8.2f}ms  ({(1 - native / before) * 100:.0f}% menos)")
+
+
+if __name__ == '__main__':
+    main()
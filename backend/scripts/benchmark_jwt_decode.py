@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark del throughput de jwt.decode (paquete jwt incluido en el deploy).
+
+Decodifica un lote de tokens HS256 que se repiten (los mismos usuarios llamando
+varias veces a la API desde un contenedor caliente) y compara:
+    - antes:          sin caché de tokens y preparando el secreto en cada llamada
+    - clave preparada: HMACAlgorithm.prepare_key reutiliza el secreto ya preparado
+    - caché de tokens: además, PyJWT(decoded_cache_size=...) evita parsear y
+                       verificar la firma de tokens ya verificados (los claims
+                       se siguen validando en cada llamada)
+
+Uso:
+    python scripts/benchmark_jwt_decode.py [cantidad_tokens ...]   (default: 10 100)
+"""
+
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from jwt import api_jws
+from jwt.api_jwt import PyJWT
+
+SECRET = 'benchmark-secret-' + 'x' * 32
+DECODES = 20000
+
+
+def build_tokens(count):
+    """Tokens como los que emite auth.generate_jwt"""
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    return [
+        PyJWT().encode({
+            'user_id': str(uuid.uuid4()),
+            'email': f'user{i}@utec.edu.pe',
+            'role': 'estudiante',
+            'sector': None,
+            'first_name': 'Nombre',
+            'last_name': 'Apellido',
+            'token_version': 0,
+            'exp': exp,
+            'iat': datetime.now(timezone.utc)
+        }, SECRET, algorithm='HS256')
+        for i in range(count)
+    ]
+
+
+def decodes_per_second(decoder, tokens, reset_prepared_keys=False):
+    hmac_alg = api_jws.get_algorithm_by_name('HS256')
+    start = time.perf_counter()
+    for i in range(DECODES):
+        if reset_prepared_keys:
+            hmac_alg._prepared_keys.clear()
+        decoder.decode(tokens[i % len(tokens)], SECRET, algorithms=['HS256'])
+    return DECODES / (time.perf_counter() - start)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100]
+
+    for size in sizes:
+        tokens = build_tokens(size)
+        baseline = decodes_per_second(PyJWT(), tokens, reset_prepared_keys=True)
+        prepared = decodes_per_second(PyJWT(), tokens)
+        cached = decodes_per_second(PyJWT(decoded_cache_size=1024), tokens)
+
+        print(f"\n🔑 {size} tokens distintos, {DECODES:,} decodes")
+        print(f"   {'antes':<20} {baseline:>10,.0f} decodes/s")
+        print(f"   {'clave preparada':<20} {prepared:>10,.0f} decodes/s   ({prepared / baseline:.1f}x)")
+        print(f"   {'caché de tokens':<20} {cached:>10,.0f} decodes/s   ({cached / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la serialización de respuestas (utils/serialization.py) sobre
+listas grandes de reportes como las de GET /reports y GET /reports/airflow/analytics.
+
+Compara:
+    - antes: decimal_to_native recursivo + json.dumps (create_response original)
+    - json:   utils.serialization con la librería estándar (Decimal resuelto en default)
+    - orjson: utils.serialization con orjson (si está instalado)
+
+Cada variante se mide con reportes que traen Decimal (resource de boto3 sin
+utils.dynamo) y con reportes ya en tipos nativos (utils.dynamo).
+
+Uso:
+    python scripts/benchmark_serialization.py [cantidad_reportes ...]   (default: 1000 5000)
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from utils import serialization
+from benchmark_compression import build_page
+
+
+def decimal_to_native(obj):
+    """Conversión que hacía create_response antes de serializar (copia de referencia)"""
+    if isinstance(obj, list):
+        return [decimal_to_native(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: decimal_to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        else:
+            return float(obj)
+    else:
+        return obj
+
+
+def with_decimals(body):
+    """Misma página con los números como Decimal (lo que retorna el resource de boto3)"""
+    body = copy.deepcopy(body)
+    for report in body['reports']:
+        report['lugar']['floor'] = Decimal(report['lugar']['floor'])
+        report['classification_score'] = Decimal('0.8731')
+        report['historial'] = [{'estado': 'PENDIENTE', 'orden': Decimal(i)} for i in range(3)]
+    return body
+
+
+def native(body):
+    body = copy.deepcopy(body)
+    for report in body['reports']:
+        report['classification_score'] = 0.8731
+        report['historial'] = [{'estado': 'PENDIENTE', 'orden': i} for i in range(3)]
+    return body
+
+
+def time_call(fn, repeat=20):
+    """Mediana en milisegundos de `repeat` llamadas"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000]
+    backends = ['json'] + (['orjson'] if serialization.orjson is not None else [])
+    if serialization.orjson is None:
+        print("ℹ️ orjson no está instalado: solo se mide el backend json")
+
+    for size in sizes:
+        page = build_page(size)
+        decimal_page, native_page = with_decimals(page), native(page)
+        assert json.loads(serialization.dumps(decimal_page)) == json.loads(serialization.dumps(native_page))
+
+        baseline = time_call(lambda: json.dumps(decimal_to_native(decimal_page)))
+        body_bytes = len(json.dumps(decimal_to_native(decimal_page)).encode('utf-8'))
+        print(f"\n📦 {size} reportes ({body_bytes:,} bytes)")
+        print(f"   {'variante':<38} {'Decimal':>10} {'nativos':>10}")
+        native_baseline = time_call(lambda: json.dumps(decimal_to_native(native_page)))
+        print(f"   {'decimal_to_native + json.dumps':<38} {baseline:>8.2f}ms {native_baseline:>8.2f}ms")
+
+        previous = serialization.backend.name
+        for name in backends:
+            serialization.set_backend(name)
+            with_decimal_ms = time_call(lambda: serialization.dumps(decimal_page))
+            native_ms = time_call(lambda: serialization.dumps(native_page))
+            print(f"   {'serialization.dumps (' + name + ')':<38} {with_decimal_ms:>8.2f}ms {native_ms:>8.2f}ms"
+                  f"   ({baseline / native_ms:.1f}x vs antes)")
+        serialization.set_backend(previous)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Benchmark de getStats: builders multi-pasada anteriores (sobre el scan completo)
+vs builders sobre los contadores de t_stats (utils/stats_counters.py), armados
+fuera del tiempo medido con report_contribution, igual que scripts/rebuild_stats.py.
+Verifica que ambos generen las mismas estadísticas.
+
+Uso:
+    python scripts/benchmark_stats.py [cantidad_reportes]   (default: 100000)
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from functions.getStats import generate_student_stats, generate_authority_stats, generate_admin_stats
+from utils.stats_counters import report_contribution, to_counters
+
+SECTORES = ['Mantenimiento', 'Seguridad', 'Limpieza', 'Servicios']
+
+
+def build_dataset(n, seed=42):
+    """Genera n reportes con la forma de t_reportes"""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    authors = [str(uuid.UUID(int=rnd.getrandbits(128))) for _ in range(500)]
+    authorities = {s: [str(uuid.UUID(int=rnd.getrandbits(128))) for _ in range(10)] for s in SECTORES}
+
+    reports = []
+    for i in range(n):
+        created = now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60))
+        estado = rnd.choice(['PENDIENTE', 'ATENDIENDO', 'RESUELTO'])
+        sector = rnd.choice(SECTORES)
+        report = {
+            'id_reporte': f'r{i}',
+            'estado': estado,
+            'urgencia': rnd.choice(['BAJA', 'MEDIA', 'ALTA']),
+            'assigned_sector': sector,
+            'author_id': rnd.choice(authors),
+            'assigned_to': None,
+            'created_at': created.isoformat() + 'Z',
+            'resolved_at': None
+        }
+        if estado != 'PENDIENTE':
+            report['assigned_to'] = rnd.choice(authorities[sector])
+        if estado == 'RESUELTO':
+            report['resolved_at'] = (created + timedelta(minutes=rnd.randint(5, 72 * 60))).isoformat() + 'Z'
+        reports.append(report)
+    return reports, authors[0], SECTORES[0], authorities[SECTORES[0]][0]
+
+
+def counters_of(reports):
+    """Contadores de un grupo de reportes con el formato de un item de t_stats"""
+    item = {}
+    for report in reports:
+        for attr, value in report_contribution(report).items():
+            item[attr] = item.get(attr, 0) + value
+    return to_counters(item)
+
+
+def aggregate_of(reports, start_date):
+    """Bucket TOTAL y contadores del período de un grupo de reportes"""
+    return {
+        'all': counters_of(reports),
+        'period': counters_of([r for r in reports if r.get('created_at', '') >= start_date])
+    }
+
+
+# --- Implementación anterior (varias pasadas por estadística), como referencia ---
+
+def legacy_student_stats(user_id, reports_in_period, all_reports, period, start_date, now):
+    """Estadísticas para estudiantes: sus reportes + vista general"""
+    
+    # Mis reportes en el período
+    my_reports_period = [r for r in reports_in_period if r.get('author_id') == user_id]
+    my_reports_total = [r for r in all_reports if r.get('author_id') == user_id]
+    
+    # Contadores de mis reportes
+    my_pending = len([r for r in my_reports_total if r.get('estado') == 'PENDIENTE'])
+    my_in_progress = len([r for r in my_reports_total if r.get('estado') == 'ATENDIENDO'])
+    my_resolved = len([r for r in my_reports_total if r.get('estado') == 'RESUELTO'])
+    
+    # Estadísticas generales del sistema (para contexto)
+    total_system = len(reports_in_period)
+    system_by_urgencia = {
+        'BAJA': len([r for r in reports_in_period if r.get('urgencia') == 'BAJA']),
+        'MEDIA': len([r for r in reports_in_period if r.get('urgencia') == 'MEDIA']),
+        'ALTA': len([r for r in reports_in_period if r.get('urgencia') == 'ALTA'])
+    }
+    
+    return {
+        'role': 'student',
+        'period': period,
+        'date_range': {
+            'from': start_date,
+            'to': now.isoformat() + 'Z'
+        },
+        'my_reports': {
+            'total': len(my_reports_total),
+            'in_period': len(my_reports_period),
+            'pendiente': my_pending,
+            'atendiendo': my_in_progress,
+            'resuelto': my_resolved,
+            'by_urgencia': {
+                'BAJA': len([r for r in my_reports_total if r.get('urgencia') == 'BAJA']),
+                'MEDIA': len([r for r in my_reports_total if r.get('urgencia') == 'MEDIA']),
+                'ALTA': len([r for r in my_reports_total if r.get('urgencia') == 'ALTA'])
+            }
+        },
+        'system_overview': {
+            'total_reports_in_period': total_system,
+            'by_urgencia': system_by_urgencia
+        }
+    }
+
+
+def legacy_authority_stats(user_id, user_sector, reports_in_period, all_reports, period, start_date, now):
+    """Estadísticas para autoridades: reportes de su sector"""
+    
+    # Reportes de mi sector
+    sector_reports_period = [r for r in reports_in_period if r.get('assigned_sector') == user_sector]
+    sector_reports_total = [r for r in all_reports if r.get('assigned_sector') == user_sector]
+    
+    # Reportes asignados a mí
+    my_assigned_reports = [r for r in sector_reports_total if r.get('assigned_to') == user_id]
+    
+    # Contadores por estado (sector)
+    sector_pending = len([r for r in sector_reports_total if r.get('estado') == 'PENDIENTE'])
+    sector_in_progress = len([r for r in sector_reports_total if r.get('estado') == 'ATENDIENDO'])
+    sector_resolved = len([r for r in sector_reports_total if r.get('estado') == 'RESUELTO'])
+    
+    # Contadores por urgencia (sector)
+    sector_by_urgencia = {
+        'BAJA': len([r for r in sector_reports_period if r.get('urgencia') == 'BAJA']),
+        'MEDIA': len([r for r in sector_reports_period if r.get('urgencia') == 'MEDIA']),
+        'ALTA': len([r for r in sector_reports_period if r.get('urgencia') == 'ALTA'])
+    }
+    
+    # Mis reportes asignados por estado
+    my_pending = len([r for r in my_assigned_reports if r.get('estado') == 'PENDIENTE'])
+    my_in_progress = len([r for r in my_assigned_reports if r.get('estado') == 'ATENDIENDO'])
+    my_resolved = len([r for r in my_assigned_reports if r.get('estado') == 'RESUELTO'])
+    
+    return {
+        'role': 'authority',
+        'sector': user_sector,
+        'period': period,
+        'date_range': {
+            'from': start_date,
+            'to': now.isoformat() + 'Z'
+        },
+        'my_sector': {
+            'total_reports': len(sector_reports_total),
+            'in_period': len(sector_reports_period),
+            'pendiente': sector_pending,
+            'atendiendo': sector_in_progress,
+            'resuelto': sector_resolved,
+            'by_urgencia': sector_by_urgencia
+        },
+        'my_assigned': {
+            'total': len(my_assigned_reports),
+            'pendiente': my_pending,
+            'atendiendo': my_in_progress,
+            'resuelto': my_resolved
+        }
+    }
+
+
+def legacy_admin_stats(reports_in_period, all_reports, period, start_date, now):
+    """Estadísticas para administradores: vista completa del sistema"""
+    
+    # Totales
+    total_reports = len(all_reports)
+    total_in_period = len(reports_in_period)
+    
+    # Por estado
+    by_estado = {
+        'PENDIENTE': len([r for r in all_reports if r.get('estado') == 'PENDIENTE']),
+        'ATENDIENDO': len([r for r in all_reports if r.get('estado') == 'ATENDIENDO']),
+        'RESUELTO': len([r for r in all_reports if r.get('estado') == 'RESUELTO'])
+    }
+    
+    # Por urgencia (en período)
+    by_urgencia = {
+        'BAJA': len([r for r in reports_in_period if r.get('urgencia') == 'BAJA']),
+        'MEDIA': len([r for r in reports_in_period if r.get('urgencia') == 'MEDIA']),
+        'ALTA': len([r for r in reports_in_period if r.get('urgencia') == 'ALTA'])
+    }
+    
+    # Por sector
+    sectores = {}
+    for report in all_reports:
+        sector = report.get('assigned_sector', 'Sin asignar')
+        sectores[sector] = sectores.get(sector, 0) + 1
+    
+    # Por sector en período
+    sectores_period = {}
+    for report in reports_in_period:
+        sector = report.get('assigned_sector', 'Sin asignar')
+        sectores_period[sector] = sectores_period.get(sector, 0) + 1
+    
+    # Reportes sin asignar
+    unassigned = len([r for r in all_reports if r.get('assigned_to') is None])
+    
+    # Promedio de tiempo de resolución (solo resueltos)
+    resolved_reports = [r for r in all_reports if r.get('estado') == 'RESUELTO' and r.get('resolved_at') and r.get('created_at')]
+    avg_resolution_time = None
+    if resolved_reports:
+        total_time = 0
+        for r in resolved_reports:
+            try:
+                created = datetime.fromisoformat(r['created_at'].replace('Z', '+00:00'))
+                resolved = datetime.fromisoformat(r['resolved_at'].replace('Z', '+00:00'))
+                total_time += (resolved - created).total_seconds()
+            except:
+                pass
+        if len(resolved_reports) > 0:
+            avg_resolution_time = total_time / len(resolved_reports) / 3600  # En horas
+    
+    return {
+        'role': 'admin',
+        'period': period,
+        'date_range': {
+            'from': start_date,
+            'to': now.isoformat() + 'Z'
+        },
+        'summary': {
+            'total_reportes': total_reports,
+            'in_period': total_in_period,
+            'pendiente': by_estado['PENDIENTE'],
+            'atendiendo': by_estado['ATENDIENDO'],
+            'resuelto': by_estado['RESUELTO'],
+            'sin_asignar': unassigned
+        },
+        'by_urgencia': by_urgencia,
+        'by_sector': {
+            'total': sectores,
+            'in_period': sectores_period
+        },
+        'performance': {
+            'avg_resolution_time_hours': round(avg_resolution_time, 2) if avg_resolution_time else None,
+            'resolution_rate': round((by_estado['RESUELTO'] / total_reports * 100), 2) if total_reports > 0 else 0
+        }
+    }
+
+
+def timed(fn, repeat=3):
+    """Mejor tiempo (segundos) de repeat ejecuciones y el último resultado"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def without_percentiles(stats):
+    """Quita los percentiles (no existían en los builders anteriores) para comparar"""
+    if isinstance(stats, dict):
+        return {k: without_percentiles(v) for k, v in stats.items() if not k.startswith('percentiles')}
+    return stats
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"Generando {n} reportes sintéticos...")
+    reports, student_id, sector, authority_id = build_dataset(n)
+
+    now = datetime.utcnow()
+    start_date = (now - timedelta(days=30)).isoformat() + 'Z'
+    end_date = now.isoformat() + 'Z'
+
+    def legacy_period():
+        # El handler anterior filtraba el período antes de llamar a los builders
+        return [r for r in reports if r.get('created_at', '') >= start_date]
+
+    # Lo que cada rol lee ahora de t_stats, calculado fuera del tiempo medido
+    my_reports = [r for r in reports if r.get('author_id') == student_id]
+    sector_reports = [r for r in reports if r.get('assigned_sector') == sector]
+    admin_aggregate = aggregate_of(reports, start_date)
+    my_aggregate = aggregate_of(my_reports, start_date)
+    system_aggregate = {'period': admin_aggregate['period']}
+    sector_aggregate = aggregate_of(sector_reports, start_date)
+    my_assigned = counters_of([r for r in sector_reports if r.get('assigned_to') == authority_id])
+
+    cases = [
+        ('student',
+         lambda: legacy_student_stats(student_id, legacy_period(), reports, 'month', start_date, now),
+         lambda: generate_student_stats(my_aggregate, system_aggregate, 'month', start_date, end_date)),
+        ('authority',
+         lambda: legacy_authority_stats(authority_id, sector, legacy_period(), reports, 'month', start_date, now),
+         lambda: generate_authority_stats(authority_id, sector, sector_aggregate, my_assigned,
+                                          'month', start_date, end_date)),
+        ('admin',
+         lambda: legacy_admin_stats(legacy_period(), reports, 'month', start_date, now),
+         lambda: generate_admin_stats(admin_aggregate, {}, 'month', start_date, end_date)),
+    ]
+
+    print(f"{'rol':<10} {'reportes':>9} {'multi-pasada':>14} {'contadores':>12} {'speedup':>8}")
+    for role, legacy_fn, new_fn in cases:
+        legacy_time, legacy_result = timed(legacy_fn)
+        new_time, new_result = timed(new_fn)
+        if legacy_result != without_percentiles(new_result):
+            print(f"❌ {role}: los resultados no coinciden")
+            print(legacy_result)
+            print(new_result)
+            sys.exit(1)
+        print(f"{role:<10} {n:>9} "
+              f"{legacy_time * 1000:>11.1f} ms {new_time * 1000:>9.1f} ms {legacy_time / new_time:>7.1f}x")
+
+    print("✅ Resultados idénticos en los tres roles")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Genera o actualiza el snapshot columnar de t_reportes (utils/report_snapshot.py).
+Sirve para el backfill inicial antes de activar refreshSnapshot o para generar
+un snapshot local con el que probar analytics sin tocar S3.
+
+Uso:
+    python scripts/build_snapshot.py [--full] [--local RUTA]
+
+Sin --local usa SNAPSHOT_URI (s3://bucket/prefijo).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from utils.report_snapshot import (
+    get_snapshot_store, snapshot_store_from_uri, refresh_snapshot, read_manifest
+)
+
+
+def main():
+    args = sys.argv[1:]
+    full = '--full' in args
+    if '--local' in args:
+        store = snapshot_store_from_uri(args[args.index('--local') + 1])
+    else:
+        store = get_snapshot_store()
+    if store is None:
+        print("❌ Definir SNAPSHOT_URI o usar --local RUTA")
+        sys.exit(1)
+
+    print(f"📦 Actualizando snapshot en {store}...")
+    summary = refresh_snapshot(store, full=full)
+    manifest = read_manifest(store, use_cache=False)
+    rows = sum(entry['rows'] for entry in manifest['partitions'].values())
+    print(f"   modo: {summary['mode']}, reportes leídos: {summary['reports_read']}, "
+          f"particiones escritas: {summary['partitions_written']}")
+    print(f"✅ {len(manifest['partitions'])} particiones, {rows} reportes, watermark {summary['watermark']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Recalcula los contadores de t_stats (TOTAL y rollups por hora/día) recorriendo t_reportes.
+Ejecutar después del deploy que crea t_stats (backfill de los reportes existentes)
+o si los contadores quedaron desfasados por una escritura fallida.
+Conviene correrlo con poco tráfico: las escrituras que ocurran durante el
+recorrido pueden quedar contadas dos veces o ninguna.
+
+Uso:
+    python scripts/rebuild_stats.py [--dry-run]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from utils.stats_counters import dynamodb, stats_table, report_deltas
+
+reports_table = dynamodb.Table('t_reportes')
+
+
+def scan_all(table, **params):
+    """Itera todos los items de una tabla"""
+    response = table.scan(**params)
+    yield from response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **params)
+        yield from response.get('Items', [])
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+
+    print("📊 Recorriendo t_reportes...")
+    counters = {}
+    total_reports = 0
+    for report in scan_all(reports_table):
+        total_reports += 1
+        for item_key, deltas in report_deltas(None, report).items():
+            item = counters.setdefault(item_key, {})
+            for attr, value in deltas.items():
+                item[attr] = item.get(attr, 0) + value
+
+    print(f"   {total_reports} reportes -> {len(counters)} items de contadores")
+    if dry_run:
+        for stat_key, bucket in sorted(counters):
+            print(f"   {stat_key} {bucket}: {counters[(stat_key, bucket)]}")
+        return
+
+    # Items que ya no corresponden a ningún reporte (por ejemplo, sectores renombrados)
+    stale_keys = [
+        (item['stat_key'], item['bucket'])
+        for item in scan_all(stats_table, ProjectionExpression='stat_key, #b', ExpressionAttributeNames={'#b': 'bucket'})
+        if (item['stat_key'], item['bucket']) not in counters
+    ]
+
+    with stats_table.batch_writer() as batch:
+        for (stat_key, bucket), attrs in counters.items():
+            batch.put_item(Item={'stat_key': stat_key, 'bucket': bucket, **attrs})
+        for stat_key, bucket in stale_keys:
+            batch.delete_item(Key={'stat_key': stat_key, 'bucket': bucket})
+
+    print(f"✅ {len(counters)} items escritos, {len(stale_keys)} eliminados")
+
+
+if __name__ == '__main__':
+    main()
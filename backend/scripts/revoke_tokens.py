@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Revoca todos los tokens JWT emitidos para uno o más usuarios (por id o email).
+Usar después de cambiar a mano el rol, el sector o la contraseña de un usuario,
+o para cerrar las sesiones de una cuenta comprometida: los tokens actuales dejan
+de validar en todos los contenedores en unos segundos y el usuario debe volver
+a iniciar sesión (ver utils/token_revocation.py).
+
+Uso:
+    python scripts/revoke_tokens.py <user_id|email> [...]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from utils.token_revocation import users_table, revoke_user_tokens
+
+
+def resolve_user_id(value):
+    """user_id a partir de un id o un email (EmailIndex)"""
+    if '@' not in value:
+        return value
+    response = users_table.query(
+        IndexName='EmailIndex',
+        KeyConditionExpression='email = :email',
+        ExpressionAttributeValues={':email': value}
+    )
+    items = response.get('Items', [])
+    return items[0]['id'] if items else None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    for value in sys.argv[1:]:
+        user_id = resolve_user_id(value)
+        if user_id is None:
+            print(f"❌ {value}: usuario no encontrado")
+            continue
+        try:
+            version = revoke_user_tokens(user_id)
+        except users_table.meta.client.exceptions.ConditionalCheckFailedException:
+            print(f"❌ {value}: usuario no encontrado")
+            continue
+        print(f"✅ {value}: tokens revocados (token_version = {version})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Los tests importan los módulos del backend igual que las Lambdas (jwt, utils, functions)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
@@ -0,0 +1,70 @@
+"""BatchLoader: ProjectionExpression por tabla (los items de t_usuarios no traen el password)"""
+import pytest
+
+pytest.importorskip('boto3')
+
+from utils.batch_loader import BatchLoader
+from utils.cache import TTLCache
+
+USERS = {
+    'u1': {'id': 'u1', 'first_name': 'Ana', 'role': 'student', 'password': 'hash'},
+    'u2': {'id': 'u2', 'first_name': 'Luis', 'role': 'authority', 'password': 'hash'},
+}
+
+
+class FakeClient:
+    """batch_get_item que aplica la ProjectionExpression como DynamoDB"""
+
+    def __init__(self):
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        request = RequestItems['t_usuarios']
+        names = request.get('ExpressionAttributeNames')
+        items = []
+        for key in request['Keys']:
+            item = USERS.get(key['id'])
+            if item is None:
+                continue
+            if names:
+                item = {a: item[a] for a in names.values() if a in item}
+            items.append(item)
+        return {'Responses': {'t_usuarios': items}}
+
+
+def loader_with(client, **kwargs):
+    loader = BatchLoader(**kwargs)
+    loader._client = client
+    return loader
+
+
+def test_projection_is_sent_and_always_includes_the_key():
+    client = FakeClient()
+    loader = loader_with(client, projections={'t_usuarios': ['first_name', 'role']})
+    loader.load_many('t_usuarios', ['u1', 'u2'])
+    loader.dispatch()
+
+    request = client.requests[0]['t_usuarios']
+    assert sorted(request['ExpressionAttributeNames'].values()) == ['first_name', 'id', 'role']
+    assert loader.get('t_usuarios', 'u1') == {'id': 'u1', 'first_name': 'Ana', 'role': 'student'}
+
+
+def test_projected_items_are_cached_without_password():
+    cache = TTLCache(max_size=16, ttl=60)
+    loader = loader_with(FakeClient(), caches={'t_usuarios': cache},
+                         projections={'t_usuarios': ['first_name', 'role']})
+    loader.load_many('t_usuarios', ['u1', 'u2', 'missing'])
+    loader.dispatch()
+
+    assert all('password' not in cache.get(user_id) for user_id in ('u1', 'u2'))
+    assert loader.get('t_usuarios', 'missing') is None
+
+
+def test_tables_without_projection_read_full_items():
+    client = FakeClient()
+    loader = loader_with(client)
+    loader.load('t_usuarios', 'u1')
+    loader.dispatch()
+
+    assert 'ProjectionExpression' not in client.requests[0]['t_usuarios']
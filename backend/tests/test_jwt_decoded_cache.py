@@ -0,0 +1,58 @@
+"""Caché de tokens verificados y de claves HMAC preparadas del paquete jwt"""
+import time
+
+import pytest
+
+from jwt import InvalidAudienceError
+from jwt.algorithms import HMACAlgorithm
+from jwt.api_jwt import PyJWT
+
+SECRET = 'test-secret-' + 'x' * 32
+
+
+def encode(payload):
+    return PyJWT().encode(payload, SECRET, algorithm='HS256')
+
+
+def test_cached_payload_is_not_shared_with_callers():
+    decoder = PyJWT(decoded_cache_size=16)
+    token = encode({'a': {'b': 1}, 'exp': int(time.time()) + 60})
+
+    payload = decoder.decode(token, SECRET, algorithms=['HS256'])
+    payload['a']['b'] = 99
+    payload['extra'] = True
+
+    assert decoder.decode(token, SECRET, algorithms=['HS256']) == {
+        'a': {'b': 1}, 'exp': payload['exp']
+    }
+    assert decoder._decoded_cache.hits == 1
+
+
+def test_cached_header_is_not_shared_with_callers():
+    decoder = PyJWT(decoded_cache_size=16)
+    token = PyJWT().encode({'a': 1}, SECRET, algorithm='HS256', headers={'kid': 'k1'})
+
+    decoder.decode_complete(token, SECRET, algorithms=['HS256'])['header']['kid'] = 'k2'
+
+    assert decoder.decode_complete(token, SECRET, algorithms=['HS256'])['header']['kid'] == 'k1'
+
+
+def test_cache_hit_still_validates_claims():
+    decoder = PyJWT(decoded_cache_size=16)
+    token = encode({'aud': 'api', 'exp': int(time.time()) + 60})
+    decoder.decode(token, SECRET, algorithms=['HS256'], audience='api')
+
+    with pytest.raises(InvalidAudienceError):
+        decoder.decode(token, SECRET, algorithms=['HS256'], audience='other')
+
+
+def test_prepared_keys_are_evicted_least_recently_used():
+    alg = HMACAlgorithm(HMACAlgorithm.SHA256)
+    alg.max_prepared_keys = 2
+
+    alg.prepare_key('k1')
+    alg.prepare_key('k2')
+    alg.prepare_key('k1')
+    alg.prepare_key('k3')
+
+    assert list(alg._prepared_keys) == ['k1', 'k3']
@@ -0,0 +1,36 @@
+"""Imports en frío del paquete jwt: cryptography solo se carga para RSA/EC/EdDSA"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def loaded_modules(code):
+    """Módulos cargados después de ejecutar code en un intérprete nuevo"""
+    probe = code + "\nimport sys\nprint(' '.join(sys.modules))"
+    env = {**os.environ, 'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')}
+    result = subprocess.run(
+        [sys.executable, '-c', probe], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_jwt_validator_does_not_import_cryptography():
+    pytest.importorskip('boto3')
+    modules = loaded_modules("import utils.jwt_validator")
+    assert 'cryptography' not in modules
+    assert 'jwt.crypto_algorithms' not in modules
+
+
+def test_hs256_round_trip_does_not_import_cryptography():
+    modules = loaded_modules(
+        "import jwt\n"
+        "token = jwt.encode({'a': 1}, 'secret-' + 'x' * 32, algorithm='HS256')\n"
+        "assert jwt.decode(token, 'secret-' + 'x' * 32, algorithms=['HS256']) == {'a': 1}"
+    )
+    assert 'cryptography' not in modules
+    assert 'urllib.request' not in modules
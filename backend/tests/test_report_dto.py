@@ -0,0 +1,27 @@
+"""Campos del resumen de reporte: orderBy y sparse fieldsets"""
+import pytest
+
+from utils.report_dto import extract_fields_param, resolve_order_by, SUMMARY_FIELDS
+
+
+def test_summary_order_by_is_kept():
+    assert resolve_order_by('updated_at', 'created_at') == 'updated_at'
+
+
+@pytest.mark.parametrize('order_by', ['classification_score', 'notification_sent_at', ''])
+def test_order_by_outside_summary_falls_back_to_default(order_by, capsys):
+    assert resolve_order_by(order_by, 'created_at') == 'created_at'
+    assert 'Warning' in capsys.readouterr().out
+
+
+def test_fields_default_to_full_summary():
+    assert extract_fields_param({}) == SUMMARY_FIELDS
+
+
+def test_fields_always_include_id():
+    assert extract_fields_param({'fields': 'estado, lugar,estado'}) == ['id_reporte', 'estado', 'lugar']
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        extract_fields_param({'fields': 'estado,author_name'})
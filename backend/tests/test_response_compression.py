@@ -0,0 +1,46 @@
+"""Compresión de respuestas: solo cuando API Gateway decodifica el base64 (binaryMediaTypes)"""
+import base64
+import gzip
+
+import pytest
+
+pytest.importorskip('boto3')
+
+from utils.jwt_validator import create_response, extract_accept_encoding, parse_json_body
+
+BODY = {'items': [{'id_reporte': str(i), 'descripcion': 'fuga de agua ' * 4} for i in range(50)]}
+
+
+def event(accept=None, accept_encoding='gzip, deflate'):
+    headers = {'Accept-Encoding': accept_encoding}
+    if accept is not None:
+        headers['Accept'] = accept
+    return {'headers': headers}
+
+
+def test_json_accept_gets_compressed_response():
+    response = create_response(200, BODY, accept_encoding=extract_accept_encoding(event('application/json')))
+
+    assert response['isBase64Encoded'] is True
+    assert response['headers']['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(base64.b64decode(response['body'])).startswith(b'{')
+
+
+@pytest.mark.parametrize('accept', [None, '*/*', 'text/html,application/json', 'text/plain'])
+def test_other_accept_gets_plain_text(accept):
+    response = create_response(200, BODY, accept_encoding=extract_accept_encoding(event(accept)))
+
+    assert not response.get('isBase64Encoded')
+    assert 'Content-Encoding' not in response['headers']
+
+
+def test_accept_parameters_and_case_are_ignored():
+    assert extract_accept_encoding(event('Application/JSON; charset=utf-8, */*')) == 'gzip, deflate'
+
+
+def test_parse_json_body_reads_text_and_base64_bodies():
+    raw = '{"descripcion": "fuga"}'
+    encoded = base64.b64encode(raw.encode('utf-8')).decode('ascii')
+
+    assert parse_json_body({'body': raw}) == {'descripcion': 'fuga'}
+    assert parse_json_body({'body': encoded, 'isBase64Encoded': True}) == {'descripcion': 'fuga'}
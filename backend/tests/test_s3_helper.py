@@ -0,0 +1,45 @@
+"""Vigencia de las URLs firmadas cacheadas frente a la caché de respuestas y las credenciales"""
+import datetime
+
+import pytest
+
+pytest.importorskip('boto3')
+
+from botocore.credentials import Credentials, RefreshableCredentials
+
+from utils import response_cache, s3_helper
+
+
+class FakeSession:
+    def __init__(self, credentials):
+        self.credentials = credentials
+
+    def get_credentials(self):
+        return self.credentials
+
+
+def refreshable(seconds):
+    expiry = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=seconds)
+    return RefreshableCredentials('key', 'secret', 'token', expiry, refresh_using=lambda: None, method='test')
+
+
+def test_safety_margin_outlives_cached_responses():
+    assert s3_helper.URL_SAFETY_MARGIN > response_cache.MAX_TTL
+    assert s3_helper.URL_SAFETY_MARGIN - response_cache.MAX_TTL >= s3_helper.URL_CLIENT_MARGIN
+    assert response_cache.DEFAULT_TTL <= response_cache.MAX_TTL
+
+
+def test_cache_ttl_without_expiring_credentials(monkeypatch):
+    monkeypatch.setattr(s3_helper, 'session', FakeSession(Credentials('key', 'secret')))
+    assert s3_helper._cache_ttl(3600) == 3600 - s3_helper.URL_SAFETY_MARGIN
+
+
+def test_cache_ttl_is_bounded_by_credential_expiry(monkeypatch):
+    monkeypatch.setattr(s3_helper, 'session', FakeSession(refreshable(2400)))
+    ttl = s3_helper._cache_ttl(3600)
+    assert 2400 - s3_helper.URL_SAFETY_MARGIN - 5 <= ttl <= 2400 - s3_helper.URL_SAFETY_MARGIN
+
+
+def test_urls_are_not_cached_when_credentials_expire_soon(monkeypatch):
+    monkeypatch.setattr(s3_helper, 'session', FakeSession(refreshable(s3_helper.URL_SAFETY_MARGIN - 60)))
+    assert s3_helper._cache_ttl(3600) <= 0
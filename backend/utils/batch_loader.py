@@ -0,0 +1,166 @@
+"""
+Loader estilo DataLoader para lecturas por clave en DynamoDB.
+Acumula las claves que piden los distintos pasos de enriquecimiento, las
+deduplica por tabla y las resuelve con la menor cantidad posible de llamadas
+batch_get_item (varias tablas por llamada), en paralelo y reintentando
+UnprocessedKeys con backoff exponencial.
+
+Con projections solo se leen (y cachean) esos atributos de cada tabla; así los
+items de t_usuarios nunca traen el hash del password.
+
+Uso (una instancia por request):
+    loader = BatchLoader(projections={'t_usuarios': ['id', 'first_name', 'last_name']})
+    loader.load_many('t_lugares', lugar_ids)
+    loader.load_many('t_usuarios', user_ids)
+    loader.dispatch()
+    lugar = loader.get('t_lugares', lugar_id)
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.dynamo import dynamodb
+
+# Límite de DynamoDB: 100 claves por llamada batch_get_item (sumando todas las tablas)
+MAX_KEYS_PER_BATCH = 100
+
+
+class BatchLoader:
+    """Resuelve lecturas por clave primaria agrupándolas en batch_get_item"""
+
+    def __init__(self, caches=None, projections=None, max_workers=4, max_retries=5, base_delay=0.05):
+        """
+        Args:
+            caches: Dict {tabla: TTLCache} opcional; las claves en caché no se
+                    leen de DynamoDB y los items leídos se guardan en ella
+            projections: Dict {tabla: [atributos]} opcional; las tablas indicadas
+                         se leen con ProjectionExpression (la clave se agrega sola)
+            max_workers: Llamadas batch_get_item simultáneas como máximo
+            max_retries: Reintentos para UnprocessedKeys antes de rendirse
+            base_delay: Espera inicial (segundos) del backoff exponencial
+        """
+        # El cliente de bajo nivel es thread-safe; al venir del resource
+        # acepta y retorna tipos Python (no formato {'S': ...})
+        self._client = dynamodb.meta.client
+        self._caches = caches or {}
+        self._projections = projections or {}
+        self._max_workers = max_workers
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._key_names = {}
+        self._pending = {}
+        self._loaded = {}
+
+    def load(self, table_name, key_value, key_name='id'):
+        """Registra una clave para la próxima llamada a dispatch()"""
+        if key_value is None or key_value == '':
+            return
+        self._key_names[table_name] = key_name
+        loaded = self._loaded.setdefault(table_name, {})
+        if key_value in loaded or key_value in self._pending.get(table_name, ()):
+            return
+
+        cache = self._caches.get(table_name)
+        cached = cache.get(key_value) if cache is not None else None
+        if cached is not None:
+            loaded[key_value] = cached
+        else:
+            self._pending.setdefault(table_name, set()).add(key_value)
+
+    def load_many(self, table_name, key_values, key_name='id'):
+        """Registra varias claves de una misma tabla"""
+        for key_value in key_values:
+            self.load(table_name, key_value, key_name)
+
+    def dispatch(self):
+        """
+        Ejecuta todas las lecturas pendientes.
+        Las claves que no existen en la tabla quedan registradas como None.
+        """
+        pending = [
+            (table_name, key_value)
+            for table_name, values in self._pending.items()
+            for key_value in values
+        ]
+        self._pending = {}
+        if not pending:
+            return
+
+        # Partir en lotes de 100 claves mezclando tablas
+        batches = []
+        for i in range(0, len(pending), MAX_KEYS_PER_BATCH):
+            request_items = {}
+            for table_name, key_value in pending[i:i + MAX_KEYS_PER_BATCH]:
+                key_name = self._key_names[table_name]
+                if table_name not in request_items:
+                    request_items[table_name] = self._table_request(table_name, key_name)
+                request_items[table_name]['Keys'].append({key_name: key_value})
+            batches.append(request_items)
+
+        if len(batches) == 1:
+            results = [self._run_batch(batches[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self._max_workers, len(batches))) as executor:
+                results = list(executor.map(self._run_batch, batches))
+
+        for table_name, key_value in pending:
+            self._loaded[table_name].setdefault(key_value, None)
+
+        for responses in results:
+            for table_name, items in responses.items():
+                key_name = self._key_names[table_name]
+                cache = self._caches.get(table_name)
+                for item in items:
+                    self._loaded[table_name][item[key_name]] = item
+                    if cache is not None:
+                        cache.set(item[key_name], item)
+
+    def _table_request(self, table_name, key_name):
+        """Entrada de RequestItems de una tabla, con su ProjectionExpression si tiene"""
+        request = {'Keys': []}
+        attributes = self._projections.get(table_name)
+        if attributes:
+            attributes = [key_name] + [a for a in attributes if a != key_name]
+            # Nombres con placeholders: algunos atributos son palabras reservadas
+            names = {f'#p{i}': attribute for i, attribute in enumerate(attributes)}
+            request['ProjectionExpression'] = ', '.join(names)
+            request['ExpressionAttributeNames'] = names
+        return request
+
+    def _run_batch(self, request_items):
+        """
+        Ejecuta un batch_get_item reintentando UnprocessedKeys con backoff.
+
+        Returns:
+            Dict {tabla: [items]}
+        """
+        responses = {}
+        attempt = 0
+
+        while request_items:
+            response = self._client.batch_get_item(RequestItems=request_items)
+            for table_name, items in response.get('Responses', {}).items():
+                responses.setdefault(table_name, []).extend(items)
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+
+            if attempt >= self._max_retries:
+                missing = sum(len(v.get('Keys', [])) for v in request_items.values())
+                print(f"⚠️ BatchLoader: {missing} claves sin procesar tras {attempt} reintentos")
+                break
+
+            # Backoff exponencial con jitter para no insistir en sincronía con otros Lambdas
+            time.sleep(self._base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+            attempt += 1
+
+        return responses
+
+    def get(self, table_name, key_value, default=None):
+        """Retorna el item cargado (o default si no existe o no se pidió)"""
+        item = self._loaded.get(table_name, {}).get(key_value)
+        return item if item is not None else default
+
+    def get_many(self, table_name):
+        """Retorna dict {clave: item} con los items encontrados de una tabla"""
+        return {k: v for k, v in self._loaded.get(table_name, {}).items() if v is not None}
@@ -0,0 +1,50 @@
+"""
+Filtro de Bloom: conjunto probabilístico compacto.
+Responde "seguro que no está" o "puede estar" (falsos positivos con una tasa
+acotada, nunca falsos negativos). Lo usa utils/token_revocation.py para saber,
+sin I/O, si un usuario puede tener tokens revocados.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre strings con k posiciones por doble hashing (blake2b)"""
+
+    def __init__(self, capacity=1000, error_rate=0.01):
+        """
+        Args:
+            capacity: Cantidad de elementos esperada
+            error_rate: Tasa de falsos positivos con `capacity` elementos
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys, error_rate=0.01):
+        """Filtro dimensionado para keys y con todas ellas agregadas"""
+        keys = list(keys)
+        bloom = cls(capacity=len(keys), error_rate=error_rate)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,83 @@
+"""
+Caché en memoria con política LRU y TTL por entrada.
+Las instancias se crean a nivel de módulo, así que sobreviven entre
+invocaciones del mismo contenedor Lambda (warm starts).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Valor centinela para distinguir "no está en caché" de un valor None guardado
+_MISSING = object()
+
+
+class TTLCache:
+    """Caché LRU con tamaño máximo, TTL por entrada y contadores de hits/misses"""
+
+    def __init__(self, max_size=1024, ttl=300):
+        """
+        Args:
+            max_size: Máximo de entradas; al superarlo se descarta la menos usada
+            ttl: Tiempo de vida por defecto de cada entrada (segundos)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Retorna el valor vigente para key, o default si no existe o expiró"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Guarda un valor con el TTL indicado (o el TTL por defecto)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Elimina una entrada (por ejemplo, después de escribir el item)"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, reset_stats=True):
+        """Vacía la caché y, salvo reset_stats=False, reinicia los contadores"""
+        with self._lock:
+            self._data.clear()
+            if reset_stats:
+                self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """
+        Returns:
+            Dict {'size', 'max_size', 'hits', 'misses', 'evictions', 'hit_rate'}
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,83 @@
+"""
+Acceso compartido a DynamoDB con tipos nativos de Python.
+
+El resource de boto3 deserializa los números ({'N': '42'}) como Decimal, y cada
+handler los volvía a recorrer con su propia copia de decimal_to_native antes de
+serializar la respuesta. Aquí los números se convierten una sola vez, al
+deserializar la respuesta de DynamoDB: enteros a int y el resto a float.
+
+Uso (en lugar de boto3.resource('dynamodb')):
+    from utils.dynamo import dynamodb
+    table = dynamodb.Table('t_reportes')
+
+Para escribir se aceptan int, float y Decimal; los float se guardan con su
+representación decimal más corta (repr), no con la expansión binaria.
+"""
+from decimal import Decimal
+import math
+import boto3
+from boto3.dynamodb.transform import TransformationInjector
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer, DYNAMODB_CONTEXT
+
+
+class NativeTypeDeserializer(TypeDeserializer):
+    """TypeDeserializer que retorna int/float en lugar de Decimal"""
+
+    def _deserialize_n(self, value):
+        # Camino rápido: la gran mayoría de los números guardados son enteros
+        if '.' not in value and 'e' not in value and 'E' not in value:
+            return int(value)
+        number = DYNAMODB_CONTEXT.create_decimal(value)
+        if number == number.to_integral_value():
+            return int(number)
+        return float(number)
+
+
+class NativeTypeSerializer(TypeSerializer):
+    """TypeSerializer que además acepta float (los valores leídos con NativeTypeDeserializer)"""
+
+    def _is_number(self, value):
+        if isinstance(value, (int, Decimal, float)) and not isinstance(value, bool):
+            return True
+        return False
+
+    def _serialize_n(self, value):
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                raise TypeError('Infinity and NaN not supported')
+            value = Decimal(repr(value))
+        return super()._serialize_n(value)
+
+
+def use_native_types(resource):
+    """
+    Reemplaza los transformadores de tipos de un resource de DynamoDB por los nativos.
+
+    boto3 registra la (de)serialización en los eventos del cliente con unique_id
+    fijos; se desregistran y se vuelven a registrar con otro TransformationInjector.
+    Las condition expressions siguen usando el injector original.
+    """
+    events = resource.meta.client.meta.events
+    injector = TransformationInjector(serializer=NativeTypeSerializer(), deserializer=NativeTypeDeserializer())
+    events.unregister('before-parameter-build.dynamodb', unique_id='dynamodb-attr-value-input')
+    events.unregister('after-call.dynamodb', unique_id='dynamodb-attr-value-output')
+    events.register(
+        'before-parameter-build.dynamodb',
+        injector.inject_attribute_value_input,
+        unique_id='dynamodb-attr-value-input'
+    )
+    events.register(
+        'after-call.dynamodb',
+        injector.inject_attribute_value_output,
+        unique_id='dynamodb-attr-value-output'
+    )
+    return resource
+
+
+def native_resource(**kwargs):
+    """boto3.resource('dynamodb', **kwargs) con tipos nativos"""
+    return use_native_types(boto3.resource('dynamodb', **kwargs))
+
+
+# Resource compartido por los handlers y utils del mismo contenedor
+dynamodb = native_resource()
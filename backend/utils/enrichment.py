@@ -0,0 +1,74 @@
+"""
+Enriquecimiento de listados de reportes (lugares, autores, asignados e imágenes).
+Se ejecuta después de filtrar, ordenar y paginar, así que solo toca la página
+que se devuelve al cliente: el costo es O(tamaño de página).
+"""
+from utils.reference_data import reference_loader
+from utils.s3_helper import add_image_urls_to_reports
+
+UNKNOWN_USER_NAME = 'Desconocido'
+
+
+def display_name(user):
+    """Nombre completo de un usuario para mostrar en listados"""
+    return f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+
+
+def enrich_reports(reports, include_user_names=True, loader=None, fields=None):
+    """
+    Enriquece una página de reportes con datos de lugar, nombres de usuarios
+    e image_url firmada.
+
+    Args:
+        reports: Lista de reportes ya paginada
+        include_user_names: Si True agrega 'author_name' y 'assigned_name'
+        loader: loader del request (opcional, ver reference_data.reference_loader) para compartir lecturas
+                con otros pasos del handler; por defecto usa las cachés de
+                referencia (lugares y usuarios) del contenedor
+        fields: Campos que se van a devolver (sparse fieldset); solo se
+                calculan los enriquecimientos necesarios. None = todos
+
+    Returns:
+        Lista de reportes enriquecidos (mismo orden)
+    """
+    if not reports:
+        return []
+
+    loader = loader or reference_loader()
+
+    wanted = set(fields) if fields is not None else None
+    include_place = wanted is None or 'lugar' in wanted
+    include_author = include_user_names and (wanted is None or 'author_name' in wanted)
+    include_assigned = include_user_names and (wanted is None or 'assigned_name' in wanted)
+    include_image = wanted is None or 'image_url' in wanted
+
+    # 1. Registrar todas las claves: lugares, autores y asignados
+    if include_place:
+        loader.load_many('t_lugares', [r['lugar']['id'] for r in reports if 'lugar' in r and 'id' in r['lugar']])
+    if include_author:
+        loader.load_many('t_usuarios', [r.get('author_id') for r in reports])
+    if include_assigned:
+        loader.load_many('t_usuarios', [r.get('assigned_to') for r in reports])
+
+    # 2. Resolver todo con el mínimo de batch_get_item
+    loader.dispatch()
+
+    # 3. Aplicar enriquecimientos
+    for report in reports:
+        if include_place and 'lugar' in report and 'id' in report['lugar']:
+            lugar = loader.get('t_lugares', report['lugar']['id'])
+            if lugar:
+                report['lugar'] = lugar
+
+        if include_author and 'author_id' in report:
+            author = loader.get('t_usuarios', report['author_id'])
+            report['author_name'] = display_name(author) if author else UNKNOWN_USER_NAME
+
+        if include_assigned and report.get('assigned_to'):
+            assigned = loader.get('t_usuarios', report['assigned_to'])
+            report['assigned_name'] = display_name(assigned) if assigned else UNKNOWN_USER_NAME
+
+    # 4. Convertir S3 URIs a URLs HTTP firmadas
+    if not include_image:
+        return reports
+    return add_image_urls_to_reports(reports)
@@ -0,0 +1,57 @@
+"""
+Contadores de generación por fuente de datos (items GEN#<fuente> de t_cache).
+
+Los escritores de una fuente incrementan su generación con bump_generation y las
+cachés que dependen de ella guardan la generación con la que se calcularon: si
+la generación actual es otra, la entrada está vencida. Lo usan la caché de
+respuestas (utils/response_cache.py), la de usuarios (utils/user_cache.py) y el
+filtro de tokens revocados (utils/token_revocation.py).
+"""
+from utils.dynamo import dynamodb
+
+CACHE_TABLE_NAME = 't_cache'
+GENERATION_PREFIX = 'GEN#'
+
+# Fuentes de datos con generación propia
+REPORTS_GENERATION = 't_reportes'
+SNAPSHOT_GENERATION = 'snapshot'   # snapshot columnar (utils/report_snapshot.py)
+USERS_GENERATION = 't_usuarios'
+REVOCATIONS_GENERATION = 't_token_revocations'
+
+cache_table = dynamodb.Table(CACHE_TABLE_NAME)
+
+
+def current_generations(sources):
+    """
+    Generación actual de cada fuente de datos.
+
+    Returns:
+        Dict {fuente: int} (0 si la fuente nunca se modificó)
+    """
+    generations = {source: 0 for source in sources}
+    if not generations:
+        return generations
+    response = dynamodb.batch_get_item(RequestItems={
+        CACHE_TABLE_NAME: {
+            'Keys': [{'cache_key': GENERATION_PREFIX + source} for source in sources],
+            'ConsistentRead': True
+        }
+    })
+    for item in response.get('Responses', {}).get(CACHE_TABLE_NAME, []):
+        generations[item['cache_key'][len(GENERATION_PREFIX):]] = int(item['generation'])
+    return generations
+
+
+def bump_generation(source=REPORTS_GENERATION):
+    """
+    Invalida las entradas cacheadas que dependen de source.
+    No lanza excepciones: una falla aquí no debe deshacer la escritura que la originó.
+    """
+    try:
+        cache_table.update_item(
+            Key={'cache_key': GENERATION_PREFIX + source},
+            UpdateExpression='ADD generation :one',
+            ExpressionAttributeValues={':one': 1}
+        )
+    except Exception as e:
+        print(f"⚠️ Error incrementando la generación de {source}: {e}")
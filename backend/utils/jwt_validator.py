@@ -1,38 +1,69 @@
 import jwt
-import json
-import boto3
-import os
+import base64
+import hashlib
+import zlib
 from typing import Dict, Optional
-from decimal import Decimal
+from utils.secrets_cache import get_jwt_verification_secrets
+from utils.serialization import dumps, loads
+from utils.user_cache import get_user
+from utils.token_revocation import may_be_revoked
 
-dynamodb = boto3.resource('dynamodb')
-ssm = boto3.client('ssm')
+# Compresión de respuestas: bodies más chicos no se comprimen (el ahorro no compensa
+# la CPU ni el 33% extra del base64); ver scripts/benchmark_compression.py
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVEL = 6
 
-# Cache para JWT_SECRET
-_jwt_secret_cache = None
+# Content-Encoding -> wbits de zlib (gzip: cabecera gzip; deflate: formato zlib, RFC 9110)
+_ENCODING_WBITS = {'gzip': 31, 'deflate': 15}
 
-def get_jwt_secret() -> str:
-    """Obtiene el JWT_SECRET desde Parameter Store con caché"""
-    global _jwt_secret_cache
+# binaryMediaTypes del API (serverless.yml): solo para estos Accept API Gateway
+# decodifica un body base64 antes de enviarlo
+BINARY_MEDIA_TYPES = ('application/json',)
+
+
+def decode_jwt(token: str) -> Dict:
+    """
+    jwt.decode con la llave vigente y, durante una rotación del JWT_SECRET, con
+    la anterior (ver utils/secrets_cache.py).
     
-    if _jwt_secret_cache is None:
+    Raises:
+        jwt.InvalidTokenError: Si la firma no coincide con ninguna llave o el token es inválido
+    """
+    secrets = get_jwt_verification_secrets()
+    for secret in secrets[:-1]:
         try:
-            response = ssm.get_parameter(
-                Name=os.environ.get('JWT_SECRET_PARAM', '/utec-alerta/jwt-secret'),
-                WithDecryption=True
-            )
-            _jwt_secret_cache = response['Parameter']['Value']
-        except Exception as e:
-            print(f"Error getting JWT_SECRET: {e}")
-            raise Exception("JWT_SECRET not configured")
-    
-    return _jwt_secret_cache
+            return jwt.decode(token, secret, algorithms=['HS256'])
+        except jwt.InvalidSignatureError:
+            continue
+    return jwt.decode(token, secrets[-1], algorithms=['HS256'])
+
+
+def user_data_from_claims(payload: Dict) -> Dict:
+    """
+    user_data armado con los claims de un token autocontenido (ver auth.generate_jwt),
+    con los mismos campos que usan los handlers del item de t_usuarios.
+    """
+    user_data = {
+        'id': payload['user_id'],
+        'email': payload.get('email'),
+        'role': payload.get('role'),
+        'first_name': payload.get('first_name', ''),
+        'last_name': payload.get('last_name', ''),
+        'token_version': payload['token_version']
+    }
+    if payload.get('sector'):
+        user_data['data_authority'] = {'sector': payload['sector']}
+    return user_data
 
 
 def validate_token(token: str) -> Dict:
     """
     Valida el token JWT y retorna el payload decodificado.
-    También verifica que el usuario exista en la BD.
+    
+    Los tokens con token_version traen rol, sector y nombres en sus claims: si el
+    filtro de revocaciones descarta al usuario, no se lee la BD. En otro caso (o
+    con tokens anteriores, sin token_version) se verifica que el usuario exista
+    (con caché de contenedor) y que su token_version coincida con la del token.
     
     Args:
         token: Token JWT a validar
@@ -41,22 +72,28 @@ def validate_token(token: str) -> Dict:
         Dict con los datos del usuario del token
         
     Raises:
-        Exception: Si el token es inválido o el usuario no existe
+        Exception: Si el token es inválido, fue revocado o el usuario no existe
     """
     try:
         # Decodificar token
-        secret = get_jwt_secret()
-        payload = jwt.decode(token, secret, algorithms=['HS256'])
+        payload = decode_jwt(token)
+        
+        # Token autocontenido y usuario sin revocaciones: sin I/O
+        if 'token_version' in payload and not may_be_revoked(payload['user_id']):
+            payload['user_data'] = user_data_from_claims(payload)
+            return payload
         
-        # Verificar que el usuario existe en la BD
-        users_table = dynamodb.Table('t_usuarios')
-        response = users_table.get_item(Key={'id': payload['user_id']})
+        # Verificar que el usuario existe en la BD (caché de contenedor, ver utils/user_cache.py)
+        user = get_user(payload['user_id'])
         
-        if 'Item' not in response:
+        if user is None:
             raise Exception("User not found in database")
         
+        if int(user.get('token_version', 0)) != payload.get('token_version', 0):
+            raise Exception("Token revoked")
+        
         # Agregar información del usuario al payload
-        payload['user_data'] = response['Item']
+        payload['user_data'] = user
         
         return payload
         
@@ -97,32 +134,118 @@ def extract_token_from_event(event: Dict) -> Optional[str]:
     
     # Intentar desde body
     try:
-        if 'body' in event and event['body']:
-            body = json.loads(event['body'])
-            if 'token' in body:
-                return body['token']
+        body = parse_json_body(event)
+        if 'token' in body:
+            return body['token']
     except:
         pass
     
     return None
 
 
-def decimal_to_native(obj):
-    """Convierte Decimal a tipos nativos de Python para JSON serialization"""
-    if isinstance(obj, list):
-        return [decimal_to_native(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    else:
-        return obj
+def parse_json_body(event: Dict) -> Dict:
+    """
+    Body JSON del request ({} si no hay body).
+    API Gateway lo entrega en base64 (isBase64Encoded) cuando su Content-Type está
+    en binaryMediaTypes (application/json), que se habilitó para poder responder
+    comprimido; con otro Content-Type llega como texto.
+    
+    Raises:
+        json.JSONDecodeError / ValueError: Si el body no es JSON válido
+    """
+    body = event.get('body')
+    if not body:
+        return {}
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+    return loads(body)
 
 
-def create_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
+def extract_accept_encoding(event: Dict) -> str:
+    """
+    Header Accept-Encoding del request ('' si no viene).
+    
+    También '' cuando el primer tipo del Accept no está en BINARY_MEDIA_TYPES: API
+    Gateway solo mira ese tipo para decodificar el base64, y de otro modo el cliente
+    recibiría el body comprimido en base64.
+    """
+    headers = event.get('headers') or {}
+    accept = headers.get('Accept') or headers.get('accept') or ''
+    first_type = accept.split(',')[0].split(';')[0].strip().lower()
+    if first_type not in BINARY_MEDIA_TYPES:
+        return ''
+    return headers.get('Accept-Encoding') or headers.get('accept-encoding') or ''
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Elige 'gzip' o 'deflate' según Accept-Encoding (respeta q-values y '*'; gzip ante empate).
+    
+    Returns:
+        Nombre del encoding, o None si el cliente no acepta ninguno
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    
+    best, best_q = None, 0.0
+    for encoding in _ENCODING_WBITS:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_body(data: bytes, encoding: str, level: int = COMPRESSION_LEVEL) -> bytes:
+    """Comprime un body (bytes UTF-8) con gzip o deflate"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _ENCODING_WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_response(response: Dict, accept_encoding: str, min_size: Optional[int] = COMPRESSION_MIN_SIZE) -> Dict:
+    """
+    Comprime el body de una respuesta si el cliente lo acepta y supera min_size.
+    
+    Args:
+        response: Respuesta de create_response
+        accept_encoding: Header Accept-Encoding del request
+        min_size: Tamaño mínimo en bytes para comprimir (None desactiva la compresión)
+        
+    Returns:
+        La misma respuesta, o una nueva con body base64, isBase64Encoded y Content-Encoding
+    """
+    if min_size is None or response.get('isBase64Encoded'):
+        return response
+    
+    headers = {**response.get('headers', {}), 'Vary': 'Accept-Encoding'}
+    data = (response.get('body') or '').encode('utf-8')
+    encoding = negotiate_encoding(accept_encoding) if accept_encoding and len(data) >= min_size else None
+    compressed = compress_body(data, encoding) if encoding else None
+    if compressed is None or len(compressed) >= len(data):
+        return {**response, 'headers': headers}
+    
+    headers['Content-Encoding'] = encoding
+    # Otra representación del mismo contenido: el ETag pasa a ser débil
+    if 'ETag' in headers and not headers['ETag'].startswith('W/'):
+        headers['ETag'] = 'W/' + headers['ETag']
+    return {
+        **response,
+        'headers': headers,
+        'body': base64.b64encode(compressed).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+
+def create_response(status_code: int, body: Dict, headers: Dict = None,
+                    accept_encoding: str = None, min_compress_size: Optional[int] = COMPRESSION_MIN_SIZE) -> Dict:
     """
     Crea una respuesta HTTP estandarizada.
     
@@ -130,6 +253,9 @@ def create_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
         status_code: Código de estado HTTP
         body: Cuerpo de la respuesta
         headers: Headers adicionales
+        accept_encoding: Accept-Encoding del request (extract_accept_encoding); si se
+                         indica, la respuesta se comprime cuando conviene
+        min_compress_size: Umbral de compresión en bytes de este handler (None = no comprimir)
         
     Returns:
         Respuesta formateada para API Gateway
@@ -143,11 +269,82 @@ def create_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
     if headers:
         default_headers.update(headers)
     
-    # Convertir Decimal a tipos nativos antes de serializar
-    body = decimal_to_native(body)
-    
-    return {
+    response = {
         'statusCode': status_code,
         'headers': default_headers,
-        'body': json.dumps(body)
+        'body': dumps(body)
+    }
+    if accept_encoding is not None:
+        response = compress_response(response, accept_encoding, min_compress_size)
+    return response
+
+
+def compute_etag(value) -> str:
+    """
+    ETag fuerte a partir de un contenido.
+    
+    Args:
+        value: Body ya serializado (str) o cualquier valor serializable a JSON
+        
+    Returns:
+        ETag entre comillas (hash SHA-256 truncado)
+    """
+    if not isinstance(value, str):
+        value = dumps(value, sort_keys=True)
+    return '"' + hashlib.sha256(value.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_headers(etag: str) -> Dict:
+    """Headers para publicar un ETag (expuesto al frontend por CORS)"""
+    return {'ETag': etag, 'Access-Control-Expose-Headers': 'ETag'}
+
+
+def extract_if_none_match(event: Dict) -> set:
+    """
+    ETags del header If-None-Match, sin prefijo W/ (comparación débil, RFC 7232).
+    
+    Returns:
+        Set de ETags (vacío si no hay header)
+    """
+    headers = event.get('headers') or {}
+    value = headers.get('If-None-Match') or headers.get('if-none-match')
+    if not value:
+        return set()
+    tags = set()
+    for tag in value.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+def etag_matches(etag: str, if_none_match: set) -> bool:
+    """True si el cliente ya tiene la versión identificada por etag"""
+    if not etag or not if_none_match:
+        return False
+    return '*' in if_none_match or etag in if_none_match
+
+
+def create_not_modified_response(etag: str, headers: Dict = None) -> Dict:
+    """
+    Respuesta 304 sin body: el cliente reutiliza la que tiene en caché.
+    
+    Args:
+        etag: ETag vigente del recurso
+        headers: Headers adicionales
+    """
+    response_headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Credentials': True,
+        **etag_headers(etag)
+    }
+    if headers:
+        response_headers.update(headers)
+    
+    return {
+        'statusCode': 304,
+        'headers': response_headers,
+        'body': ''
     }
@@ -1,17 +1,34 @@
 """
 Utilidad de paginación manual para resultados de DynamoDB.
 Usado por todas las lambdas que retornan listas de items.
+
+Soporta dos modos:
+- Offset (page/size): necesita la lista completa para calcular totales.
+- Cursor (keyset): un cursor opaco y firmado guarda la posición del último
+  item devuelto, así la página N+1 cuesta lo mismo que la página 1.
 """
+import base64
+import hashlib
+import hmac
+import json
+from utils.secrets_cache import get_jwt_secret, get_jwt_verification_secrets
+from utils.serialization import dumps, loads
+
+# JWT_SECRET -> llave derivada para firmar cursores
+_cursor_key_cache = {}
 
-def paginate_results(items, page=1, size=20, max_size=100):
+def paginate_results(items, page=1, size=20, max_size=100, total_items=None, total_is_approximate=False):
     """
     Aplica paginación manual a una lista de items.
     
     Args:
-        items: Lista completa de items a paginar
+        items: Lista completa de items a paginar, o solo los primeros hasta el
+               final de la página si se indica total_items
         page: Número de página (default: 1, min: 1)
         size: Items por página (default: 20, max: 100)
         max_size: Tamaño máximo permitido de página
+        total_items: Total real de items cuando items es solo un prefijo (opcional)
+        total_is_approximate: True si total_items es una estimación
         
     Returns:
         Dict con estructura:
@@ -22,6 +39,7 @@ def paginate_results(items, page=1, size=20, max_size=100):
                 'page_size': int,
                 'total_items': int,
                 'total_pages': int,
+                'total_is_approximate': bool,
                 'has_next': bool,
                 'has_previous': bool
             }
@@ -31,7 +49,8 @@ def paginate_results(items, page=1, size=20, max_size=100):
     page = max(1, int(page))
     size = max(1, min(int(size), max_size))
     
-    total_items = len(items)
+    if total_items is None:
+        total_items = len(items)
     total_pages = (total_items + size - 1) // size if total_items > 0 else 1
     
     # Calcular índices de slice
@@ -48,6 +67,7 @@ def paginate_results(items, page=1, size=20, max_size=100):
             'page_size': size,
             'total_items': total_items,
             'total_pages': total_pages,
+            'total_is_approximate': total_is_approximate,
             'has_next': end < total_items,
             'has_previous': page > 1
         }
@@ -81,3 +101,215 @@ def extract_pagination_params(query_params):
             size = 20
     
     return page, size
+
+
+def extract_cursor_params(query_params):
+    """
+    Extrae parámetros de paginación por cursor desde query params.
+    
+    El modo cursor se activa con ?pagination=cursor (primera página)
+    o enviando el ?cursor=... recibido en la respuesta anterior.
+    
+    Args:
+        query_params: Dict de query string parameters del evento Lambda
+        
+    Returns:
+        Tuple (use_cursor, cursor, include_total)
+    """
+    if not query_params:
+        return False, None, False
+    
+    cursor = query_params.get('cursor') or None
+    use_cursor = cursor is not None or query_params.get('pagination', '').lower() == 'cursor'
+    include_total = str(query_params.get('include_total', '')).lower() in ['true', '1', 'yes']
+    
+    return use_cursor, cursor, include_total
+
+
+def _get_cursor_key(secret):
+    """Deriva la llave HMAC para cursores a partir de un JWT_SECRET"""
+    key = _cursor_key_cache.get(secret)
+    
+    if key is None:
+        key = hmac.new(
+            secret.encode(),
+            b'utec-alerta/pagination-cursor',
+            hashlib.sha256
+        ).digest()
+        # Una entrada por llave: la vigente y, durante una rotación, la anterior
+        if len(_cursor_key_cache) >= 4:
+            _cursor_key_cache.clear()
+        _cursor_key_cache[secret] = key
+    
+    return key
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _scope_fingerprint(scope):
+    """Huella corta de la consulta (filtros, orden, usuario) a la que pertenece un cursor"""
+    raw = json.dumps(scope, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def encode_cursor(position, scope):
+    """
+    Genera un cursor opaco y firmado para una posición de la consulta.
+    
+    Args:
+        position: Dict {'value': valor de ordenamiento, 'id': id del item}
+        scope: Dict que describe la consulta (filtros, orden, usuario)
+        
+    Returns:
+        String URL-safe con formato <payload>.<firma>
+    """
+    payload = dumps({
+        'p': position,
+        'q': _scope_fingerprint(scope)
+    }).encode()
+    signature = hmac.new(_get_cursor_key(get_jwt_secret()), payload, hashlib.sha256).digest()[:16]
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def decode_cursor(cursor, scope):
+    """
+    Valida un cursor y retorna la posición que contiene.
+    
+    Args:
+        cursor: String recibido del cliente (o None para la primera página)
+        scope: Dict que describe la consulta actual
+        
+    Returns:
+        Dict de posición, o None si no hay cursor
+        
+    Raises:
+        ValueError: Si el cursor está corrupto, fue alterado o pertenece a otra consulta
+    """
+    if not cursor:
+        return None
+    
+    try:
+        payload_b64, signature_b64 = cursor.split('.', 1)
+        payload = _b64decode(payload_b64)
+        signature = _b64decode(signature_b64)
+    except (ValueError, TypeError):
+        raise ValueError('Malformed cursor')
+    
+    # Los cursores emitidos antes de rotar el JWT_SECRET siguen siendo válidos
+    if not any(
+        hmac.compare_digest(signature, hmac.new(_get_cursor_key(secret), payload, hashlib.sha256).digest()[:16])
+        for secret in get_jwt_verification_secrets()
+    ):
+        raise ValueError('Invalid cursor signature')
+    
+    data = loads(payload)
+    if data.get('q') != _scope_fingerprint(scope):
+        raise ValueError('Cursor does not match the current query')
+    
+    return data['p']
+
+
+def _sort_key(item, order_by, id_field):
+    """Clave de ordenamiento con desempate por id para que el keyset sea estable"""
+    return (item.get(order_by) or '', item.get(id_field) or '')
+
+
+def paginate_by_cursor(items, size=20, position=None, order_by='created_at', order='desc',
+                       id_field='id', max_size=100):
+    """
+    Paginación keyset sobre una lista en memoria.
+    
+    Se usa cuando el orden pedido no coincide con la clave de un índice
+    (o para tablas pequeñas como t_lugares).
+    
+    Args:
+        items: Lista de items (dicts) ya filtrados
+        size: Items por página
+        position: Posición decodificada del cursor (None para la primera página)
+        order_by: Campo por el cual ordenar
+        order: Dirección 'asc' o 'desc'
+        id_field: Campo único usado como desempate
+        max_size: Tamaño máximo permitido de página
+        
+    Returns:
+        Dict {'items': [...], 'next_position': dict | None, 'has_next': bool}
+    """
+    size = max(1, min(int(size), max_size))
+    reverse = order.lower() == 'desc'
+    
+    try:
+        ordered = sorted(items, key=lambda x: _sort_key(x, order_by, id_field), reverse=reverse)
+    except TypeError:
+        # Tipos mezclados en el campo de orden: comparar como texto
+        ordered = sorted(
+            items,
+            key=lambda x: tuple(str(v) for v in _sort_key(x, order_by, id_field)),
+            reverse=reverse
+        )
+    
+    if position:
+        last = (position.get('value') or '', position.get('id') or '')
+        try:
+            if reverse:
+                ordered = [x for x in ordered if _sort_key(x, order_by, id_field) < last]
+            else:
+                ordered = [x for x in ordered if _sort_key(x, order_by, id_field) > last]
+        except TypeError:
+            last = tuple(str(v) for v in last)
+            key = lambda x: tuple(str(v) for v in _sort_key(x, order_by, id_field))
+            ordered = [x for x in ordered if (key(x) < last if reverse else key(x) > last)]
+    
+    page_items = ordered[:size]
+    has_next = len(ordered) > size
+    next_position = None
+    if has_next:
+        last_item = page_items[-1]
+        next_position = {'value': last_item.get(order_by), 'id': last_item.get(id_field)}
+    
+    return {
+        'items': page_items,
+        'next_position': next_position,
+        'has_next': has_next
+    }
+
+
+def build_cursor_pagination(size, next_position, scope, total_items=None, total_is_approximate=False):
+    """
+    Construye el bloque 'pagination' de una respuesta en modo cursor.
+    
+    Args:
+        size: Items por página
+        next_position: Posición del último item devuelto (None si no hay más)
+        scope: Dict que describe la consulta (para firmar el cursor)
+        total_items: Total opcional (solo si el cliente pidió include_total)
+        total_is_approximate: True si el total es una estimación
+        
+    Returns:
+        Dict con estructura:
+        {
+            'mode': 'cursor',
+            'page_size': int,
+            'next_cursor': str | None,
+            'has_next': bool,
+            'total_items': int,              # solo con include_total
+            'total_is_approximate': bool     # solo con include_total
+        }
+    """
+    pagination = {
+        'mode': 'cursor',
+        'page_size': size,
+        'next_cursor': encode_cursor(next_position, scope) if next_position else None,
+        'has_next': next_position is not None
+    }
+    
+    if total_items is not None:
+        pagination['total_items'] = total_items
+        pagination['total_is_approximate'] = total_is_approximate
+    
+    return pagination
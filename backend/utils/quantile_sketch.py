@@ -0,0 +1,86 @@
+"""
+Sketch de cuantiles estilo DDSketch para tiempos de atención y resolución.
+Cada duración cae en un bin logarítmico: el bin i cubre (gamma^(i-1), gamma^i],
+con gamma = (1 + a) / (1 - a), así que cualquier cuantil se estima con error
+relativo <= a. Un sketch es solo {bin: cantidad}: dos sketches se combinan
+sumando cantidades por bin, lo que permite guardarlos como atributos planos
+de t_stats (ADD atómico) y sumarlos entre buckets de rollup igual que los
+contadores.
+"""
+import math
+
+# Error relativo de los cuantiles (2%): ~430 bins posibles entre 1 segundo y 1 año
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Duraciones menores a un segundo cuentan en el bin de 1 segundo
+MIN_SECONDS = 1.0
+
+# Sketches que se guardan en t_stats: nombre -> prefijo de sus atributos
+SKETCHES = {
+    'take': 'q_take',          # created_at -> taken_at
+    'resolve': 'q_resolve',    # created_at -> resolved_at
+}
+
+PERCENTILES = [50, 90, 99]
+
+
+def bin_index(seconds):
+    """Bin logarítmico de una duración en segundos"""
+    return int(math.ceil(math.log(max(seconds, MIN_SECONDS)) / LOG_GAMMA))
+
+
+def bin_value(index):
+    """Valor representativo de un bin (punto medio relativo: error <= RELATIVE_ACCURACY)"""
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def sketch_attribute(sketch, seconds):
+    """Atributo plano de t_stats para una duración ('q_resolve#412')"""
+    return f'{SKETCHES[sketch]}#{bin_index(seconds)}'
+
+
+def merge_sketches(*sketches):
+    """Combina sketches {bin: cantidad} sumando por bin"""
+    merged = {}
+    for sketch in sketches:
+        for index, count in sketch.items():
+            merged[index] = merged.get(index, 0) + count
+    return merged
+
+
+def quantile(sketch, q):
+    """
+    Estima el cuantil q (0..1) de un sketch.
+
+    Returns:
+        float en segundos, o None si el sketch está vacío
+    """
+    bins = sorted((index, count) for index, count in sketch.items() if count > 0)
+    total = sum(count for _, count in bins)
+    if not total:
+        return None
+
+    rank = q * (total - 1)
+    seen = 0
+    for index, count in bins:
+        seen += count
+        if seen > rank:
+            return bin_value(index)
+    return bin_value(bins[-1][0])
+
+
+def percentiles_hours(sketch, percentiles=PERCENTILES):
+    """
+    Percentiles de un sketch en horas.
+
+    Returns:
+        Dict {'p50': float | None, 'p90': ..., 'p99': ..., 'count': int}
+    """
+    result = {}
+    for p in percentiles:
+        seconds = quantile(sketch, p / 100)
+        result[f'p{p}'] = round(seconds / 3600, 2) if seconds is not None else None
+    result['count'] = sum(count for count in sketch.values() if count > 0)
+    return result
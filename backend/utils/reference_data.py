@@ -0,0 +1,69 @@
+"""
+Datos de referencia con caché de contenedor: lugares (t_lugares) y usuarios
+(t_usuarios, usados para nombres en listados). Los lugares casi nunca cambian,
+así que en un contenedor caliente la mayoría de requests no los vuelve a leer.
+
+De t_usuarios solo se leen los campos públicos (USER_PUBLIC_FIELDS): el hash del
+password y demás datos de credenciales nunca llegan a la caché.
+"""
+from utils.batch_loader import BatchLoader
+from utils.cache import TTLCache
+from utils.dynamo import dynamodb
+
+places_table = dynamodb.Table('t_lugares')
+
+# Lugares: cambian solo al correr scripts/seed_lugares.py
+places_cache = TTLCache(max_size=1024, ttl=15 * 60)
+
+# Usuarios para mostrar nombres; TTL corto porque pueden editarse
+users_cache = TTLCache(max_size=2048, ttl=5 * 60)
+
+# Campos de t_usuarios que usan los enriquecimientos (listados y getReportDetail)
+USER_PUBLIC_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'cellphone', 'role',
+    'data_student', 'data_authority'
+]
+
+# Tabla -> caché / atributos leídos, para reference_loader()
+REFERENCE_CACHES = {
+    't_lugares': places_cache,
+    't_usuarios': users_cache
+}
+REFERENCE_PROJECTIONS = {
+    't_usuarios': USER_PUBLIC_FIELDS
+}
+
+
+def reference_loader():
+    """
+    BatchLoader del request sobre las cachés de referencia. Es la única forma de
+    llenar users_cache: siempre lee t_usuarios con USER_PUBLIC_FIELDS.
+    """
+    return BatchLoader(caches=REFERENCE_CACHES, projections=REFERENCE_PROJECTIONS)
+
+
+def get_place(place_id):
+    """
+    Obtiene un lugar por id, leyendo DynamoDB solo si no está en caché.
+    Los items retornados son compartidos: no deben modificarse.
+
+    Returns:
+        Dict del lugar, o None si no existe
+    """
+    if not place_id:
+        return None
+
+    place = places_cache.get(place_id)
+    if place is not None:
+        return place
+
+    response = places_table.get_item(Key={'id': place_id})
+    place = response.get('Item')
+    if place is not None:
+        places_cache.set(place_id, place)
+    return place
+
+
+def cache_stats():
+    """Contadores de hits/misses de las cachés de referencia"""
+    return {table_name: cache.stats() for table_name, cache in REFERENCE_CACHES.items()}
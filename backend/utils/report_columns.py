@@ -0,0 +1,141 @@
+"""
+Representación columnar (NumPy) de reportes para cálculos analíticos.
+Convierte una lista de items de t_reportes en un dict {columna: ndarray}:
+los estados y urgencias pasan a enteros pequeños, las fechas ISO a
+datetime64[us] (NaT si faltan) y el score a float64 (NaN si falta). Las
+métricas se calculan después con máscaras y bincount, sin recorrer los
+dicts reporte por reporte.
+"""
+from datetime import datetime, timezone
+import numpy as np
+
+# Códigos: 0 = sin valor; el código de una urgencia es también su nivel
+ESTADO_CODES = {'PENDIENTE': 1, 'ATENDIENDO': 2, 'RESUELTO': 3}
+URGENCIA_CODES = {'BAJA': 1, 'MEDIA': 2, 'ALTA': 3}
+ESTADO_NAMES = [None, 'PENDIENTE', 'ATENDIENDO', 'RESUELTO']
+URGENCIA_NAMES = [None, 'BAJA', 'MEDIA', 'ALTA']
+
+# Columna -> tipo lógico
+COLUMNS = {
+    'id_reporte': 'str',
+    'estado': 'estado',
+    'urgencia': 'urgencia',
+    'urgencia_original': 'urgencia',
+    'urgencia_clasificada': 'urgencia',
+    'assigned_sector': 'str',
+    'author_id': 'str',
+    'assigned_to': 'str',
+    'descripcion': 'str',
+    'created_at': 'datetime',
+    'updated_at': 'datetime',
+    'taken_at': 'datetime',
+    'resolved_at': 'datetime',
+    'notification_sent_at': 'datetime',
+    'classification_score': 'float',
+    'clasificacion_auto': 'bool',
+    'notification_sent': 'bool',
+}
+
+NAT = np.datetime64('NaT', 'us')
+
+
+def _strip_utc(value):
+    """'2025-11-01T13:00:00Z' -> '2025-11-01T13:00:00' (NumPy no acepta zona horaria)"""
+    if not value or not isinstance(value, str):
+        return 'NaT'
+    if value.endswith('Z'):
+        return value[:-1]
+    if value.endswith('+00:00'):
+        return value[:-6]
+    return value
+
+
+def _parse_datetime(value):
+    """Parseo de respaldo para fechas con otro offset o inválidas"""
+    if not value:
+        return NAT
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError, AttributeError):
+        return NAT
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(parsed, 'us')
+
+
+def datetime_column(values):
+    """
+    Fechas ISO -> datetime64[us] en UTC.
+    Las fechas sin zona horaria (el DAG escribe utcnow() sin 'Z') se toman como UTC.
+    """
+    try:
+        return np.array([_strip_utc(value) for value in values], dtype='datetime64[us]')
+    except (TypeError, ValueError):
+        return np.array([_parse_datetime(value) for value in values], dtype='datetime64[us]')
+
+
+def code_column(values, codes):
+    """Valores categóricos -> int8 (0 si falta o no es un valor conocido)"""
+    return np.array([codes.get(value, 0) for value in values], dtype=np.int8)
+
+
+def float_column(values):
+    """Números (int/float o Decimal) -> float64 (NaN si falta o no es numérico)"""
+    column = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if value is not None and not isinstance(value, (bool, str)):
+            column[i] = float(value)
+    return column
+
+
+def to_columns(reports, columns=None):
+    """
+    Convierte reportes (dicts) a columnas NumPy.
+
+    Args:
+        reports: Lista de reportes
+        columns: Nombres de columnas a construir (default: todas las de COLUMNS)
+
+    Returns:
+        Dict {columna: ndarray}, todas de largo len(reports)
+    """
+    reports = list(reports)
+    result = {}
+    for name in columns or COLUMNS:
+        kind = COLUMNS[name]
+        values = [report.get(name) for report in reports]
+        if kind == 'datetime':
+            result[name] = datetime_column(values)
+        elif kind == 'estado':
+            result[name] = code_column(values, ESTADO_CODES)
+        elif kind == 'urgencia':
+            result[name] = code_column(values, URGENCIA_CODES)
+        elif kind == 'float':
+            result[name] = float_column(values)
+        elif kind == 'bool':
+            result[name] = np.array([bool(value) for value in values], dtype=bool)
+        else:
+            result[name] = np.array([value or '' for value in values], dtype=str)
+    return result
+
+
+def column_length(columns):
+    """Cantidad de filas de un conjunto de columnas"""
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def select(columns, mask):
+    """Filas de columns donde mask es True (nuevo dict de columnas)"""
+    return {name: values[mask] for name, values in columns.items()}
+
+
+def elapsed_minutes(end, start):
+    """
+    Minutos entre dos columnas datetime64.
+
+    Returns:
+        Tuple (minutos float64, máscara de filas con ambas fechas)
+    """
+    valid = ~(np.isnat(end) | np.isnat(start))
+    delta = (end - start).astype('timedelta64[us]').astype(np.int64)
+    return np.where(valid, delta / 1e6 / 60, np.nan), valid
@@ -0,0 +1,119 @@
+"""
+Resumen compacto de reporte ("report summary") para los listados.
+Los listados solo leen y devuelven estos campos; el item completo con datos
+de clasificación y notificación solo se sirve desde getReportDetail.
+"""
+
+# Campos almacenados que forman el resumen. Deben coincidir con los
+# NonKeyAttributes (más las claves) de los GSI de t_reportes con Projection INCLUDE.
+SUMMARY_FIELDS = [
+    'id_reporte',
+    'estado',
+    'urgencia',
+    'assigned_sector',
+    'author_id',
+    'assigned_to',
+    'created_at',
+    'updated_at',
+    'resolved_at',
+    'lugar',
+    'descripcion',
+    'image_url'
+]
+
+# Campos calculados por el enriquecimiento y el atributo del que dependen
+ENRICHED_FIELDS = {
+    'author_name': 'author_id',
+    'assigned_name': 'assigned_to'
+}
+
+# Campos del lugar incluidos en el resumen ('nombre' es el del item guardado
+# cuando el lugar ya no existe en t_lugares)
+PLACE_SUMMARY_FIELDS = ['id', 'name', 'nombre', 'type', 'tower', 'floor']
+
+
+def extract_fields_param(query_params, allowed_enriched=None):
+    """
+    Extrae el sparse fieldset ?fields=id_reporte,estado,lugar desde query params.
+
+    Args:
+        query_params: Dict de query string parameters
+        allowed_enriched: Campos calculados que el endpoint puede devolver
+                          (por ejemplo ['author_name', 'assigned_name'])
+
+    Returns:
+        Lista de campos pedidos (siempre incluye 'id_reporte')
+
+    Raises:
+        ValueError: Si se pide un campo que no pertenece al resumen
+    """
+    allowed_enriched = allowed_enriched or []
+    allowed = SUMMARY_FIELDS + allowed_enriched
+
+    raw = (query_params or {}).get('fields')
+    if not raw:
+        return list(allowed)
+
+    fields = []
+    for field in raw.split(','):
+        field = field.strip()
+        if not field or field in fields:
+            continue
+        if field not in allowed:
+            raise ValueError(f"Unknown field '{field}'. Allowed: {', '.join(allowed)}")
+        fields.append(field)
+
+    if 'id_reporte' not in fields:
+        fields.insert(0, 'id_reporte')
+
+    return fields
+
+
+def resolve_order_by(order_by, default_order_by):
+    """
+    Campo de orden a usar: los GSI solo proyectan los campos del resumen, así que
+    un orderBy fuera de SUMMARY_FIELDS se ignora (con un warning en el log) y se
+    ordena por default_order_by, como antes de existir el resumen.
+
+    Returns:
+        order_by si es parte del resumen, si no default_order_by
+    """
+    if order_by in SUMMARY_FIELDS:
+        return order_by
+    print(f"Warning: cannot order by '{order_by}', using '{default_order_by}'")
+    return default_order_by
+
+
+def stored_fields_for(fields, *extra):
+    """
+    Atributos que hay que leer de DynamoDB para construir los campos pedidos
+    (incluye las dependencias de los campos calculados y los extras indicados).
+    """
+    stored = []
+    for field in list(fields) + list(extra):
+        field = ENRICHED_FIELDS.get(field, field)
+        if field in SUMMARY_FIELDS and field not in stored:
+            stored.append(field)
+    return stored
+
+
+def to_report_summary(report, fields):
+    """
+    Construye el DTO compacto de un reporte ya enriquecido.
+
+    Args:
+        report: Item del reporte (posiblemente enriquecido)
+        fields: Lista de campos a devolver
+
+    Returns:
+        Dict solo con los campos pedidos presentes en el reporte
+    """
+    summary = {}
+    for field in fields:
+        if field not in report:
+            continue
+        value = report[field]
+        if field == 'lugar' and isinstance(value, dict):
+            value = {k: value[k] for k in PLACE_SUMMARY_FIELDS if k in value}
+        summary[field] = value
+    return summary
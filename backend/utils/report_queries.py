@@ -0,0 +1,508 @@
+"""
+Motor de consultas sobre t_reportes basado en índices secundarios globales (GSI).
+Elige el índice más selectivo para los filtros del request y solo lee los items
+que coinciden, en lugar de escanear toda la tabla.
+"""
+import heapq
+from itertools import islice
+from boto3.dynamodb.conditions import Key, Attr
+from utils.filters import sort_items
+from utils.pagination import paginate_by_cursor, paginate_results
+from utils.dynamo import dynamodb
+from utils.stats_counters import load_counters, author_key, sector_key, GLOBAL_KEY
+
+reports_table = dynamodb.Table('t_reportes')
+
+# Estados válidos de un reporte (cada uno es una partición de EstadoCreatedIndex)
+ESTADOS = ['PENDIENTE', 'ATENDIENDO', 'RESUELTO']
+
+# Atributo de partición -> índice que lo tiene como HASH y su clave de ordenamiento
+REPORT_INDEXES = {
+    'author_id': {'index_name': 'AuthorCreatedIndex', 'sort_key': 'created_at'},
+    'assigned_to': {'index_name': 'AssignedUpdatedIndex', 'sort_key': 'updated_at'},
+    'assigned_sector': {'index_name': 'SectorCreatedIndex', 'sort_key': 'created_at'},
+    'estado': {'index_name': 'EstadoCreatedIndex', 'sort_key': 'created_at'},
+}
+
+# Preferencia cuando varios filtros tienen índice: el más selectivo primero
+INDEX_PRIORITY = ['author_id', 'assigned_to', 'assigned_sector', 'estado']
+
+
+def plan_query(filters, created_from=None, created_to=None):
+    """
+    Decide qué índice usar para un conjunto de filtros de igualdad.
+
+    Si ningún filtro tiene índice propio, se recorren las particiones de
+    EstadoCreatedIndex (una por estado) y se mezclan por fecha de creación.
+
+    Args:
+        filters: Dict {campo: valor} con los filtros del request
+        created_from: Solo reportes con created_at >= este valor (opcional);
+                      en índices ordenados por created_at va en la KeyCondition
+        created_to: Solo reportes con created_at < este valor (opcional)
+
+    Returns:
+        Dict con estructura:
+        {
+            'index_name': str,
+            'partition_key': str,
+            'partition_values': [...],
+            'sort_key': str,
+            'residual_filters': {campo: valor},  # se aplican como FilterExpression
+            'created_from': str | None,
+            'created_to': str | None
+        }
+    """
+    active_filters = {k: v for k, v in (filters or {}).items() if v is not None and v != ''}
+
+    for attr in INDEX_PRIORITY:
+        if attr in active_filters:
+            index = REPORT_INDEXES[attr]
+            return {
+                'index_name': index['index_name'],
+                'partition_key': attr,
+                'partition_values': [active_filters[attr]],
+                'sort_key': index['sort_key'],
+                'residual_filters': {k: v for k, v in active_filters.items() if k != attr},
+                'created_from': created_from,
+                'created_to': created_to
+            }
+
+    index = REPORT_INDEXES['estado']
+    return {
+        'index_name': index['index_name'],
+        'partition_key': 'estado',
+        'partition_values': list(ESTADOS),
+        'sort_key': index['sort_key'],
+        'residual_filters': active_filters,
+        'created_from': created_from,
+        'created_to': created_to
+    }
+
+
+def build_filter_expression(residual_filters):
+    """
+    Convierte filtros de igualdad en una FilterExpression de DynamoDB.
+
+    Returns:
+        Condición combinada con AND, o None si no hay filtros
+    """
+    expression = None
+    for field, value in residual_filters.items():
+        condition = Attr(field).eq(value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def build_projection(plan, fields):
+    """
+    Arma ProjectionExpression para leer solo los atributos pedidos.
+
+    Siempre incluye la clave primaria y las claves del índice (necesarias para
+    el merge entre particiones y para construir el cursor).
+
+    Args:
+        plan: Plan generado por plan_query
+        fields: Lista de atributos almacenados a leer, o None para el item completo
+
+    Returns:
+        Dict con ProjectionExpression y ExpressionAttributeNames, o {} si fields es None
+    """
+    if fields is None:
+        return {}
+
+    attributes = []
+    for attr in ['id_reporte', plan['partition_key'], plan['sort_key'], *fields]:
+        if attr and attr not in attributes:
+            attributes.append(attr)
+
+    # Placeholders propios (#f0, #f1...) porque 'estado' o 'lugar' podrían ser
+    # palabras reservadas; boto3 usa #n0... para las condiciones
+    names = {f'#f{i}': attr for i, attr in enumerate(attributes)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def _partition_query_params(plan, partition_value, ascending=False, page_size=None, position=None, fields=None):
+    """Parámetros de reports_table.query para una partición del índice (ver query_partition)"""
+    key_condition = Key(plan['partition_key']).eq(partition_value)
+    filter_expression = build_filter_expression(plan['residual_filters'])
+
+    created_from = plan.get('created_from')
+    created_to = plan.get('created_to')
+    range_conditions = []
+    if plan['sort_key'] == 'created_at' and (created_from or created_to):
+        # La KeyCondition admite una sola condición sobre la clave de ordenamiento:
+        # BETWEEN es inclusivo, así que el límite superior exclusivo se filtra aparte
+        if created_from and created_to:
+            key_condition = key_condition & Key('created_at').between(created_from, created_to)
+            range_conditions.append(Attr('created_at').lt(created_to))
+        elif created_from:
+            key_condition = key_condition & Key('created_at').gte(created_from)
+        else:
+            key_condition = key_condition & Key('created_at').lt(created_to)
+    else:
+        if created_from:
+            range_conditions.append(Attr('created_at').gte(created_from))
+        if created_to:
+            range_conditions.append(Attr('created_at').lt(created_to))
+    for condition in range_conditions:
+        filter_expression = condition if filter_expression is None else filter_expression & condition
+
+    params = {
+        'IndexName': plan['index_name'],
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': ascending
+    }
+
+    if page_size:
+        params['Limit'] = page_size
+
+    params.update(build_projection(plan, fields))
+
+    if position:
+        # ExclusiveStartKey de un GSI = claves del índice + clave primaria de la tabla
+        params['ExclusiveStartKey'] = {
+            plan['partition_key']: partition_value,
+            plan['sort_key']: position['value'],
+            'id_reporte': position['id']
+        }
+
+    if filter_expression is not None:
+        params['FilterExpression'] = filter_expression
+
+    return params
+
+
+def query_partition(plan, partition_value, ascending=False, page_size=None, position=None, fields=None):
+    """
+    Itera los items de una partición del índice en orden de su clave de ordenamiento.
+    Lee página por página de DynamoDB a medida que se consumen los items.
+
+    Args:
+        plan: Plan generado por plan_query
+        partition_value: Valor del atributo de partición a consultar
+        ascending: True para orden ascendente por la clave de ordenamiento
+        page_size: Límite de items leídos por llamada a DynamoDB (opcional)
+        position: Dict {'value', 'id'} del último item ya entregado; la lectura
+                  empieza justo después de esa posición (opcional)
+        fields: Atributos a leer (ProjectionExpression); None lee el item completo
+
+    Yields:
+        Items (dicts) de la partición que cumplen los filtros residuales
+    """
+    params = _partition_query_params(plan, partition_value, ascending, page_size, position, fields)
+
+    while True:
+        response = reports_table.query(**params)
+        for item in response.get('Items', []):
+            yield item
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def read_partition(plan, partition_value, limit, ascending=False, position=None, fields=None):
+    """
+    Lee a lo sumo `limit` items de una partición, desde una posición.
+
+    A diferencia de query_partition no sigue leyendo cuando ya tiene `limit`
+    items: es lo más que puede aportar una partición a una página de `limit`
+    items mezclada con las demás.
+
+    Returns:
+        Tuple (items, resume):
+            items: Hasta `limit` items en orden de la clave de ordenamiento
+            resume: Posición {'value', 'id'} desde la que seguir después del último
+                    item leído (la de LastEvaluatedKey si DynamoDB llegó más lejos
+                    descartando items con la FilterExpression), o None si la
+                    partición se terminó
+    """
+    params = _partition_query_params(plan, partition_value, ascending, limit, position, fields)
+    sort_key = plan['sort_key']
+
+    items = []
+    while True:
+        response = reports_table.query(**params)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+
+        if len(items) > limit:
+            items = items[:limit]
+            return items, {'value': items[-1].get(sort_key), 'id': items[-1]['id_reporte']}
+        if not last_key:
+            return items, None
+        if len(items) == limit:
+            return items, {'value': last_key[sort_key], 'id': last_key['id_reporte']}
+        params['ExclusiveStartKey'] = last_key
+
+
+def _merge_partitions(plan, reads, ascending, limit):
+    """Primeros `limit` items de varias lecturas de read_partition, en orden de la clave del índice"""
+    sort_key = plan['sort_key']
+    return list(islice(
+        heapq.merge(
+            *(items for items, _ in reads.values()),
+            key=lambda item: item.get(sort_key) or '',
+            reverse=not ascending
+        ),
+        limit
+    ))
+
+
+def iter_reports(plan, ascending=False, page_size=None, position=None, fields=None):
+    """
+    Itera todos los items del plan ordenados por la clave de ordenamiento del índice.
+    Con varias particiones hace un merge ordenado de los streams de cada una.
+    """
+    streams = [
+        query_partition(plan, value, ascending, page_size, position, fields)
+        for value in plan['partition_values']
+    ]
+
+    if len(streams) == 1:
+        return streams[0]
+
+    sort_key = plan['sort_key']
+    return heapq.merge(
+        *streams,
+        key=lambda item: item.get(sort_key) or '',
+        reverse=not ascending
+    )
+
+
+def _with_order_field(fields, order_by):
+    """Agrega el campo de orden a la proyección (para ordenar en memoria)"""
+    if fields is None or order_by in fields:
+        return fields
+    return list(fields) + [order_by]
+
+
+def query_reports(filters, order_by='created_at', order='desc', fields=None, created_from=None, created_to=None):
+    """
+    Obtiene los reportes que cumplen los filtros usando el mejor índice disponible.
+
+    Args:
+        filters: Dict {campo: valor} con filtros de igualdad (author_id, assigned_to, estado, urgencia, assigned_sector)
+        order_by: Campo por el cual ordenar (default: 'created_at')
+        order: Dirección 'asc' o 'desc' (default: 'desc')
+        fields: Atributos a leer de cada reporte (None = item completo)
+        created_from: Solo reportes creados desde esta fecha ISO (opcional)
+        created_to: Solo reportes creados antes de esta fecha ISO (opcional)
+
+    Returns:
+        Lista de reportes filtrados y ordenados
+    """
+    plan = plan_query(filters, created_from, created_to)
+    ascending = order.lower() == 'asc'
+    fields = _with_order_field(fields, order_by)
+    reports = list(iter_reports(plan, ascending, fields=fields))
+
+    # El índice ya entrega el orden pedido; otros campos se ordenan en memoria
+    if order_by != plan['sort_key']:
+        reports = sort_items(reports, order_by, order)
+
+    return reports
+
+
+def _partition_positions(plan, position):
+    """
+    Posición de inicio de cada partición a partir de la posición del cursor.
+
+    Returns:
+        Dict {valor de partición: {'value', 'id'} | None (desde el inicio)};
+        las particiones ya terminadas no aparecen
+    """
+    if not position:
+        return {value: None for value in plan['partition_values']}
+    if 'partitions' in position:
+        partitions = position['partitions']
+        return {value: partitions[value] for value in plan['partition_values'] if value in partitions}
+    # Cursor con una sola posición (emitido antes de guardar una por partición)
+    return {value: position for value in plan['partition_values']}
+
+
+def query_reports_page(filters, order_by='created_at', order='desc', size=20, position=None, fields=None):
+    """
+    Obtiene una sola página de reportes en modo cursor (keyset).
+
+    Cuando el orden pedido es la clave de ordenamiento del índice, cada partición
+    se lee desde su propia posición y deja de leerse al juntar size+1 items (lo
+    más que puede aportar a la página), así que el costo no depende del número
+    de página. El cursor guarda la posición de cada partición
+    ({'partitions': {valor: posición}}): una partición que no aportó items a la
+    página se retoma donde estaba y una que se terminó ya no se vuelve a leer.
+    Para otros campos de orden se leen todos los items que cumplen los filtros y
+    se pagina en memoria.
+
+    Args:
+        filters: Dict {campo: valor} con filtros de igualdad
+        order_by: Campo por el cual ordenar (default: 'created_at')
+        order: Dirección 'asc' o 'desc' (default: 'desc')
+        size: Items por página
+        position: Posición decodificada del cursor (None para la primera página)
+        fields: Atributos a leer de cada reporte (None = item completo)
+
+    Returns:
+        Dict {'items': [...], 'next_position': dict | None, 'has_next': bool}
+    """
+    plan = plan_query(filters)
+    ascending = order.lower() == 'asc'
+    fields = _with_order_field(fields, order_by)
+
+    if order_by != plan['sort_key']:
+        reports = list(iter_reports(plan, ascending, fields=fields))
+        return paginate_by_cursor(reports, size, position, order_by, order, id_field='id_reporte')
+
+    starts = _partition_positions(plan, position)
+    reads = {
+        value: read_partition(plan, value, size + 1, ascending, start, fields)
+        for value, start in starts.items()
+    }
+    items = _merge_partitions(plan, reads, ascending, size + 1)
+
+    has_next = len(items) > size
+    items = items[:size]
+    next_position = None
+    if has_next:
+        # Cuántos items de cada partición entraron en la página
+        delivered = {}
+        for item in items:
+            value = item.get(plan['partition_key'])
+            delivered[value] = delivered.get(value, 0) + 1
+
+        partitions = {}
+        for value, (partition_items, resume) in reads.items():
+            count = delivered.get(value, 0)
+            if count == 0:
+                partitions[value] = starts[value]
+            elif count < len(partition_items):
+                last = partition_items[count - 1]
+                partitions[value] = {'value': last.get(plan['sort_key']), 'id': last['id_reporte']}
+            elif resume is not None:
+                partitions[value] = resume
+        next_position = {'partitions': partitions}
+
+    return {
+        'items': items,
+        'next_position': next_position,
+        'has_next': has_next
+    }
+
+
+def query_reports_offset(filters, order_by='created_at', order='desc', page=1, size=20, fields=None):
+    """
+    Obtiene una página de reportes en modo offset (page/size).
+
+    Cuando el orden pedido es la clave de ordenamiento del índice, cada partición
+    se lee solo hasta page*size+1 items (lo más que puede aportar hasta el final
+    de la página). Si hay más items después de la página, el total sale de
+    count_reports (contadores de t_stats o ItemCount, sin recorrer el índice
+    cuando los filtros lo permiten) y puede ser aproximado. Para otros campos
+    de orden se leen todos los items.
+
+    Returns:
+        Dict con la estructura de paginate_results
+    """
+    plan = plan_query(filters)
+    if order_by != plan['sort_key']:
+        return paginate_results(query_reports(filters, order_by, order, fields), page, size)
+
+    ascending = order.lower() == 'asc'
+    fields = _with_order_field(fields, order_by)
+    page = max(1, int(page))
+    end = page * max(1, int(size))
+    reads = {
+        value: read_partition(plan, value, end + 1, ascending, fields=fields)
+        for value in plan['partition_values']
+    }
+    items = _merge_partitions(plan, reads, ascending, end + 1)
+
+    if len(items) <= end:
+        # No hay nada después de la página: el prefijo leído es el total
+        return paginate_results(items, page, size)
+    total_items, total_is_approximate = count_reports(filters)
+    # Los contadores pueden ir detrás de las escrituras: nunca menos de lo ya leído
+    total_items = max(total_items, len(items))
+    return paginate_results(items[:end], page, size, total_items=total_items,
+                            total_is_approximate=total_is_approximate)
+
+
+# Filtro -> group-by de los contadores de t_stats que lo cuenta
+STATS_GROUP_BY = {'estado': 'by_estado', 'urgencia': 'by_urgencia', 'assigned_sector': 'by_sector'}
+
+
+def count_from_stats(filters):
+    """
+    Total de reportes que cumplen los filtros leído de los contadores de t_stats
+    (un get_item), cuando alguno los cuenta.
+
+    Cubre sin filtros, un autor o un sector, cada uno con a lo sumo un filtro
+    de estado, urgencia o sector. Los contadores de asignados son por sector
+    (ASSIGNEE#<user>#<sector>), así que assigned_to no se cubre.
+
+    Returns:
+        int, o None si ningún contador corresponde a los filtros
+    """
+    active_filters = {k: v for k, v in (filters or {}).items() if v is not None and v != ''}
+    if 'assigned_to' in active_filters:
+        return None
+    if 'author_id' in active_filters:
+        stat_key = author_key(active_filters.pop('author_id'))
+    elif 'assigned_sector' in active_filters:
+        stat_key = sector_key(active_filters.pop('assigned_sector'))
+    else:
+        stat_key = GLOBAL_KEY
+    if len(active_filters) > 1:
+        return None
+
+    counters = load_counters([stat_key])[stat_key]
+    if not active_filters:
+        return counters['total']
+    (field, value), = active_filters.items()
+    if field not in STATS_GROUP_BY:
+        return None
+    return counters[STATS_GROUP_BY[field]].get(value, 0)
+
+
+def count_reports(filters, created_from=None, created_to=None):
+    """
+    Cuenta los reportes que cumplen los filtros (include_total y totales del modo offset).
+
+    Sin rango de fechas lee el contador de t_stats que corresponde a los filtros
+    (count_from_stats), que cuesta un get_item. Si no hay contador: sin filtros
+    usa el ItemCount de la tabla, que DynamoDB actualiza cada ~6 horas
+    (aproximado, sin consumir RCUs); con filtros o rango de fechas hace queries
+    Select=COUNT sobre el índice elegido, con las mismas condiciones que la
+    lectura de los items.
+
+    Returns:
+        Tuple (total, is_approximate)
+    """
+    if not created_from and not created_to:
+        total = count_from_stats(filters)
+        if total is not None:
+            return total, False
+
+    plan = plan_query(filters, created_from, created_to)
+
+    if (not plan['residual_filters'] and len(plan['partition_values']) > 1
+            and not created_from and not created_to):
+        return int(reports_table.item_count), True
+
+    total = 0
+    for value in plan['partition_values']:
+        params = _partition_query_params(plan, value)
+        params['Select'] = 'COUNT'
+
+        while True:
+            response = reports_table.query(**params)
+            total += response.get('Count', 0)
+            if 'LastEvaluatedKey' not in response:
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return total, False
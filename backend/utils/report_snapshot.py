@@ -0,0 +1,343 @@
+"""
+Snapshot columnar de t_reportes para cargas analíticas.
+Guarda los reportes como columnas NumPy (utils/report_columns.py) en archivos
+.npz comprimidos, una partición por día de created_at, más un manifest.json con
+la versión vigente de cada partición y el watermark de la última actualización.
+
+La actualización es incremental: solo lee de DynamoDB los reportes con
+changed_at >= watermark (ChangedDayIndex, una partición por día de changed_at).
+changed_at es la última escritura de cualquier origen (Lambdas y DAG de
+clasificación); updated_at solo cambia con las acciones de las autoridades
+y reescribe las particiones de los días afectados. Los lectores (analytics,
+DAGs) leen el snapshot sin consumir RCUs de DynamoDB; el dato tiene el retraso
+de la última actualización (functions/refreshSnapshot.py, cada 5 minutos).
+
+Backends: S3 (SNAPSHOT_URI=s3://bucket/prefijo) o disco local
+(SNAPSHOT_URI=file:///ruta o una ruta), este último para pruebas sin AWS.
+"""
+import io
+import json
+import os
+from datetime import datetime, timedelta
+import boto3
+import numpy as np
+from boto3.dynamodb.conditions import Key
+from utils.cache import TTLCache
+from utils.report_columns import to_columns, COLUMNS
+from utils.dynamo import dynamodb
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 1
+
+# Margen de relectura: cubre la consistencia eventual del GSI y desfases de reloj
+# entre Lambdas (releer un reporte es inocuo: se reemplaza por id)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Índice de t_reportes por día de changed_at (ver resources/dynamodb-tables.yml)
+CHANGED_INDEX = 'ChangedDayIndex'
+
+# Particiones ya leídas en este contenedor (los archivos son inmutables: la clave es el nombre)
+partition_cache = TTLCache(max_size=512, ttl=3600)
+manifest_cache = TTLCache(max_size=8, ttl=60)
+
+
+class LocalSnapshotStore:
+    """Backend en disco local (pruebas offline y desarrollo)"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def read(self, name):
+        """Contenido de un archivo, o None si no existe"""
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name, data):
+        """Escribe un archivo de forma atómica (archivo temporal + rename)"""
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def __repr__(self):
+        return f'file://{self.root}'
+
+
+class S3SnapshotStore:
+    """Backend en S3 (bucket + prefijo)"""
+
+    def __init__(self, bucket, prefix=''):
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.s3 = boto3.client('s3')
+
+    def _key(self, name):
+        return f'{self.prefix}/{name}' if self.prefix else name
+
+    def read(self, name):
+        """Contenido de un objeto, o None si no existe"""
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self._key(name))
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return response['Body'].read()
+
+    def write(self, name, data):
+        self.s3.put_object(Bucket=self.bucket, Key=self._key(name), Body=data)
+
+    def delete(self, name):
+        self.s3.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+    def __repr__(self):
+        return f's3://{self.bucket}/{self.prefix}'
+
+
+def snapshot_store_from_uri(uri):
+    """'s3://bucket/prefijo' -> S3SnapshotStore; 'file:///ruta' o ruta -> LocalSnapshotStore"""
+    if uri.startswith('s3://'):
+        bucket, _, prefix = uri[len('s3://'):].partition('/')
+        return S3SnapshotStore(bucket, prefix)
+    if uri.startswith('file://'):
+        uri = uri[len('file://'):]
+    return LocalSnapshotStore(uri)
+
+
+def get_snapshot_store():
+    """Backend configurado en SNAPSHOT_URI, o None si no hay snapshot configurado"""
+    uri = os.environ.get('SNAPSHOT_URI')
+    return snapshot_store_from_uri(uri) if uri else None
+
+
+# --- Serialización ---
+
+def _empty_manifest():
+    return {'format': MANIFEST_FORMAT, 'watermark': None, 'partitions': {}}
+
+
+def read_manifest(store, use_cache=True):
+    """Manifest del snapshot ({'watermark', 'partitions': {día: {...}}}), vacío si no existe"""
+    cache_key = repr(store)
+    if use_cache:
+        cached = manifest_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    data = store.read(MANIFEST_NAME)
+    manifest = json.loads(data) if data else _empty_manifest()
+    manifest_cache.set(cache_key, manifest)
+    return manifest
+
+
+def _write_manifest(store, manifest):
+    store.write(MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    manifest_cache.set(repr(store), manifest)
+
+
+def _serialize_columns(columns):
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    return buffer.getvalue()
+
+
+def _deserialize_columns(data):
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def read_partition(store, entry):
+    """Columnas de una partición del manifest (con caché por nombre de archivo)"""
+    cache_key = (repr(store), entry['file'])
+    columns = partition_cache.get(cache_key)
+    if columns is None:
+        data = store.read(entry['file'])
+        if data is None:
+            return None
+        columns = _deserialize_columns(data)
+        partition_cache.set(cache_key, columns)
+    return columns
+
+
+def concat_columns(parts, columns=None):
+    """Concatena varios dicts de columnas (mismas columnas en todos)"""
+    parts = [part for part in parts if part]
+    names = columns or (list(parts[0]) if parts else list(COLUMNS))
+    if not parts:
+        return to_columns([], names)
+    return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+
+# --- Lectura ---
+
+def _day(value):
+    return value.strftime('%Y-%m-%d')
+
+
+def load_columns(store, start, end=None, columns=None):
+    """
+    Columnas de los reportes creados en [start, end) según el snapshot.
+
+    Args:
+        store: Backend del snapshot
+        start: Inicio (datetime UTC naive)
+        end: Fin exclusivo (datetime UTC naive); None = sin límite
+        columns: Columnas a devolver (default: todas)
+
+    Returns:
+        Dict {columna: ndarray}, o None si el snapshot no existe todavía o le
+        faltan particiones del rango (los callers leen entonces DynamoDB)
+    """
+    for attempt in range(2):
+        manifest = read_manifest(store, use_cache=attempt == 0)
+        if manifest['watermark'] is None:
+            return None
+
+        first_day, last_day = _day(start), _day(end) if end else None
+        parts = []
+        missing = False
+        for day in sorted(manifest['partitions']):
+            if day < first_day or (last_day and day > last_day):
+                continue
+            part = read_partition(store, manifest['partitions'][day])
+            if part is None:
+                # Partición reemplazada por una actualización: releer el manifest
+                missing = True
+                break
+            parts.append(part)
+        if not missing:
+            break
+    else:
+        # Con los reintentos agotados, devolver las particiones leídas contaría de menos
+        print("⚠️ Snapshot con particiones faltantes después de releer el manifest")
+        return None
+
+    names = list(columns or COLUMNS)
+    result = concat_columns(parts, sorted(set(names) | {'created_at'}))
+    created = result['created_at']
+    mask = created >= np.datetime64(start, 'us')
+    if end is not None:
+        mask &= created < np.datetime64(end, 'us')
+    return {name: result[name][mask] for name in names}
+
+
+# --- Actualización ---
+
+def _partition_day(report):
+    created_at = report.get('created_at')
+    return created_at[:10] if created_at else None
+
+
+def _scan_all(table):
+    response = table.scan()
+    yield from response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+        yield from response.get('Items', [])
+
+
+def _changed_since(table, since, until):
+    """Reportes con changed_at >= since, día por día de ChangedDayIndex"""
+    day = since.replace(hour=0, minute=0, second=0, microsecond=0)
+    since_str = since.isoformat() + 'Z'
+    while day <= until:
+        params = {
+            'IndexName': CHANGED_INDEX,
+            'KeyConditionExpression': Key('changed_day').eq(_day(day)) & Key('changed_at').gte(since_str)
+        }
+        while True:
+            response = table.query(**params)
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        day += timedelta(days=1)
+
+
+def _write_partition(store, manifest, day, reports, previous=None, merge=True):
+    """
+    Escribe la partición de un día como un archivo nuevo (versión siguiente).
+
+    Args:
+        previous: Entrada anterior de la partición en el manifest (o None)
+        merge: Si True, los reportes reemplazan/agregan filas (por id) a la partición anterior;
+               si False, la partición queda solo con estos reportes
+    """
+    new_rows = to_columns(reports)
+    if previous and merge:
+        current = read_partition(store, previous)
+        keep = ~np.isin(current['id_reporte'], new_rows['id_reporte'])
+        new_rows = concat_columns([{name: current[name][keep] for name in COLUMNS}, new_rows])
+
+    version = (previous['version'] + 1) if previous else 1
+    file_name = f'partitions/{day}/v{version}.npz'
+    store.write(file_name, _serialize_columns(new_rows))
+    manifest['partitions'][day] = {
+        'file': file_name,
+        'version': version,
+        'rows': int(len(new_rows['id_reporte']))
+    }
+
+
+def refresh_snapshot(store, table=None, full=False, now=None):
+    """
+    Actualiza el snapshot con los reportes modificados desde el watermark.
+
+    La primera vez (o con full=True) recorre toda la tabla con un scan; después
+    solo consulta ChangedDayIndex desde watermark - WATERMARK_OVERLAP.
+
+    Returns:
+        Dict {'mode', 'reports_read', 'partitions_written', 'watermark'}
+    """
+    table = table or dynamodb.Table('t_reportes')
+    now = now or datetime.utcnow()
+    manifest = read_manifest(store, use_cache=False)
+    full = full or manifest['watermark'] is None
+
+    previous_partitions = dict(manifest['partitions'])
+    if full:
+        manifest['partitions'] = {}
+        reports = _scan_all(table)
+    else:
+        watermark = datetime.fromisoformat(manifest['watermark'].rstrip('Z'))
+        reports = _changed_since(table, watermark - WATERMARK_OVERLAP, now)
+
+    by_day = {}
+    reports_read = 0
+    for report in reports:
+        reports_read += 1
+        day = _partition_day(report)
+        if day:
+            by_day.setdefault(day, {})[report['id_reporte']] = report
+
+    for day, day_reports in sorted(by_day.items()):
+        _write_partition(store, manifest, day, list(day_reports.values()), previous_partitions.get(day), merge=not full)
+
+    # El watermark es el inicio de esta lectura: lo escrito durante la lectura se relee la próxima vez
+    manifest['watermark'] = now.isoformat() + 'Z'
+    _write_manifest(store, manifest)
+
+    # Versiones anteriores: se borran después de publicar el nuevo manifest
+    current_files = {entry['file'] for entry in manifest['partitions'].values()}
+    for entry in previous_partitions.values():
+        if entry['file'] not in current_files:
+            store.delete(entry['file'])
+
+    return {
+        'mode': 'full' if full else 'incremental',
+        'reports_read': reports_read,
+        'partitions_written': len(by_day),
+        'watermark': manifest['watermark']
+    }
@@ -0,0 +1,206 @@
+"""
+Caché de respuestas de los endpoints de lectura que los dashboards consultan
+en polling (GET /reports, GET /stats, GET /reports/airflow/analytics).
+
+Cada entrada se guarda junto con la generación de las tablas de las que
+depende. Los escritores de reportes (sendReport, updateStatus, takeReport,
+assignReport y el DAG de clasificación) incrementan la generación de
+t_reportes con bump_generation; una entrada solo se sirve si la generación
+actual coincide con la que tenía al calcularse. Así, mientras los datos no
+cambien, un request cuesta un get_item sobre t_cache en lugar de las
+queries sobre t_reportes y t_stats.
+
+Cada entrada guarda también el ETag de su body: si el request trae un
+If-None-Match vigente, se responde 304 sin calcular ni serializar nada.
+
+Dos niveles:
+    - Contenedor: TTLCache de módulo (warm starts de la misma Lambda)
+    - Compartido entre contenedores: configurable con RESPONSE_CACHE_URI
+      ('dynamodb://t_cache', 'memory://' para pruebas locales, sin definir = sin nivel compartido)
+
+El TTL de las entradas acota lo que la generación no detecta: los períodos
+relativos (today/week/month) se desplazan con el reloj y los nombres de
+usuarios de los listados tienen su propia caché (utils/reference_data.py).
+"""
+import hashlib
+import os
+import time
+from utils.cache import TTLCache
+from utils.serialization import dumps, loads
+from utils.jwt_validator import (
+    compute_etag, etag_headers, etag_matches, create_not_modified_response,
+    compress_response, negotiate_encoding, COMPRESSION_MIN_SIZE
+)
+from utils.dynamo import dynamodb
+from utils.generations import (
+    current_generations, bump_generation, CACHE_TABLE_NAME, REPORTS_GENERATION, SNAPSHOT_GENERATION
+)
+
+ENTRY_PREFIX = 'RESP#'
+
+DEFAULT_TTL = 300
+
+# Vida máxima de una respuesta cacheada (los ttl mayores se recortan). Las URLs
+# firmadas que llevan las respuestas cuentan con ella (utils/s3_helper.py)
+MAX_TTL = 15 * 60
+
+# Nivel de contenedor: {clave: {'generations': {...}, 'response': {...}, 'etag': str, 'expires_at': float}}
+local_cache = TTLCache(max_size=256, ttl=DEFAULT_TTL)
+
+
+class LocalSharedCache:
+    """Nivel compartido en memoria (pruebas locales: simula un backend común a varios contenedores)"""
+
+    def __init__(self):
+        self._data = {}
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def set(self, key, value, ttl):
+        self._data[key] = (value, time.time() + ttl)
+
+    def clear(self):
+        self._data.clear()
+
+
+class DynamoDBSharedCache:
+    """Nivel compartido en una tabla DynamoDB (items RESP#<hash> con TTL en expires_at)"""
+
+    def __init__(self, table_name=CACHE_TABLE_NAME):
+        self.table = dynamodb.Table(table_name)
+
+    def get(self, key):
+        item = self.table.get_item(Key={'cache_key': ENTRY_PREFIX + key}).get('Item')
+        # El borrado por TTL de DynamoDB puede tardar: se valida la expiración al leer
+        if item is None or int(item['expires_at']) <= time.time():
+            return None
+        return loads(item['entry'])
+
+    def set(self, key, value, ttl):
+        self.table.put_item(Item={
+            'cache_key': ENTRY_PREFIX + key,
+            'entry': dumps(value),
+            'expires_at': int(time.time() + ttl)
+        })
+
+
+def shared_cache_from_uri(uri):
+    """'dynamodb://tabla' -> DynamoDBSharedCache; 'memory://' -> LocalSharedCache; vacío -> None"""
+    if not uri:
+        return None
+    if uri.startswith('dynamodb://'):
+        return DynamoDBSharedCache(uri[len('dynamodb://'):] or CACHE_TABLE_NAME)
+    if uri.startswith('memory://'):
+        return LocalSharedCache()
+    raise ValueError(f'Unsupported RESPONSE_CACHE_URI: {uri}')
+
+
+shared_cache = shared_cache_from_uri(os.environ.get('RESPONSE_CACHE_URI'))
+
+
+def set_shared_cache(cache):
+    """Reemplaza el nivel compartido (None lo desactiva)"""
+    global shared_cache
+    shared_cache = cache
+
+
+# --- Respuestas ---
+
+def cache_key(endpoint, scope, params):
+    """
+    Clave de una respuesta: endpoint + alcance (rol, sector o usuario que cambia el
+    resultado) + parámetros ya normalizados por el handler.
+    """
+    raw = dumps({'e': endpoint, 's': scope, 'p': params}, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _serve(entry, source, if_none_match, accept_encoding, min_compress_size):
+    etag = entry.get('etag') or compute_etag(entry['response']['body'])
+    if etag_matches(etag, if_none_match):
+        return create_not_modified_response(etag, {'X-Cache': source})
+
+    response = dict(entry['response'])
+    response['headers'] = {**response.get('headers', {}), **etag_headers(etag)}
+    if accept_encoding is not None:
+        # La versión comprimida también se guarda en la entrada (solo en este contenedor)
+        encoding = negotiate_encoding(accept_encoding) or 'identity'
+        encoded = entry.setdefault('encoded', {})
+        if encoding not in encoded:
+            encoded[encoding] = compress_response(response, accept_encoding, min_compress_size)
+        response = encoded[encoding]
+    return {**response, 'headers': {**response['headers'], 'X-Cache': source}}
+
+
+def cached_response(endpoint, scope, params, sources, compute, ttl=DEFAULT_TTL, if_none_match=None,
+                    accept_encoding=None, min_compress_size=COMPRESSION_MIN_SIZE):
+    """
+    Respuesta cacheada si sus fuentes no cambiaron; si no, la calcula y la guarda.
+
+    Args:
+        endpoint: Nombre del endpoint (parte de la clave)
+        scope: Dict con lo que distingue a quien consulta (rol, sector, user_id)
+        params: Dict con los parámetros normalizados de la consulta
+        sources: Fuentes de datos de las que depende la respuesta (REPORTS_GENERATION, ...);
+                 [] = solo TTL (datos que casi no cambian, como t_lugares)
+        compute: Función sin argumentos que retorna la respuesta (create_response)
+        ttl: Segundos máximos de vida de la entrada (a lo sumo MAX_TTL)
+        if_none_match: ETags que ya tiene el cliente (extract_if_none_match)
+        accept_encoding: Accept-Encoding del request (None = no comprimir)
+        min_compress_size: Umbral de compresión del handler (ver create_response)
+
+    Returns:
+        Respuesta HTTP (304 si el cliente tiene la versión vigente); solo se cachean las respuestas 200
+    """
+    key = cache_key(endpoint, scope, params)
+    ttl = min(ttl, MAX_TTL)
+    if_none_match = if_none_match or set()
+    try:
+        generations = current_generations(sources)
+    except Exception as e:
+        print(f"⚠️ Response cache disabled for this request: {e}")
+        return compute()
+
+    entry = local_cache.get(key)
+    if entry is not None and entry['generations'] == generations:
+        return _serve(entry, 'HIT', if_none_match, accept_encoding, min_compress_size)
+
+    if shared_cache is not None:
+        try:
+            entry = shared_cache.get(key)
+        except Exception as e:
+            print(f"⚠️ Error leyendo la caché compartida: {e}")
+            entry = None
+        if entry is not None and entry['generations'] == generations:
+            # En el contenedor vive solo lo que le queda en el nivel compartido
+            remaining = entry.get('expires_at', time.time() + ttl) - time.time()
+            if remaining > 0:
+                local_cache.set(key, entry, min(ttl, remaining))
+            return _serve(entry, 'HIT-SHARED', if_none_match, accept_encoding, min_compress_size)
+
+    response = compute()
+    if response.get('statusCode') != 200:
+        return response
+
+    # Se guarda con las generaciones leídas antes de calcular: si hubo una escritura
+    # durante el cálculo, la entrada ya nace vencida
+    entry = {
+        'generations': generations, 'response': response, 'etag': compute_etag(response['body']),
+        'expires_at': time.time() + ttl
+    }
+    local_cache.set(key, entry, ttl)
+    if shared_cache is not None:
+        try:
+            shared_cache.set(key, entry, ttl)
+        except Exception as e:
+            print(f"⚠️ Error guardando en la caché compartida: {e}")
+    return _serve(entry, 'MISS', if_none_match, accept_encoding, min_compress_size)
+
+
+def cache_stats():
+    """Contadores de hits/misses del nivel de contenedor"""
+    return local_cache.stats()
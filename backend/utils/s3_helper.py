@@ -1,16 +1,68 @@
 """
 S3 Helper - Generación de Pre-Signed URLs
 Convierte claves S3 en URLs HTTP seguras y temporales para consumo del frontend
+
+Las URLs firmadas (presigner de boto3 sobre un cliente S3 compartido) se guardan
+en caché de contenedor por clave S3 y se reutilizan hasta que les queda menos de
+URL_SAFETY_MARGIN de vigencia. Una URL firmada con las credenciales temporales
+del rol de Lambda deja de servir cuando esas credenciales expiran, así que la
+entrada tampoco dura más que ellas.
 """
 import boto3
 import os
+from botocore.credentials import RefreshableCredentials
 from botocore.exceptions import ClientError
+from utils.cache import TTLCache
+from utils.response_cache import MAX_TTL as RESPONSE_CACHE_MAX_TTL
 
-# Cliente S3 (singleton)
-s3_client = boto3.client('s3')
+# Cliente S3 (singleton); la sesión expone las credenciales con las que firma
+session = boto3.Session()
+s3_client = session.client('s3')
 BUCKET_NAME = os.environ.get('BUCKET_INGESTA', 'utec-alerta-dev-bucket-of-hack-utec')
 URL_EXPIRATION = 3600  # 1 hora en segundos
 
+# Vigencia mínima de una URL al llegar al frontend, para que alcance a cargar la imagen
+URL_CLIENT_MARGIN = 300
+
+# Una URL puede quedar dentro de una respuesta cacheada (utils/response_cache.py)
+# hasta RESPONSE_CACHE_MAX_TTL segundos: se deja de reutilizar cuando le queda
+# menos que eso más URL_CLIENT_MARGIN
+URL_SAFETY_MARGIN = RESPONSE_CACHE_MAX_TTL + URL_CLIENT_MARGIN
+
+# (clave S3, expiración) -> URL firmada
+presigned_url_cache = TTLCache(max_size=4096, ttl=URL_EXPIRATION - URL_SAFETY_MARGIN)
+
+
+def _credentials_lifetime(limit):
+    """
+    Segundos de vigencia (hasta limit) que les quedan a las credenciales con las
+    que firma s3_client, o None si no expiran (llaves de larga duración).
+    """
+    credentials = session.get_credentials()
+    if not isinstance(credentials, RefreshableCredentials):
+        return None
+    if not credentials.refresh_needed(refresh_in=limit):
+        return limit
+
+    # refresh_needed(refresh_in=s) es True si quedan menos de s segundos: búsqueda binaria
+    low, high = 0, int(limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if credentials.refresh_needed(refresh_in=middle):
+            high = middle - 1
+        else:
+            low = middle
+    return low
+
+
+def _cache_ttl(expiration):
+    """TTL de una URL recién firmada: su vigencia y la de las credenciales, menos el margen"""
+    lifetime = expiration
+    credentials_lifetime = _credentials_lifetime(expiration)
+    if credentials_lifetime is not None:
+        lifetime = min(lifetime, credentials_lifetime)
+    return lifetime - URL_SAFETY_MARGIN
+
 
 def generate_presigned_url(s3_key_or_url: str, expiration: int = URL_EXPIRATION) -> str:
     """
@@ -39,7 +91,12 @@ def generate_presigned_url(s3_key_or_url: str, expiration: int = URL_EXPIRATION)
             if len(parts) == 2:
                 s3_key = parts[1]  # Tomar solo la key después del bucket
         
-        # Generar URL firmada
+        # Reutilizar la URL si todavía le queda vigencia suficiente
+        cache_key = (s3_key, expiration)
+        presigned_url = presigned_url_cache.get(cache_key)
+        if presigned_url:
+            return presigned_url
+        
         presigned_url = s3_client.generate_presigned_url(
             'get_object',
             Params={
@@ -49,6 +106,10 @@ def generate_presigned_url(s3_key_or_url: str, expiration: int = URL_EXPIRATION)
             ExpiresIn=expiration
         )
         
+        ttl = _cache_ttl(expiration)
+        if ttl > 0:
+            presigned_url_cache.set(cache_key, presigned_url, ttl=ttl)
+        
         return presigned_url
     
     except ClientError as e:
@@ -102,3 +163,8 @@ def add_image_urls_to_reports(reports: list) -> list:
         return []
     
     return [add_image_urls_to_report(report) for report in reports]
+
+
+def presign_cache_stats():
+    """Contadores de la caché de URLs firmadas"""
+    return presigned_url_cache.stats()
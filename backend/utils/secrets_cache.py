@@ -0,0 +1,124 @@
+"""
+Caché de contenedor de los secretos de Parameter Store (JWT_SECRET).
+
+Todas las Lambdas firman o validan tokens (y cursores de paginación) con el
+mismo secreto, así que se lee una sola vez por contenedor y se refresca:
+    - Cada entrada vive SECRET_TTL segundos ± SECRET_TTL_JITTER, para que los
+      contenedores que arrancaron juntos no vuelvan a SSM al mismo tiempo.
+    - Al vencer se lee SSM dentro del request, sin threads: Lambda congela el
+      contenedor entre invocaciones y un thread en segundo plano podía quedar
+      detenido con el lock tomado. Si SSM falla y ya hay un valor, se sigue
+      usando y se reintenta en ERROR_RETRY_INTERVAL segundos.
+
+Rotación del JWT_SECRET sin redeploy:
+    1. Copiar el valor actual a JWT_SECRET_PREVIOUS_PARAM (/utec-alerta/jwt-secret-previous)
+    2. Escribir el nuevo valor en JWT_SECRET_PARAM (/utec-alerta/jwt-secret)
+Los tokens firmados con cualquiera de las dos llaves siguen siendo válidos
+(get_jwt_verification_secrets); pasado TOKEN_LIFETIME (utils/token_revocation.py)
+se puede borrar el parámetro anterior.
+"""
+import os
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import boto3
+
+ssm = boto3.client('ssm')
+
+JWT_SECRET_PARAM = os.environ.get('JWT_SECRET_PARAM', '/utec-alerta/jwt-secret')
+JWT_SECRET_PREVIOUS_PARAM = os.environ.get('JWT_SECRET_PREVIOUS_PARAM', f'{JWT_SECRET_PARAM}-previous')
+
+SECRET_TTL = int(os.environ.get('SECRET_TTL', 300))
+SECRET_TTL_JITTER = 0.2
+ERROR_RETRY_INTERVAL = 30
+
+
+class RotatingSecret:
+    """Secreto de Parameter Store con su valor anterior (opcional) durante una rotación"""
+
+    def __init__(self, param_name: str, previous_param_name: Optional[str] = None,
+                 ttl: float = SECRET_TTL, jitter: float = SECRET_TTL_JITTER):
+        """
+        Args:
+            param_name: Parámetro con el valor vigente (obligatorio)
+            previous_param_name: Parámetro con el valor anterior (puede no existir)
+            ttl: Vida de los valores leídos (segundos)
+            jitter: Fracción de ttl que se suma o resta al azar en cada lectura
+        """
+        self.param_name = param_name
+        self.previous_param_name = previous_param_name
+        self.ttl = ttl
+        self.jitter = jitter
+        # (vigente, anterior o None)
+        self._values: Optional[Tuple[str, Optional[str]]] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self) -> Tuple[str, Optional[str]]:
+        """
+        Returns:
+            Tupla (valor vigente, valor anterior o None)
+
+        Raises:
+            Exception: Si el parámetro no se pudo leer y no hay un valor en caché
+        """
+        values = self._values
+        if values is None or time.monotonic() >= self._expires_at:
+            with self._lock:
+                if self._values is None or time.monotonic() >= self._expires_at:
+                    self._load()
+                return self._values
+        return values
+
+    def invalidate(self):
+        """Fuerza una lectura de SSM en el próximo get (el valor actual sigue sirviendo si falla)"""
+        self._expires_at = 0.0
+
+    def _load(self):
+        """Lee los parámetros (llamar con self._lock tomado)"""
+        try:
+            current = self._get_parameter(self.param_name)
+            if current is None:
+                raise Exception(f"Parameter {self.param_name} not found")
+            previous = self._get_parameter(self.previous_param_name) if self.previous_param_name else None
+        except Exception as e:
+            print(f"Error getting secret {self.param_name}: {e}")
+            if self._values is None:
+                raise Exception(f"{self.param_name} not configured")
+            # Se sigue con el valor conocido hasta el próximo reintento
+            self._expires_at = time.monotonic() + ERROR_RETRY_INTERVAL
+            return
+
+        self._values = (current, previous)
+        self.loads += 1
+        self._expires_at = time.monotonic() + self.ttl * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    @staticmethod
+    def _get_parameter(name: str) -> Optional[str]:
+        """Valor de un parámetro (ssm:GetParameter), o None si no existe"""
+        try:
+            return ssm.get_parameter(Name=name, WithDecryption=True)['Parameter']['Value']
+        except ssm.exceptions.ParameterNotFound:
+            return None
+
+
+jwt_secret = RotatingSecret(JWT_SECRET_PARAM, JWT_SECRET_PREVIOUS_PARAM)
+
+
+def get_jwt_secret() -> str:
+    """JWT_SECRET vigente: el que se usa para firmar"""
+    return jwt_secret.get()[0]
+
+
+def get_jwt_verification_secrets() -> List[str]:
+    """
+    Llaves con las que se valida una firma: la vigente y, durante una rotación,
+    la anterior (en ese orden).
+    """
+    current, previous = jwt_secret.get()
+    if previous and previous != current:
+        return [current, previous]
+    return [current]
@@ -0,0 +1,143 @@
+"""
+Serialización JSON de las respuestas de la API.
+
+Un solo punto de entrada (dumps/loads) para todos los handlers, que resuelve en
+la misma pasada del encoder los tipos que json no soporta:
+    - Decimal -> int o float (valores armados a mano o leídos sin utils.dynamo)
+    - datetime/date/time -> ISO 8601
+    - bytes/bytearray/Binary -> base64
+    - set/frozenset (String/Number Sets de DynamoDB) -> lista
+    - escalares y arrays de NumPy -> int/float/lista
+
+Backends:
+    - orjson, si está instalado (bastante más rápido con listas grandes de reportes)
+    - json de la librería estándar en otro caso
+JSON_BACKEND ('orjson' o 'json') fuerza uno; set_backend permite cambiarlo en
+pruebas y benchmarks. Ambos generan JSON compacto y UTF-8 sin escapar
+(ensure_ascii=False), así que el body es el mismo con cualquiera de los dos.
+
+Tipos adicionales: register_type(clase, función) agrega la conversión a ambos backends.
+Ver scripts/benchmark_serialization.py.
+"""
+import base64
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Conversiones registradas con register_type: {clase: función(valor) -> tipo JSON}
+_encoders = {}
+
+
+def _decimal(value):
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+def _bytes(value):
+    return base64.b64encode(value).decode('ascii')
+
+
+def default(obj):
+    """Conversión de los tipos que el encoder no soporta (parámetro default de json/orjson)"""
+    encoder = _encoders.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    if isinstance(obj, Decimal):
+        return _decimal(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray)):
+        return _bytes(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # boto3.dynamodb.types.Binary
+    value = getattr(obj, 'value', None)
+    if isinstance(value, bytes):
+        return _bytes(value)
+    # Escalares y arrays de NumPy
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    for cls, encoder in _encoders.items():
+        if isinstance(obj, cls):
+            return encoder(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def register_type(cls, encoder):
+    """Agrega la conversión de un tipo propio (encoder recibe el valor y retorna un tipo JSON)"""
+    _encoders[cls] = encoder
+
+
+# --- Backends ---
+
+class StdlibBackend:
+    """json de la librería estándar, con encoders precreados (json.dumps con opciones crea uno por llamada)"""
+
+    name = 'json'
+
+    def __init__(self):
+        options = {'separators': (',', ':'), 'ensure_ascii': False, 'default': default}
+        self._encoder = json.JSONEncoder(**options)
+        self._sorted_encoder = json.JSONEncoder(sort_keys=True, **options)
+        self._decoder = json.JSONDecoder()
+
+    def dumps(self, obj, sort_keys=False):
+        return (self._sorted_encoder if sort_keys else self._encoder).encode(obj)
+
+    def loads(self, data):
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode('utf-8')
+        return self._decoder.decode(data)
+
+
+class OrjsonBackend:
+    """orjson: serializa datetime y NumPy de forma nativa; el resto pasa por default"""
+
+    name = 'orjson'
+
+    def __init__(self):
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, sort_keys=False):
+        options = self._options | orjson.OPT_SORT_KEYS if sort_keys else self._options
+        return orjson.dumps(obj, default=default, option=options).decode('utf-8')
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def get_backend(name=None):
+    """Backend por nombre ('orjson', 'json'); None = orjson si está instalado"""
+    if name == 'json' or (name is None and orjson is None):
+        return StdlibBackend()
+    if name in ('orjson', None):
+        if orjson is None:
+            raise ValueError('JSON_BACKEND=orjson pero orjson no está instalado')
+        return OrjsonBackend()
+    raise ValueError(f'Unsupported JSON_BACKEND: {name}')
+
+
+backend = get_backend(os.environ.get('JSON_BACKEND') or None)
+
+
+def set_backend(name):
+    """Cambia el backend activo y retorna el nombre del anterior (pruebas y benchmarks)"""
+    global backend
+    previous = backend.name
+    backend = get_backend(name)
+    return previous
+
+
+def dumps(obj, sort_keys=False):
+    """Serializa obj a un str JSON compacto"""
+    return backend.dumps(obj, sort_keys)
+
+
+def loads(data):
+    """Parsea JSON desde str o bytes"""
+    return backend.loads(data)
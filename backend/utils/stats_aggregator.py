@@ -0,0 +1,77 @@
+"""
+Contadores de estadísticas de reportes: por estado, urgencia y sector, reportes
+sin asignar y sumas de tiempo de resolución.
+Los contadores se mantienen en t_stats (utils/stats_counters.py, que también
+usa scripts/rebuild_stats.py para recalcularlos) y los builders de getStats por
+rol son vistas sobre ellos.
+"""
+from datetime import datetime
+
+ESTADOS = ['PENDIENTE', 'ATENDIENDO', 'RESUELTO']
+URGENCIAS = ['BAJA', 'MEDIA', 'ALTA']
+
+# Sector usado cuando el reporte no tiene assigned_sector
+NO_SECTOR = 'Sin asignar'
+
+
+def new_counters():
+    """Contadores vacíos de un grupo de reportes"""
+    return {
+        'total': 0,
+        'by_estado': {},
+        'by_urgencia': {},
+        'by_sector': {},
+        'unassigned': 0,
+        'resolution_seconds': 0.0,
+        'resolved_with_time': 0
+    }
+
+
+def _parse_iso(value):
+    """Parsea fechas ISO con sufijo 'Z' (Python 3.11+ lo acepta directamente)"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def elapsed_seconds(report, start_field, end_field):
+    """
+    Segundos entre dos fechas ISO de un reporte.
+
+    Returns:
+        float, o None si falta alguna fecha o no es válida
+    """
+    start = report.get(start_field)
+    end = report.get(end_field)
+    if not start or not end:
+        return None
+    try:
+        return (_parse_iso(end) - _parse_iso(start)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def resolution_seconds(report):
+    """
+    Segundos entre created_at y resolved_at de un reporte RESUELTO.
+
+    Returns:
+        float, o None si el reporte no está resuelto o las fechas no son válidas
+    """
+    if report.get('estado') != 'RESUELTO':
+        return None
+    return elapsed_seconds(report, 'created_at', 'resolved_at')
+
+
+def counts_by(counters, field, keys):
+    """Vista {clave: cantidad} de un group-by con las claves fijas indicadas"""
+    values = counters[field]
+    return {key: values.get(key, 0) for key in keys}
+
+
+def avg_resolution_hours(counters):
+    """Tiempo promedio de resolución en horas, o None si no hay resueltos con fechas"""
+    if not counters['resolved_with_time']:
+        return None
+    return counters['resolution_seconds'] / counters['resolved_with_time'] / 3600
@@ -0,0 +1,258 @@
+"""
+Contadores pre-agregados de reportes en t_stats.
+Cada escritura de un reporte (sendReport, updateStatus, takeReport, assignReport
+y el DAG de clasificación) aplica con ADD la diferencia entre el estado anterior
+y el nuevo del reporte, así las estadísticas se leen con unos pocos get_item en
+lugar de recorrer t_reportes.
+
+Items de t_stats:
+    stat_key: 'GLOBAL' | 'SECTOR#<sector>' | 'AUTHOR#<user_id>' |
+              'ASSIGNEE#<user_id>#<sector>' (asignados a un usuario dentro de un sector)
+    bucket:   'TOTAL' (acumulado histórico) |
+              'H#2025-11-01T13' / 'D#2025-11-01' (rollups por hora y día de created_at;
+              no se mantienen para ASSIGNEE#)
+    atributos numéricos planos: total, estado#PENDIENTE, urgencia#ALTA,
+    sector#Mantenimiento, unassigned, resolution_seconds, resolved_with_time,
+    ml#clasificados, ml#reclasificados, ml#elevados, urgencia_clasificada#ALTA,
+    q_take#<bin>, q_resolve#<bin> (sketches de cuantiles, ver utils/quantile_sketch.py)
+
+Un reporte cuenta en el rollup de la hora y del día en que se creó, con su
+estado actual: los cambios de estado ajustan esos mismos buckets. Así, los
+contadores del período equivalen a filtrar created_at >= inicio y se leen
+sumando buckets (ver utils/stats_rollups.py).
+
+Si una actualización de contadores falla, el reporte ya quedó guardado: el error
+se registra y scripts/rebuild_stats.py recalcula los contadores desde t_reportes.
+"""
+import time
+from utils.stats_aggregator import new_counters, resolution_seconds, elapsed_seconds, NO_SECTOR
+from utils.quantile_sketch import SKETCHES, sketch_attribute
+from utils.dynamo import dynamodb
+
+stats_table = dynamodb.Table('t_stats')
+
+STATS_TABLE_NAME = 't_stats'
+TOTAL_BUCKET = 'TOTAL'
+HOUR_PREFIX = 'H#'
+DAY_PREFIX = 'D#'
+GLOBAL_KEY = 'GLOBAL'
+ASSIGNEE_PREFIX = 'ASSIGNEE#'
+
+URGENCY_LEVELS = {'BAJA': 1, 'MEDIA': 2, 'ALTA': 3}
+
+# Prefijo de atributo -> nombre del sketch
+SKETCH_PREFIXES = {prefix: sketch for sketch, prefix in SKETCHES.items()}
+
+
+def sector_key(sector):
+    return f'SECTOR#{sector}'
+
+
+def author_key(user_id):
+    return f'AUTHOR#{user_id}'
+
+
+def assignee_key(user_id, sector=None):
+    return f'{ASSIGNEE_PREFIX}{user_id}#{sector or NO_SECTOR}'
+
+
+def hour_bucket(timestamp):
+    """Bucket horario de una fecha ISO ('2025-11-01T13:45:00Z' -> 'H#2025-11-01T13')"""
+    return HOUR_PREFIX + timestamp[:13]
+
+
+def day_bucket(timestamp):
+    """Bucket diario de una fecha ISO ('2025-11-01T13:45:00Z' -> 'D#2025-11-01')"""
+    return DAY_PREFIX + timestamp[:10]
+
+
+def report_scopes(report):
+    """Claves de t_stats en las que cuenta un reporte"""
+    scopes = [GLOBAL_KEY]
+    if report.get('assigned_sector'):
+        scopes.append(sector_key(report['assigned_sector']))
+    if report.get('author_id'):
+        scopes.append(author_key(report['author_id']))
+    if report.get('assigned_to'):
+        scopes.append(assignee_key(report['assigned_to'], report.get('assigned_sector')))
+    return scopes
+
+
+def report_items(report):
+    """Items (stat_key, bucket) de t_stats en los que cuenta un reporte"""
+    created_at = report.get('created_at')
+    rollups = [hour_bucket(created_at), day_bucket(created_at)] if created_at else []
+
+    items = []
+    for scope in report_scopes(report):
+        items.append((scope, TOTAL_BUCKET))
+        if not scope.startswith(ASSIGNEE_PREFIX):
+            items.extend((scope, bucket) for bucket in rollups)
+    return items
+
+
+def report_contribution(report):
+    """
+    Aporte de un reporte a los contadores (atributos planos de t_stats).
+
+    Returns:
+        Dict {atributo: cantidad}
+    """
+    contribution = {
+        'total': 1,
+        f"estado#{report.get('estado')}": 1,
+        f"urgencia#{report.get('urgencia')}": 1,
+        f"sector#{report.get('assigned_sector') or NO_SECTOR}": 1
+    }
+    if report.get('assigned_to') is None:
+        contribution['unassigned'] = 1
+
+    seconds = resolution_seconds(report)
+    if seconds is not None:
+        contribution['resolution_seconds'] = int(round(seconds))
+        contribution['resolved_with_time'] = 1
+
+        # Sketches de tiempo de atención y de resolución (solo reportes RESUELTO)
+        if seconds >= 0:
+            contribution[sketch_attribute('resolve', seconds)] = 1
+        take = elapsed_seconds(report, 'created_at', 'taken_at')
+        if take is not None and take >= 0:
+            contribution[sketch_attribute('take', take)] = 1
+
+    contribution.update(classification_counters(report))
+    return contribution
+
+
+def classification_counters(report):
+    """
+    Contadores de la clasificación automática (DAG de Airflow) que aporta un reporte.
+
+    Returns:
+        Dict {atributo: cantidad}; vacío si el reporte no fue clasificado
+    """
+    if not report.get('clasificacion_auto'):
+        return {}
+    original = report.get('urgencia_original')
+    classified = report.get('urgencia_clasificada')
+    counters = {'ml#clasificados': 1}
+    if classified:
+        counters[f'urgencia_clasificada#{classified}'] = 1
+    if original and classified and original != classified:
+        counters['ml#reclasificados'] = 1
+        if URGENCY_LEVELS.get(classified, 0) > URGENCY_LEVELS.get(original, 0):
+            counters['ml#elevados'] = 1
+    return counters
+
+
+def report_deltas(old_report, new_report):
+    """
+    Diferencias de contadores al pasar un reporte de old_report a new_report.
+    Usar old_report=None para reportes nuevos (y new_report=None para borrados).
+
+    Returns:
+        Dict {(stat_key, bucket): {atributo: delta}} sin deltas en cero
+    """
+    deltas = {}
+    for report, sign in ((old_report, -1), (new_report, 1)):
+        if not report:
+            continue
+        contribution = report_contribution(report)
+        for item_key in report_items(report):
+            item_deltas = deltas.setdefault(item_key, {})
+            for attr, value in contribution.items():
+                item_deltas[attr] = item_deltas.get(attr, 0) + sign * value
+
+    return {
+        item_key: {attr: value for attr, value in item_deltas.items() if value}
+        for item_key, item_deltas in deltas.items()
+        if any(item_deltas.values())
+    }
+
+
+def add_to_counters(stat_key, bucket, deltas):
+    """Aplica deltas a un item de t_stats con ADD (atómico; crea el item si no existe)"""
+    names = {}
+    values = {}
+    clauses = []
+    for i, (attr, value) in enumerate(deltas.items()):
+        names[f'#a{i}'] = attr
+        values[f':v{i}'] = value
+        clauses.append(f'#a{i} :v{i}')
+
+    stats_table.update_item(
+        Key={'stat_key': stat_key, 'bucket': bucket},
+        UpdateExpression='ADD ' + ', '.join(clauses),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values
+    )
+
+
+def record_report_change(old_report, new_report):
+    """
+    Actualiza los contadores después de escribir un reporte.
+    No lanza excepciones: una falla aquí no debe deshacer la escritura del reporte.
+    """
+    try:
+        for (stat_key, bucket), deltas in report_deltas(old_report, new_report).items():
+            add_to_counters(stat_key, bucket, deltas)
+    except Exception as e:
+        report = new_report or old_report or {}
+        print(f"⚠️ Error actualizando t_stats para {report.get('id_reporte')}: {e}")
+
+
+def to_counters(item):
+    """
+    Convierte un item de t_stats al formato de contadores de utils.stats_aggregator.
+    Los números ya llegan como int/float (utils.dynamo).
+
+    Returns:
+        Dict con las claves de new_counters() más 'ml' ({atributo: cantidad})
+        y 'sketches' ({'take': {bin: cantidad}, 'resolve': {bin: cantidad}})
+    """
+    counters = new_counters()
+    counters['ml'] = {}
+    counters['sketches'] = {sketch: {} for sketch in SKETCHES}
+    for attr, value in (item or {}).items():
+        if attr in ('stat_key', 'bucket'):
+            continue
+        prefix, _, name = attr.partition('#')
+        if not name:
+            counters[attr] = value
+        elif prefix == 'estado':
+            counters['by_estado'][name] = value
+        elif prefix == 'urgencia':
+            counters['by_urgencia'][name] = value
+        elif prefix == 'sector':
+            counters['by_sector'][name] = value
+        elif prefix in SKETCH_PREFIXES:
+            counters['sketches'][SKETCH_PREFIXES[prefix]][int(name)] = value
+        else:
+            counters['ml'][attr] = value
+    return counters
+
+
+def load_counters(stat_keys, bucket=TOTAL_BUCKET, max_retries=5):
+    """
+    Lee varios items de t_stats en un batch_get_item.
+
+    Returns:
+        Dict {stat_key: counters} (contadores vacíos si el item no existe)
+    """
+    stat_keys = list(dict.fromkeys(stat_keys))
+    request_items = {
+        STATS_TABLE_NAME: {'Keys': [{'stat_key': key, 'bucket': bucket} for key in stat_keys]}
+    }
+
+    items = {}
+    attempt = 0
+    while request_items:
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        for item in response.get('Responses', {}).get(STATS_TABLE_NAME, []):
+            items[item['stat_key']] = item
+        request_items = response.get('UnprocessedKeys') or {}
+        if not request_items or attempt >= max_retries:
+            break
+        time.sleep(0.05 * (2 ** attempt))
+        attempt += 1
+
+    return {key: to_counters(items.get(key)) for key in stat_keys}
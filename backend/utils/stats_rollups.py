@@ -0,0 +1,165 @@
+"""
+Estadísticas de un período a partir de los rollups por hora y día de t_stats.
+Un rango [inicio, fin) se cubre con buckets diarios completos, buckets horarios
+en los extremos y, solo para los tramos menores a una hora, una query acotada
+por created_at sobre t_reportes. El costo depende del número de buckets, no de
+cuántos reportes hay en el período: un año son ~365 items diarios por stat_key.
+"""
+from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Key
+from utils.report_queries import query_reports
+from utils.stats_counters import (
+    stats_table, report_contribution, to_counters, hour_bucket, day_bucket, DAY_PREFIX
+)
+
+# Atributos que necesita report_contribution para los tramos sin bucket completo
+ROLLUP_FIELDS = [
+    'estado', 'urgencia', 'assigned_sector', 'assigned_to', 'created_at', 'taken_at', 'resolved_at',
+    'clasificacion_auto', 'urgencia_original', 'urgencia_clasificada'
+]
+
+# Límite superior de un rango de buckets diarios abierto ('~' ordena después de los dígitos)
+OPEN_DAY_BUCKET = DAY_PREFIX + '~'
+
+
+def to_iso(value):
+    """datetime UTC (naive) -> ISO con sufijo 'Z', el formato de created_at"""
+    return value.isoformat() + 'Z'
+
+
+def parse_timestamp(value):
+    """
+    Parsea una fecha ISO de un query param ('2025-11-01', '2025-11-01T13:00:00Z', con offset...).
+
+    Returns:
+        datetime naive en UTC
+
+    Raises:
+        ValueError: Si el valor no es una fecha ISO válida
+    """
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _floor_hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(value):
+    floor = _floor_hour(value)
+    return floor if floor == value else floor + timedelta(hours=1)
+
+
+def _floor_day(value):
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_day(value):
+    floor = _floor_day(value)
+    return floor if floor == value else floor + timedelta(days=1)
+
+
+def _hour_range(start, end):
+    """Rango inclusivo de buckets horarios para las horas completas de [start, end)"""
+    return (hour_bucket(to_iso(start)), hour_bucket(to_iso(end - timedelta(hours=1))))
+
+
+def plan_buckets(start, end=None):
+    """
+    Divide el rango [start, end) en rangos de buckets y tramos sin bucket completo.
+
+    Args:
+        start: Inicio del rango (datetime UTC)
+        end: Fin exclusivo (datetime UTC); None = abierto (hasta ahora)
+
+    Returns:
+        Tuple (bucket_ranges, edges):
+            bucket_ranges: [(bucket_desde, bucket_hasta)] inclusivos (para BETWEEN)
+            edges: [(desde, hasta)] tramos de menos de una hora que se leen de t_reportes
+    """
+    first_hour = _ceil_hour(start)
+    edges = []
+    last_hour = None
+    if end is not None:
+        last_hour = _floor_hour(end)
+        if first_hour >= last_hour:
+            return [], [(start, end)] if start < end else []
+        if last_hour < end:
+            edges.append((last_hour, end))
+    if start < first_hour:
+        edges.insert(0, (start, first_hour))
+
+    first_day = _ceil_day(first_hour)
+    last_day = _floor_day(last_hour) if last_hour is not None else None
+
+    if last_day is not None and first_day >= last_day:
+        return [_hour_range(first_hour, last_hour)], edges
+
+    bucket_ranges = []
+    if first_hour < first_day:
+        bucket_ranges.append(_hour_range(first_hour, first_day))
+    if last_day is None:
+        bucket_ranges.append((day_bucket(to_iso(first_day)), OPEN_DAY_BUCKET))
+    else:
+        bucket_ranges.append((day_bucket(to_iso(first_day)), day_bucket(to_iso(last_day - timedelta(days=1)))))
+        if last_day < last_hour:
+            bucket_ranges.append(_hour_range(last_day, last_hour))
+    return bucket_ranges, edges
+
+
+def _add_attributes(totals, attributes):
+    """Suma atributos numéricos planos (formato de t_stats) sobre totals"""
+    for attr, value in attributes.items():
+        if attr in ('stat_key', 'bucket'):
+            continue
+        totals[attr] = totals.get(attr, 0) + value
+
+
+def load_rollups(stat_key, bucket_ranges, totals=None):
+    """
+    Suma los items de t_stats de un stat_key dentro de los rangos de buckets.
+
+    Returns:
+        Dict {atributo: total} en el formato plano de t_stats
+    """
+    totals = {} if totals is None else totals
+    for low, high in bucket_ranges:
+        params = {'KeyConditionExpression': Key('stat_key').eq(stat_key) & Key('bucket').between(low, high)}
+        while True:
+            response = stats_table.query(**params)
+            for item in response.get('Items', []):
+                _add_attributes(totals, item)
+            if 'LastEvaluatedKey' not in response:
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return totals
+
+
+def period_counters(stat_key, filters, start, end=None):
+    """
+    Contadores de los reportes creados en [start, end) para un stat_key.
+
+    Args:
+        stat_key: Clave de t_stats (GLOBAL, SECTOR#..., AUTHOR#...)
+        filters: Filtros de query_reports equivalentes al stat_key
+                 ({} para GLOBAL, {'assigned_sector': s}, {'author_id': id})
+        start: Inicio del período (datetime UTC)
+        end: Fin exclusivo (datetime UTC); None = hasta ahora
+
+    Returns:
+        Contadores en el formato de utils.stats_counters.to_counters
+    """
+    bucket_ranges, edges = plan_buckets(start, end)
+    totals = load_rollups(stat_key, bucket_ranges)
+
+    # Tramos de menos de una hora: mismos aportes que los rollups, calculados al vuelo
+    for edge_start, edge_end in edges:
+        reports = query_reports(
+            filters, fields=ROLLUP_FIELDS, created_from=to_iso(edge_start), created_to=to_iso(edge_end)
+        )
+        for report in reports:
+            _add_attributes(totals, report_contribution(report))
+
+    return to_counters(totals)
@@ -0,0 +1,118 @@
+"""
+Revocación de tokens JWT sin lectura de t_usuarios por request.
+
+Los tokens llevan en sus claims todo lo que usan los handlers (rol, sector,
+nombres) y la token_version del usuario al momento del login. Para invalidar
+los tokens de un usuario (cambio de rol o sector, contraseña, baja) se llama a
+revoke_user_tokens: incrementa token_version en t_usuarios y lo registra en
+t_token_revocations, una fila por usuario que vence (TTL) cuando ya no puede
+quedar ningún token anterior vigente.
+
+Cada contenedor carga esa tabla en un filtro de Bloom y lo recarga cuando cambia
+la generación de t_token_revocations (leída como mucho cada REFRESH_INTERVAL
+segundos) o cada MAX_FILTER_AGE segundos. validate_token solo lee el usuario
+(utils/user_cache.py) si el filtro dice que puede tener tokens revocados, y en
+ese caso compara la token_version del token con la del usuario. Una revocación
+tarda como mucho REFRESH_INTERVAL segundos en aplicarse en todos los contenedores.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Attr
+from utils.bloom_filter import BloomFilter
+from utils.dynamo import dynamodb
+from utils.generations import current_generations, bump_generation, REVOCATIONS_GENERATION
+from utils.user_cache import invalidate_user
+
+users_table = dynamodb.Table('t_usuarios')
+revocations_table = dynamodb.Table('t_token_revocations')
+
+# Vida de los tokens que emite auth (la fila de revocación dura lo mismo)
+TOKEN_LIFETIME = timedelta(days=7)
+
+REFRESH_INTERVAL = 10
+MAX_FILTER_AGE = 300
+FILTER_ERROR_RATE = 0.01
+
+_lock = threading.Lock()
+_filter = None          # None = sin cargar (o la carga falló): se consulta siempre al usuario
+_generation = None
+_loaded_at = 0.0
+_next_check = 0.0
+
+
+def _load_revoked_users():
+    """user_id de las filas vigentes de t_token_revocations"""
+    now = int(time.time())
+    params = {'ProjectionExpression': 'user_id, expires_at'}
+    user_ids = []
+    while True:
+        response = revocations_table.scan(**params)
+        # El borrado por TTL de DynamoDB puede tardar: se filtran las vencidas al leer
+        user_ids.extend(item['user_id'] for item in response.get('Items', []) if int(item['expires_at']) > now)
+        if 'LastEvaluatedKey' not in response:
+            return user_ids
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def refresh_filter(force=False):
+    """Recarga el filtro si cambió la generación, si es viejo o si force=True"""
+    global _filter, _generation, _loaded_at, _next_check
+    now = time.monotonic()
+    if not force and now < _next_check:
+        return
+    with _lock:
+        if not force and now < _next_check:
+            return
+        _next_check = now + REFRESH_INTERVAL
+    try:
+        # La generación se lee antes del scan: lo revocado durante la carga fuerza otra recarga
+        generation = current_generations([REVOCATIONS_GENERATION])[REVOCATIONS_GENERATION]
+        if not force and _filter is not None and generation == _generation and now - _loaded_at < MAX_FILTER_AGE:
+            return
+        bloom = BloomFilter.from_keys(_load_revoked_users(), error_rate=FILTER_ERROR_RATE)
+    except Exception as e:
+        print(f"⚠️ Error recargando el filtro de tokens revocados: {e}")
+        return
+    _filter, _generation, _loaded_at = bloom, generation, now
+
+
+def may_be_revoked(user_id):
+    """
+    False si seguro que el usuario no tiene tokens revocados (sin I/O en el camino común).
+    True si puede tenerlos, o si el filtro no se pudo cargar.
+    """
+    refresh_filter()
+    bloom = _filter
+    return bloom is None or user_id in bloom
+
+
+def revoke_user_tokens(user_id):
+    """
+    Invalida todos los tokens emitidos hasta ahora para user_id.
+
+    Returns:
+        Nueva token_version del usuario (los tokens nuevos deben llevarla)
+
+    Raises:
+        Exception: Si el usuario no existe
+    """
+    response = users_table.update_item(
+        Key={'id': user_id},
+        UpdateExpression='ADD token_version :one',
+        ConditionExpression=Attr('id').exists(),
+        ExpressionAttributeValues={':one': 1},
+        ReturnValues='UPDATED_NEW'
+    )
+    version = int(response['Attributes']['token_version'])
+    now = datetime.utcnow()
+    revocations_table.put_item(Item={
+        'user_id': user_id,
+        'token_version': version,
+        'revoked_at': now.isoformat() + 'Z',
+        'expires_at': int(time.time() + TOKEN_LIFETIME.total_seconds()) + 3600
+    })
+    bump_generation(REVOCATIONS_GENERATION)
+    invalidate_user(user_id)
+    refresh_filter(force=True)
+    return version
@@ -0,0 +1,110 @@
+"""
+Caché de contenedor de los usuarios que autentica validate_token.
+
+Cada request autenticado necesita el item de t_usuarios (existencia del usuario
+y user_data para los handlers). En un contenedor caliente el mismo usuario hace
+muchos requests seguidos, así que el item se guarda con un TTL corto y el camino
+común no hace I/O.
+
+Invalidación:
+    - Quien escribe un usuario (manageAuthorities, registro en auth) llama a
+      invalidate_user: borra la entrada local e incrementa la generación de
+      t_usuarios (utils/generations.py).
+    - Los demás contenedores leen esa generación como mucho cada
+      GENERATION_CHECK_INTERVAL segundos y vacían la caché si cambió.
+Un cambio hecho fuera de la API (scripts/seed_users.py, consola) se ve a más
+tardar en USER_CACHE_TTL segundos.
+
+Solo se leen USER_FIELDS (los campos públicos más token_version): el hash del
+password nunca se cachea ni llega a user_data.
+"""
+import threading
+import time
+from utils.cache import TTLCache
+from utils.dynamo import dynamodb
+from utils.generations import current_generations, bump_generation, USERS_GENERATION
+from utils.reference_data import USER_PUBLIC_FIELDS
+
+users_table = dynamodb.Table('t_usuarios')
+
+# Atributos leídos de t_usuarios: lo que usan los handlers y la verificación de revocación
+USER_FIELDS = USER_PUBLIC_FIELDS + ['token_version']
+_PROJECTION_NAMES = {f'#u{i}': field for i, field in enumerate(USER_FIELDS)}
+
+USER_CACHE_TTL = 60
+GENERATION_CHECK_INTERVAL = 10
+
+# Cada cuántas búsquedas se imprimen los contadores en CloudWatch (0 = nunca)
+STATS_LOG_EVERY = 500
+
+# user_id -> item de t_usuarios (compartido: no debe modificarse)
+user_cache = TTLCache(max_size=2048, ttl=USER_CACHE_TTL)
+
+_lock = threading.Lock()
+_generation = None
+_next_check = 0.0
+_generation_checks = 0
+_lookups = 0
+
+
+def _check_generation():
+    """Vacía la caché si otro contenedor modificó usuarios desde la última verificación"""
+    global _generation, _next_check, _generation_checks
+    now = time.monotonic()
+    if now < _next_check:
+        return
+    with _lock:
+        if now < _next_check:
+            return
+        _next_check = now + GENERATION_CHECK_INTERVAL
+        _generation_checks += 1
+    try:
+        generation = current_generations([USERS_GENERATION])[USERS_GENERATION]
+    except Exception as e:
+        # Sin la generación se sigue con la caché: el TTL acota lo desactualizado
+        print(f"⚠️ Error leyendo la generación de usuarios: {e}")
+        return
+    if _generation is not None and generation != _generation:
+        user_cache.clear(reset_stats=False)
+    _generation = generation
+
+
+def get_user(user_id):
+    """
+    Item de t_usuarios de user_id, leyendo DynamoDB solo si no está en caché.
+
+    Returns:
+        Dict del usuario, o None si no existe (los inexistentes no se cachean)
+    """
+    global _lookups
+    _check_generation()
+    _lookups += 1
+    if STATS_LOG_EVERY and _lookups % STATS_LOG_EVERY == 0:
+        print(f"User cache: {cache_stats()}")
+
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = users_table.get_item(
+        Key={'id': user_id},
+        ProjectionExpression=', '.join(_PROJECTION_NAMES),
+        ExpressionAttributeNames=_PROJECTION_NAMES
+    ).get('Item')
+    if user is not None:
+        user_cache.set(user_id, user)
+    return user
+
+
+def invalidate_user(user_id):
+    """
+    Invalida un usuario después de escribirlo, en este contenedor y en los demás.
+    No lanza excepciones (ver bump_generation).
+    """
+    user_cache.invalidate(user_id)
+    bump_generation(USERS_GENERATION)
+
+
+def cache_stats():
+    """Contadores de la caché de usuarios (incluye hit_rate) y lecturas de generación"""
+    return {**user_cache.stats(), 'generation_checks': _generation_checks}